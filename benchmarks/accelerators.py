@@ -0,0 +1,152 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark `status` and `commit_history` before and after enabling repository accelerators."""
+
+# pylint: disable=C0413
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from jupyterlab_simple_git.git import Git  # noqa
+from generate import PRESETS, file_path, generate  # noqa
+
+
+async def measure(root, repeats):
+    """Time `status` and `commit_history` requests.
+
+    Notes:
+        Each repetition uses a new `Git` instance, thus measuring requests which cannot be answered from in-process caches. The commit index is disabled in order to measure Git itself.
+
+    Args:
+        root: repository path
+        repeats: number of repetitions
+
+    Returns:
+        `dict` mapping each case to its minimum elapsed time (in seconds)
+
+    """
+    cases = {
+        'status': lambda git: git.status(),
+        'commit_history': lambda git: git.commit_history(n=100),
+        'commit_history.path': lambda git: git.commit_history(file_path(0), n=100)
+    }
+    results = {}
+    for name, clbk in cases.items():
+        out = []
+        for _ in range(repeats):
+            git = Git(root, history_index=False, maintenance_interval=0)
+            try:
+                start = time.perf_counter()
+                response = await clbk(git)
+                out.append(time.perf_counter()-start)
+            finally:
+                await git.close()
+            if response['code'] != 0:
+                raise RuntimeError(response['message'])
+        results[name] = min(out)
+    return results
+
+
+async def run(root, repeats):
+    """Run the benchmark.
+
+    Args:
+        root: repository path
+        repeats: number of repetitions
+
+    Returns:
+        benchmark results
+
+    """
+    before = await measure(root, repeats)
+
+    git = Git(root, history_index=False, maintenance_interval=0)
+    try:
+        await git.enable_accelerators()
+        start = time.perf_counter()
+        maintenance = await git.maintain()
+        elapsed = time.perf_counter()-start
+        accelerators = (await git.accelerators())['accelerators']
+    finally:
+        await git.close()
+
+    after = await measure(root, repeats)
+    return {
+        'name': 'accelerators',
+        'repository': root,
+        'accelerators': accelerators,
+        'maintenance': {
+            'tasks': maintenance.get('tasks'),
+            'seconds': elapsed
+        },
+        'seconds': {
+            'before': before,
+            'after': after
+        }
+    }
+
+
+def main():
+    """Run the script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repo', help='path of an existing repository previously created by `generate.py` (default: generate a temporary repository). Accelerators are enabled in the repository.')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='shape of a generated repository (default: small)')
+    for key in PRESETS['small']:
+        parser.add_argument('--'+key, type=int, default=None, help='override the number of '+key+' in a generated repository')
+    parser.add_argument('--repeats', type=int, default=5, help='number of repetitions per case (default: 5)')
+    args = parser.parse_args()
+
+    tmp = None
+    if args.repo is None:
+        params = dict(PRESETS[args.preset])
+        for key in params:
+            if getattr(args, key) is not None:
+                params[key] = getattr(args, key)
+        tmp = tempfile.mkdtemp()
+        root = os.path.join(tmp, 'repo')
+        generate(root, **params)
+    else:
+        root = os.path.realpath(args.repo)
+    try:
+        print(json.dumps(asyncio.run(run(root, args.repeats)), indent=4))
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
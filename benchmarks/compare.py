@@ -0,0 +1,87 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Compare two sets of benchmark results and report regressions."""
+
+import argparse
+import json
+import sys
+
+
+def compare(baseline, current, threshold):
+    """Compare benchmark results.
+
+    Args:
+        baseline: baseline results `dict`
+        current: current results `dict`
+        threshold: relative slowdown (e.g., 0.1 for 10%) above which a case is considered a regression
+
+    Returns:
+        A `list` of `dict`s describing each case present in both sets of results.
+
+    """
+    out = []
+    for name in sorted(set(baseline['results']) & set(current['results'])):
+        before = baseline['results'][name]['median']
+        after = current['results'][name]['median']
+        change = (after-before) / before if before > 0 else 0.0
+        out.append({
+            'name': name,
+            'baseline': before,
+            'current': after,
+            'change': change,
+            'regression': change > threshold
+        })
+    return out
+
+
+def main():
+    """Run the script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('baseline', help='baseline results file')
+    parser.add_argument('current', help='current results file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown above which a case is considered a regression (default: 0.1)')
+    args = parser.parse_args()
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r') as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    print('%-40s %12s %12s %9s' % ('case', 'baseline (s)', 'current (s)', 'change'))
+    for row in rows:
+        print('%-40s %12.6f %12.6f %+8.1f%%%s' % (row['name'], row['baseline'], row['current'], row['change']*100, '  REGRESSION' if row['regression'] else ''))
+
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Generate a synthetic Git repository for benchmarking."""
+
+import argparse
+import json
+import os
+import subprocess
+
+# Preset repository shapes:
+PRESETS = {
+    'small': {
+        'files': 10000,
+        'commits': 10000,
+        'branches': 50,
+        'untracked': 5000,
+        'modified': 100
+    },
+    'large': {
+        'files': 100000,
+        'commits': 1000000,
+        'branches': 1000,
+        'untracked': 50000,
+        'modified': 1000
+    }
+}
+
+# Number of entries per directory:
+FANOUT = 100
+
+# Base commit timestamp:
+EPOCH = 1546300800
+
+# Commit identity:
+IDENT = 'Benchmark <benchmark@example.com>'
+
+
+def file_path(i):
+    """Return the path of the `i`th tracked file.
+
+    Args:
+        i: file index
+
+    Returns:
+        file path
+
+    """
+    return 'src/dir_%d/dir_%d/file_%d.py' % (i // (FANOUT*FANOUT), (i // FANOUT) % FANOUT, i)
+
+
+def _data(stream, contents):
+    """Write a fast-import `data` command.
+
+    Args:
+        stream: writable binary stream
+        contents: bytes
+
+    """
+    stream.write(b'data %d\n' % len(contents))
+    stream.write(contents)
+    stream.write(b'\n')
+
+
+def _import(root, files, commits, branches):
+    """Populate a repository via `git fast-import`.
+
+    Notes:
+        The first commit adds all files. Each subsequent commit modifies a single file. Branches point at commits evenly spaced throughout the history.
+
+    Args:
+        root: repository path
+        files: number of tracked files
+        commits: number of commits
+        branches: number of branches (in addition to `main`)
+
+    """
+    proc = subprocess.Popen(['git', 'fast-import', '--quiet'], cwd=root, stdin=subprocess.PIPE)
+    stream = proc.stdin
+    stride = max(commits // (branches+1), 1)
+    for i in range(commits):
+        stream.write(b'commit refs/heads/main\n')
+        stream.write(b'mark :%d\n' % (i+1))
+        stream.write(('committer %s %d +0000\n' % (IDENT, EPOCH+i)).encode('utf8'))
+        _data(stream, b'Commit %d' % i)
+        if i == 0:
+            for j in range(files):
+                stream.write(('M 100644 inline %s\n' % file_path(j)).encode('utf8'))
+                _data(stream, b'# File %d\n' % j)
+        else:
+            stream.write(('M 100644 inline %s\n' % file_path(i % files)).encode('utf8'))
+            _data(stream, b'# File %d\n# Revision %d\n' % (i % files, i))
+        stream.write(b'\n')
+
+    for k in range(branches):
+        stream.write(b'reset refs/heads/branch_%d\nfrom :%d\n\n' % (k, min((k+1)*stride, commits)))
+
+    stream.close()
+    if proc.wait() != 0:
+        raise RuntimeError('git fast-import failed')
+
+
+def generate(root, files, commits, branches, untracked, modified):
+    """Generate a synthetic repository.
+
+    Args:
+        root: repository path (must not exist)
+        files: number of tracked files
+        commits: number of commits
+        branches: number of branches (in addition to `main`)
+        untracked: number of untracked files
+        modified: number of tracked files having unstaged modifications
+
+    Returns:
+        A `dict` describing the generated repository.
+
+    """
+    os.makedirs(root)
+    subprocess.run(['git', 'init', '--quiet'], cwd=root, check=True)
+    subprocess.run(['git', 'config', 'user.name', 'Benchmark'], cwd=root, check=True)
+    subprocess.run(['git', 'config', 'user.email', 'benchmark@example.com'], cwd=root, check=True)
+    _import(root, files, commits, branches)
+    subprocess.run(['git', 'symbolic-ref', 'HEAD', 'refs/heads/main'], cwd=root, check=True)
+    subprocess.run(['git', 'reset', '--hard', '--quiet'], cwd=root, check=True)
+
+    for i in range(untracked):
+        path = os.path.join(root, 'untracked', 'dir_%d' % (i // FANOUT), 'file_%d.txt' % i)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write('Untracked %d\n' % i)
+
+    step = max(files // max(modified, 1), 1)
+    for i in range(0, min(modified*step, files), step):
+        with open(os.path.join(root, file_path(i)), 'a') as f:
+            f.write('# Modified\n')
+
+    return {
+        'files': files,
+        'commits': commits,
+        'branches': branches,
+        'untracked': untracked,
+        'modified': modified
+    }
+
+
+def main():
+    """Run the script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('root', help='repository path (must not exist)')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='repository shape (default: small)')
+    for key in PRESETS['small']:
+        parser.add_argument('--'+key, type=int, default=None, help='override the number of '+key)
+    args = parser.parse_args()
+
+    params = dict(PRESETS[args.preset])
+    for key in params:
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+
+    print(json.dumps(generate(args.root, **params), indent=4))
+
+
+if __name__ == "__main__":
+    main()
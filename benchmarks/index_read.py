@@ -0,0 +1,123 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark comparing the index against the working tree in-process versus spawning `git diff --name-only`."""
+
+# pylint: disable=C0413
+
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import subprocess
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from jupyterlab_simple_git.git import Git  # noqa
+from jupyterlab_simple_git.index import Index, parse_index  # noqa
+from jupyterlab_simple_git.utils import git_dir  # noqa
+
+
+async def incremental(root, path, repeats):
+    """Time `Git.current_changed_files` after touching a single tracked file.
+
+    Notes:
+        Requires `watchdog`. After an initial comparison, only files reported by the file system watcher are compared against the working tree.
+
+    Args:
+        root: repository path
+        path: subdirectory path
+        repeats: number of repetitions
+
+    Returns:
+        minimum elapsed time (in seconds) or `None` if file system events are unavailable
+
+    """
+    files = subprocess.run(['git', 'ls-files', '-z', '--', path], cwd=root, stdout=subprocess.PIPE, check=True).stdout.split(b'\x00')
+    git = Git(root)
+    try:
+        await git.current_changed_files(path)
+        if not git._watcher.available:  # pylint: disable=W0212
+            return None
+        out = []
+        for i in range(repeats):
+            os.utime(os.path.join(os.fsencode(root), files[i % len(files)]))
+            await asyncio.sleep(0.2)
+            start = time.perf_counter()
+            await git.current_changed_files(path)
+            out.append(time.perf_counter()-start)
+        return min(out)
+    finally:
+        await git.close()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('repo', help='repository path (e.g., a repository created by `generate.py`)')
+    parser.add_argument('--path', default='.', help='subdirectory path (default: .)')
+    parser.add_argument('--repeats', type=int, default=5, help='number of repetitions (default: 5)')
+    args = parser.parse_args()
+
+    root = os.path.realpath(args.repo)
+    path = os.path.join(git_dir(root), 'index')
+
+    def parse():
+        """Parse the index file."""
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_index(data)
+
+    def spawn():
+        """Spawn `git diff --name-only`."""
+        env = dict(os.environ, GIT_OPTIONAL_LOCKS='0')
+        subprocess.run(['git', 'diff', '--name-only', '-z', '--', args.path], cwd=root, env=env, stdout=subprocess.DEVNULL, check=True)
+
+    results = {
+        'parse_index': min(timeit.repeat(parse, number=1, repeat=args.repeats)),
+        'full_comparison': min(timeit.repeat(lambda: Index(root).changed_files(args.path), number=1, repeat=args.repeats)),
+        'incremental_comparison': asyncio.run(incremental(root, args.path, args.repeats)),
+        'git_diff': min(timeit.repeat(spawn, number=1, repeat=args.repeats))
+    }
+    result = Index(root).changed_files(args.path)
+    print(json.dumps({
+        'name': 'index_read',
+        'repository': root,
+        'entries': len(parse()['entries']),
+        'changed': len(result['changed']),
+        'stat_dirty': len(result['stat_dirty']),
+        'ambiguous': len(result['ambiguous']),
+        'seconds': results
+    }, indent=4))
+
+
+if __name__ == "__main__":
+    main()
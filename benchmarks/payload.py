@@ -0,0 +1,149 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark response payload sizes and serialization times for each supported media type and content coding."""
+
+# pylint: disable=C0413
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from jupyterlab_simple_git import encoding  # noqa
+from jupyterlab_simple_git.git import Git  # noqa
+from generate import PRESETS, generate  # noqa
+
+# Media types to benchmark (`application/json` is the default format):
+MEDIA_TYPES = ('application/json', 'application/vnd.simple-git.columnar+json', 'application/msgpack', 'application/vnd.simple-git.columnar+msgpack')
+
+# Content codings to benchmark (`None` denotes an uncompressed response):
+CODINGS = (None, 'gzip', 'br')
+
+
+async def responses(root, n):
+    """Return responses for list endpoints.
+
+    Args:
+        root: repository path
+        n: number of commits to request from `commit_history`
+
+    Returns:
+        `dict` mapping case names to responses
+
+    """
+    git = Git(root, history_index=False, maintenance_interval=0)
+    try:
+        return {
+            'untracked_files': await git.untracked_files(),
+            'status': await git.status(),
+            'commit_history': await git.commit_history(n=n)
+        }
+    finally:
+        await git.close()
+
+
+def measure(response, media_type, coding, repeats):
+    """Measure the size and serialization time of a response.
+
+    Args:
+        response: response `dict`
+        media_type: media type
+        coding: content coding or `None`
+        repeats: number of repetitions
+
+    Returns:
+        `dict` containing results
+
+    """
+    def run():
+        data = encoding.encode(response, media_type)
+        return data if coding is None else encoding.compress(data, coding)
+
+    return {
+        'bytes': len(run()),
+        'seconds': min(timeit.repeat(run, number=1, repeat=repeats))
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repo', help='path of an existing repository previously created by `generate.py` (default: generate a temporary repository)')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='shape of a generated repository (default: small)')
+    for key in PRESETS['small']:
+        parser.add_argument('--'+key, type=int, default=None, help='override the number of '+key+' in a generated repository')
+    parser.add_argument('--history', type=int, default=10000, help='number of commits to request from `commit_history` (default: 10000)')
+    parser.add_argument('--repeats', type=int, default=5, help='number of repetitions per case (default: 5)')
+    args = parser.parse_args()
+
+    tmp = None
+    if args.repo is None:
+        params = dict(PRESETS[args.preset])
+        for key in params:
+            if getattr(args, key) is not None:
+                params[key] = getattr(args, key)
+        tmp = tempfile.mkdtemp()
+        root = os.path.join(tmp, 'repo')
+        generate(root, **params)
+    else:
+        root = os.path.realpath(args.repo)
+    try:
+        cases = asyncio.run(responses(root, args.history))
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp)
+
+    results = {}
+    for name, response in cases.items():
+        if response['code'] != 0:
+            raise RuntimeError(response['message'])
+        results[name] = {}
+        for media_type in MEDIA_TYPES:
+            if encoding.MEDIA_TYPES[media_type][1] and encoding.msgpack is None:
+                continue
+            for coding in CODINGS:
+                if coding == 'br' and encoding.brotli is None:
+                    continue
+                results[name][media_type+('' if coding is None else ' ('+coding+')')] = measure(response, media_type, coding, args.repeats)
+
+    print(json.dumps({
+        'name': 'payload',
+        'repository': root,
+        'results': results
+    }, indent=4))
+
+
+if __name__ == "__main__":
+    main()
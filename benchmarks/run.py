@@ -0,0 +1,328 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark `Git` methods and request handlers against a (synthetic) repository."""
+
+# pylint: disable=C0413,W0212
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tornado.httpclient  # noqa
+import tornado.web  # noqa
+from jupyterlab_simple_git.handlers import add_handlers  # noqa
+from jupyterlab_simple_git.registry import Registry  # noqa
+from generate import PRESETS, file_path, generate  # noqa
+
+# Scratch directory (relative to the repository root) for files created by mutating benchmarks:
+SCRATCH = '.benchmark'
+
+
+def _git(root, *args):
+    """Synchronously run a Git command (e.g., for benchmark setup).
+
+    Args:
+        root: repository path
+        args: command arguments
+
+    """
+    subprocess.run(['git']+list(args), cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+
+
+def _write(root, path, contents='benchmark\n'):
+    """Write a file within a repository.
+
+    Args:
+        root: repository path
+        path: file path relative to the repository root
+        contents: file contents
+
+    """
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(contents)
+
+
+def cases(root, git):
+    """Return benchmark cases.
+
+    Notes:
+        Each case is a `tuple` containing a name, an optional setup function, a function returning a `Git` method awaitable, a description of the equivalent HTTP request, and an optional teardown function. Setup and teardown functions are not timed.
+
+        Read-only cases come first, such that files created by mutating cases do not affect read-only results.
+
+    Args:
+        root: repository path
+        git: `Git` instance
+
+    Returns:
+        `list` of cases
+
+    """
+    scratch = SCRATCH+'/file.txt'
+    cold = git._cache.invalidate
+
+    def stage():
+        _write(root, scratch)
+        _git(root, 'add', scratch)
+
+    def unstage():
+        _git(root, 'reset', '--quiet', '--', scratch)
+
+    def uncommit():
+        _git(root, 'reset', '--quiet', 'HEAD~1')
+
+    def restore_branch():
+        _git(root, 'checkout', '--quiet', 'main')
+        _git(root, 'branch', '-D', 'benchmark')
+
+    async def concurrent_status():
+        # E.g., several widgets refreshing at once:
+        return (await asyncio.gather(*[git.status() for _ in range(8)]))[0]
+
+    return [
+        # Read-only:
+        ('blame.cold', git._blames.clear, lambda: git.blame(file_path(0)), ('GET', '/simple_git/blame?path='+file_path(0), None), None),
+        ('blame.warm', None, lambda: git.blame(file_path(0)), ('GET', '/simple_git/blame?path='+file_path(0), None), None),
+        ('commit_count.path', None, lambda: git.commit_count(file_path(0)), ('GET', '/simple_git/commit_count?path='+file_path(0), None), None),
+        ('commit_history', None, lambda: git.commit_history(n=100), ('GET', '/simple_git/commit_history?n=100', None), None),
+        ('commit_history.path', None, lambda: git.commit_history(file_path(0), n=10), ('GET', '/simple_git/commit_history?n=10&path='+file_path(0), None), None),
+        ('current_branch', None, git.current_branch, ('GET', '/simple_git/current_branch', None), None),
+        ('current_changed_files.cold', cold, git.current_changed_files, ('GET', '/simple_git/current_changed_files', None), None),
+        ('current_changed_files.warm', None, git.current_changed_files, ('GET', '/simple_git/current_changed_files', None), None),
+        ('file_contents', None, lambda: git.file_contents(file_path(0)), ('GET', '/simple_git/file_contents?path='+file_path(0), None), None),
+        ('local_branches', None, git.local_branches, ('GET', '/simple_git/local_branches', None), None),
+        ('object_info', None, lambda: git.object_info('HEAD'), None, None),
+        ('run', None, lambda: git.run(['rev-parse', 'HEAD']), ('POST', '/simple_git/run', {'args': ['rev-parse', 'HEAD']}), None),
+        ('snapshot.cold', cold, git.snapshot, ('GET', '/simple_git/snapshot', None), None),
+        ('snapshot.warm', None, git.snapshot, ('GET', '/simple_git/snapshot', None), None),
+        ('status.cold', cold, git.status, ('GET', '/simple_git/status', None), None),
+        ('status.concurrent', cold, concurrent_status, None, None),
+        ('status.warm', None, git.status, ('GET', '/simple_git/status', None), None),
+        ('status_tree.cold', cold, git.status_tree, ('GET', '/simple_git/status_tree', None), None),
+        ('status_tree.warm', None, git.status_tree, ('GET', '/simple_git/status_tree', None), None),
+        ('untracked_files.cold', cold, git.untracked_files, ('GET', '/simple_git/untracked_files', None), None),
+        ('untracked_files.warm', None, git.untracked_files, ('GET', '/simple_git/untracked_files', None), None),
+
+        # Mutating:
+        ('add', lambda: _write(root, scratch), lambda: git.add(scratch), ('POST', '/simple_git/add', {'path': scratch}), unstage),
+        ('checkout_branch', None, lambda: git.checkout_branch('benchmark'), ('POST', '/simple_git/checkout_branch', {'branch': 'benchmark'}), restore_branch),
+        ('commit', stage, lambda: git.commit('Benchmark commit'), ('POST', '/simple_git/commit', {'subject': 'Benchmark commit'}), uncommit),
+        ('delete_branch', lambda: _git(root, 'branch', 'benchmark'), lambda: git.delete_branch('benchmark'), ('DELETE', '/simple_git/delete_branch?branch=benchmark', None), None),
+        ('delete_untracked_files', lambda: _write(root, SCRATCH+'/clean/file.txt'), lambda: git.delete_untracked_files(SCRATCH+'/clean'), ('DELETE', '/simple_git/delete_untracked_files?path='+SCRATCH+'/clean', None), None),
+        ('fetch', None, lambda: git.fetch('benchmark'), ('GET', '/simple_git/fetch?remote=benchmark', None), None),
+        ('init', None, git.init, ('POST', '/simple_git/init', {}), None),
+        ('push', None, lambda: git.push('benchmark', 'main'), ('POST', '/simple_git/push', {'remote': 'benchmark', 'branch': 'main'}), None),
+        ('reset', stage, lambda: git.reset(scratch), ('DELETE', '/simple_git/reset?path='+scratch, None), None)
+    ]
+
+
+def summarize(samples):
+    """Summarize timing samples.
+
+    Args:
+        samples: `list` of durations (in seconds)
+
+    Returns:
+        summary `dict`
+
+    """
+    return {
+        'repeats': len(samples),
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'max': max(samples)
+    }
+
+
+async def _time(setup, call, teardown, repeats):
+    """Time an awaitable.
+
+    Args:
+        setup: setup function (optional)
+        call: function returning an awaitable
+        teardown: teardown function (optional)
+        repeats: number of repetitions
+
+    Returns:
+        A `tuple` containing a `list` of durations and a boolean indicating whether every call succeeded.
+
+    """
+    samples = []
+    ok = True
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        res = await call()
+        samples.append(time.perf_counter() - start)
+        ok = ok and res
+        if teardown is not None:
+            teardown()
+    return samples, ok
+
+
+async def bench(root, repeats):
+    """Benchmark `Git` methods and request handlers.
+
+    Args:
+        root: repository path
+        repeats: number of repetitions per case
+
+    Returns:
+        results `dict`
+
+    """
+    app = tornado.web.Application([], base_url='/', xsrf_cookies=False, disable_check_xsrf=True, token='', password='')
+    registry = Registry(root)
+    app.settings['simple_git'] = registry
+    add_handlers(app)
+    server = app.listen(0, '127.0.0.1')
+    port = list(server._sockets.values())[0].getsockname()[1]
+    client = tornado.httpclient.AsyncHTTPClient()
+    git = registry.acquire('.')
+
+    _git(root, 'remote', 'add', 'benchmark', '.')
+    results = {}
+    try:
+        for name, setup, method, request, teardown in cases(root, git):
+            async def call_method(method=method):
+                return (await method())['code'] == 0
+
+            samples, ok = await _time(setup, call_method, teardown, repeats)
+            results['git.'+name] = dict(summarize(samples), ok=ok)
+            print('git.%s: %.6fs' % (name, results['git.'+name]['median']), file=sys.stderr)
+
+            if request is None:
+                continue
+
+            verb, url, body = request
+
+            async def call_handler(verb=verb, url=url, body=body):
+                res = await client.fetch(
+                    'http://127.0.0.1:%d%s' % (port, url),
+                    method=verb,
+                    body=None if body is None else json.dumps(body),
+                    raise_error=False,
+                    allow_nonstandard_methods=True,
+                    request_timeout=3600
+                )
+                try:
+                    return res.code == 200 and json.loads(res.body).get('code', 0) == 0
+                except ValueError:
+                    return False
+
+            samples, ok = await _time(setup, call_handler, teardown, repeats)
+            results['handler.'+name] = dict(summarize(samples), ok=ok)
+            print('handler.%s: %.6fs' % (name, results['handler.'+name]['median']), file=sys.stderr)
+    finally:
+        _git(root, 'remote', 'remove', 'benchmark')
+        shutil.rmtree(os.path.join(root, SCRATCH), ignore_errors=True)
+        server.stop()
+        registry.close()
+        await asyncio.sleep(0.1)
+
+    return results
+
+
+def _version(cmd, cwd=None):
+    """Return the output of a command or `None` if the command fails.
+
+    Args:
+        cmd: command to run
+        cwd: working directory (optional)
+
+    Returns:
+        command output
+
+    """
+    try:
+        return subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout.decode('utf8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repo', help='path of an existing repository previously created by `generate.py` (default: generate a temporary repository)')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='shape of a generated repository (default: small)')
+    parser.add_argument('--repeats', type=int, default=5, help='number of repetitions per case (default: 5)')
+    parser.add_argument('--output', help='output file path (default: stdout)')
+    args = parser.parse_args()
+
+    tmp = None
+    if args.repo is None:
+        tmp = tempfile.mkdtemp()
+        root = os.path.join(tmp, 'repo')
+        print('Generating repository...', file=sys.stderr)
+        repository = generate(root, **PRESETS[args.preset])
+    else:
+        root = os.path.realpath(args.repo)
+        repository = {}
+    repository['path'] = root
+
+    try:
+        results = asyncio.run(bench(root, args.repeats))
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    out = {
+        'commit': _version(['git', 'rev-parse', 'HEAD'], os.path.dirname(os.path.abspath(__file__))),
+        'timestamp': datetime.datetime.utcnow().isoformat()+'Z',
+        'python': platform.python_version(),
+        'git': _version(['git', '--version']),
+        'platform': platform.platform(),
+        'repository': repository,
+        'results': results
+    }
+    out = json.dumps(out, indent=4, sort_keys=True)
+    if args.output is None:
+        print(out)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(out+'\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Benchmark parsing `git status --porcelain=v2 -z` output."""
+
+# pylint: disable=C0413
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from jupyterlab_simple_git.status import parse_status  # noqa
+
+OID = '0123456789abcdef0123456789abcdef01234567'
+
+
+def generate(n):
+    """Generate synthetic `git status --porcelain=v2 -z` output.
+
+    Args:
+        n: number of entries
+
+    Returns:
+        command results
+
+    """
+    records = ['# branch.oid '+OID, '# branch.head main']
+    for i in range(n):
+        path = 'src/dir_%d/sub dir/file -> %d é.py' % (i % 1000, i)
+        kind = i % 10
+        if kind < 5:
+            records.append('1 .M N... 100644 100644 100644 %s %s %s' % (OID, OID, path))
+        elif kind < 7:
+            records.append('1 M. N... 100644 100644 100644 %s %s %s' % (OID, OID, path))
+        elif kind == 7:
+            records.append('2 R. N... 100644 100644 100644 %s %s R87 %s' % (OID, OID, path))
+            records.append('old/'+path)
+        elif kind == 8:
+            records.append('u UU N... 100644 100644 100644 100644 %s %s %s %s' % (OID, OID, OID, path))
+        else:
+            records.append('? '+path)
+
+    return '\x00'.join(records) + '\x00'
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=100000, help='number of entries (default: 100000)')
+    parser.add_argument('--repeats', type=int, default=5, help='number of repetitions (default: 5)')
+    args = parser.parse_args()
+
+    data = generate(args.n)
+    elapsed = min(timeit.repeat(lambda: parse_status(data), number=1, repeat=args.repeats))
+    size = len(data.encode('utf8'))
+    print(json.dumps({
+        'name': 'parse_status',
+        'entries': args.n,
+        'bytes': size,
+        'seconds': elapsed,
+        'entries_per_second': args.n / elapsed,
+        'megabytes_per_second': size / elapsed / 1e6
+    }, indent=4))
+
+
+if __name__ == "__main__":
+    main()
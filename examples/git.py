@@ -31,6 +31,7 @@
 
 # pylint: disable=C0413
 
+import asyncio
 import os
 import sys
 import json
@@ -39,80 +40,80 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from jupyterlab_simple_git.git import Git  # noqa
 
 
-def main():
+async def main():
     """Run the script."""
     cwd = os.getcwd()
     git = Git(cwd)
 
     # Run a git command:
-    res = git.run(args=['help'])
+    res = await git.run(args=['help'])
     print(json.dumps(res, indent=4))
 
     # Attempt to initialize (or reinitialize) a Git repository:
-    res = git.init()
+    res = await git.init()
     print(json.dumps(res, indent=4))
 
     # Get the current branch:
-    res = git.current_branch()
+    res = await git.current_branch()
     print(json.dumps(res, indent=4))
 
     # Get the current status:
-    res = git.status()
+    res = await git.status()
     print(json.dumps(res, indent=4))
 
     # Get the list of current changed files:
-    res = git.current_changed_files()
+    res = await git.current_changed_files()
     print(json.dumps(res, indent=4))
 
     # Get the list of untracked files:
-    res = git.untracked_files()
+    res = await git.untracked_files()
     print(json.dumps(res, indent=4))
 
     # Get the commit history:
-    res = git.commit_history(n=2)  # last two commits
+    res = await git.commit_history(n=2)  # last two commits
     print(json.dumps(res, indent=4))
 
     # Add this file to the working tree:
-    res = git.add(__file__)
+    res = await git.add(__file__)
     print(json.dumps(res, indent=4))
 
     # Remove this file from the working tree:
-    res = git.reset(__file__)
+    res = await git.reset(__file__)
     print(json.dumps(res, indent=4))
 
     # Checkout the current branch (no-op):
-    res = git.checkout_branch(git.current_branch()['branch'])
+    res = await git.checkout_branch((await git.current_branch())['branch'])
     print(json.dumps(res, indent=4))
 
     # Attempt to delete a non-existent branch:
-    res = git.delete_branch('foo_bar_biz_bap')
+    res = await git.delete_branch('foo_bar_biz_bap')
     print(json.dumps(res, indent=4))
 
     # Checkout a new branch:
-    branch = git.current_branch()['branch']
-    res = git.checkout_branch('foo_bar_biz_bap')
+    branch = (await git.current_branch())['branch']
+    res = await git.checkout_branch('foo_bar_biz_bap')
     print(json.dumps(res, indent=4))
 
     # Switch back to the previous branch:
-    res = git.checkout_branch(branch)
+    res = await git.checkout_branch(branch)
     print(json.dumps(res, indent=4))
 
     # Delete the new branch:
-    res = git.delete_branch('foo_bar_biz_bap')
+    res = await git.delete_branch('foo_bar_biz_bap')
     print(json.dumps(res, indent=4))
 
     # List local branches:
-    res = git.local_branches()
+    res = await git.local_branches()
     print(json.dumps(res, indent=4))
 
     # Fetch remote objects and refs:
-    res = git.fetch()
+    res = await git.fetch()
     print(json.dumps(res, indent=4))
 
     # Attempt to push local changes for the current branch to a non-existent origin:
-    res = git.push('foo-bar-biz-bap')
+    res = await git.push('foo-bar-biz-bap')
     print(json.dumps(res, indent=4))
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -29,10 +29,9 @@
 
 """Initialize the Jupyter server extension."""
 
-# pylint: disable=W0511
-
+from jupyterlab_simple_git.config import SimpleGit
 from jupyterlab_simple_git.handlers import add_handlers
-from jupyterlab_simple_git.git import Git
+from jupyterlab_simple_git.registry import Registry
 
 
 def _jupyter_server_extension_paths():
@@ -62,7 +61,24 @@ def load_jupyter_server_extension(nbapp):
 
     """
     root = nbapp.web_app.settings.get('server_root_dir')
+    config = SimpleGit(parent=nbapp)
+
+    registry = Registry(
+        root,
+        config.max_repositories,
+        config.idle_timeout,
+        max_queue=config.max_queue,
+        network_timeout=config.network_timeout,
+        prefetch_interval=config.prefetch_interval,
+        diff_max_bytes=config.diff_max_bytes,
+        diff_max_lines=config.diff_max_lines,
+        diff_max_file_size=config.diff_max_file_size,
+        diffstat_cache_size=config.diffstat_cache_size,
+        history_index=config.history_index,
+        maintenance_interval=config.maintenance_interval,
+        blame_cache_size=config.blame_cache_size
+    )
+    registry.start()
 
-    # TODO: we assume that the root directory is (or will be) a Git repository. Should we account for it being otherwise?
-    nbapp.web_app.settings['simple_git'] = Git(root)
+    nbapp.web_app.settings['simple_git'] = registry
     add_handlers(nbapp.web_app)
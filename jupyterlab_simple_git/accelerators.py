@@ -0,0 +1,139 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Detect repository accelerators (e.g., the commit-graph and the untracked cache)."""
+
+import os
+from jupyterlab_simple_git.utils import common_dir
+
+# Boolean configuration settings (and their default values) which enable each accelerator:
+ACCELERATORS = {
+    'commit_graph': (('core.commitGraph', True), ('fetch.writeCommitGraph', False), ('maintenance.commit-graph.enabled', False)),
+    'multi_pack_index': (('core.multiPackIndex', True), ('maintenance.incremental-repack.enabled', False)),
+    'untracked_cache': (('core.untrackedCache', False),),
+    'fsmonitor': (('core.fsmonitor', False),),
+    'many_files': (('feature.manyFiles', False),)
+}
+
+# Values which Git interprets as boolean true:
+TRUE_VALUES = ('true', 'yes', 'on', '1')
+
+
+def parse_config(data):
+    """Parse `git config --list -z` output.
+
+    Notes:
+        Section and variable names are case-insensitive and are, thus, returned in lowercase. If a variable is set multiple times (e.g., in both global and repository configuration), the last value takes precedence. Variables set without a value (which Git interprets as boolean true) have the value `None`.
+
+    Args:
+        data: command results
+
+    Returns:
+        `dict` mapping variable names to values
+
+    """
+    config = {}
+    for record in data.split('\x00'):
+        if record == '':
+            continue
+        key, sep, value = record.partition('\n')
+        section, _, name = key.rpartition('.')
+        first, dot, subsection = section.partition('.')
+        config[first.lower()+dot+subsection+'.'+name.lower()] = value if sep else None
+    return config
+
+
+def is_enabled(config, key, default=False):
+    """Return a boolean indicating whether a boolean configuration setting is enabled.
+
+    Args:
+        config: configuration `dict` (see `parse_config`)
+        key: variable name (e.g., `core.commitGraph`)
+        default: default value if the variable is not set (default: False)
+
+    Returns:
+        boolean
+
+    """
+    key = key.lower()
+    if key not in config:
+        if key == 'core.untrackedcache':
+            # `feature.manyFiles` changes the default:
+            return is_enabled(config, 'feature.manyFiles')
+        return default
+    value = config[key]
+    if value is None:
+        return True
+    if key == 'core.fsmonitor' and value.lower() not in ('false', 'no', 'off', '0', ''):
+        # A path to a file system monitor hook:
+        return True
+    return value.lower() in TRUE_VALUES
+
+
+def detect(gitdir, config, index, fsmonitor_supported):
+    """Detect which accelerators are enabled and present.
+
+    Notes:
+        The returned `dict` maps each accelerator name to a `dict` having the following format:
+
+        {
+            'supported': bool,    # boolean indicating whether the accelerator is supported by the installed Git
+            'enabled': bool,      # boolean indicating whether configuration settings enable the accelerator (and, for the commit-graph and multi-pack-index, its maintenance)
+            'present': bool       # boolean indicating whether the accelerator's data structure exists (e.g., the commit-graph file has been written)
+        }
+
+        For the file system monitor, `present` indicates whether the index records file system monitor state. For `many_files`, `present` indicates whether the index uses version 4 (i.e., path prefix compression).
+
+    Args:
+        gitdir: Git directory
+        config: configuration `dict` (see `parse_config`)
+        index: loaded index (see `Index.load`) or `None` if unavailable
+        fsmonitor_supported: boolean indicating whether the installed Git includes the built-in file system monitor
+
+    Returns:
+        `dict` describing accelerators
+
+    """
+    objects = os.path.join(common_dir(gitdir), 'objects')
+    extensions = {} if index is None else index['extensions']
+    present = {
+        'commit_graph': os.path.isfile(os.path.join(objects, 'info', 'commit-graph')) or os.path.isfile(os.path.join(objects, 'info', 'commit-graphs', 'commit-graph-chain')),
+        'multi_pack_index': os.path.isfile(os.path.join(objects, 'pack', 'multi-pack-index')),
+        'untracked_cache': 'UNTR' in extensions,
+        'fsmonitor': 'FSMN' in extensions,
+        'many_files': index is not None and index['version'] == 4
+    }
+    results = {}
+    for name, settings in ACCELERATORS.items():
+        results[name] = {
+            'supported': fsmonitor_supported if name == 'fsmonitor' else True,
+            'enabled': all(is_enabled(config, key, default) for key, default in settings),
+            'present': present[name]
+        }
+    return results
@@ -0,0 +1,229 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Base handler classes for executing Git commands and returning results to the frontend."""
+
+# pylint: disable=W0223
+
+import asyncio
+import json
+import sys
+import tornado.iostream
+import tornado.log
+import tornado.web
+from notebook.base.handlers import APIHandler
+from jupyterlab_simple_git.encoding import EXECUTOR_SIZE, MEDIA_TYPES, encode_response, estimate_size, negotiate_encoding, negotiate_type
+
+
+class BaseHandler(APIHandler):
+    """Base handler class.
+
+    Notes:
+        Each handler accepts an optional `repo` query parameter specifying a path (relative to the server root directory) located within the repository on which to operate (default: '.'). Any other paths are relative to the repository root.
+
+        JSON object responses are encoded according to the request `Accept` header (see `encoding.MEDIA_TYPES`), thus allowing clients to opt into the columnar layout (`application/vnd.simple-git.columnar+json`), in which key names are sent once per list rather than once per list entry, and/or MessagePack serialization (`application/msgpack`, if the `msgpack` package is installed). Responses are compressed according to the `Accept-Encoding` request header using gzip or Brotli (if the `brotli` package is installed).
+
+        Small responses are encoded and compressed on the event loop. Responses whose estimated size is at least `encoding.EXECUTOR_SIZE` are encoded and compressed in an executor, such that large responses (e.g., untracked files in a large repository) do not block other requests.
+
+    Attributes:
+        git: Git command executer
+
+    """
+
+    async def _encode(self, chunk, media_type, coding):
+        """Encode and compress a response body in an executor and finish a response.
+
+        Args:
+            chunk: response body
+            media_type: negotiated media type
+            coding: negotiated content coding (or `None`)
+
+        """
+        try:
+            data, coding = await asyncio.get_event_loop().run_in_executor(None, encode_response, chunk, media_type, coding)
+        except (TypeError, ValueError):
+            tornado.log.app_log.error('Unable to encode response', exc_info=True)
+            self._encoding = None
+            self.send_error(500, exc_info=sys.exc_info())
+            return
+        self._encoding = None
+        try:
+            await self._send_encoded(data, media_type, coding)
+        except tornado.iostream.StreamClosedError:
+            # The client disconnected while the response body was being encoded:
+            pass
+
+    def _send_encoded(self, data, media_type, coding):
+        """Finish a response having an encoded response body.
+
+        Args:
+            data: encoded response body
+            media_type: media type
+            coding: applied content coding (or `None`)
+
+        Returns:
+            A `Future` which resolves once a response has been sent.
+
+        """
+        if coding is not None:
+            self.set_header('Content-Encoding', coding)
+
+        # Bypass `APIHandler.finish`, which forces a JSON content type:
+        self.update_api_activity()
+        self.set_header('Content-Type', media_type if MEDIA_TYPES[media_type][1] else media_type+'; charset=UTF-8')
+        return tornado.web.RequestHandler.finish(self, data)
+
+    def finish(self, chunk=None):
+        """Finish a response, encoding and compressing a JSON object according to the request headers.
+
+        Args:
+            chunk: response body (optional)
+
+        Returns:
+            A `Future` which resolves once a response has been sent.
+
+        """
+        encoding = getattr(self, '_encoding', None)
+        if encoding is not None and chunk is None:
+            # Tornado finishes a response once a handler method returns, which may occur while a response body is being encoded:
+            return encoding
+        if not isinstance(chunk, dict):
+            return super().finish(chunk)
+
+        self.set_header('Vary', 'Accept, Accept-Encoding')
+        media_type = negotiate_type(self.request.headers.get('Accept'))
+        coding = negotiate_encoding(self.request.headers.get('Accept-Encoding'))
+        if estimate_size(chunk, EXECUTOR_SIZE) >= EXECUTOR_SIZE:
+            self._encoding = asyncio.ensure_future(self._encode(chunk, media_type, coding))
+            return self._encoding
+        if media_type == 'application/json' and coding is None:
+            return super().finish(chunk)
+        data, coding = encode_response(chunk, media_type, coding)
+        return self._send_encoded(data, media_type, coding)
+
+    @property
+    def git(self):
+        """Return the Git command executor for the requested repository.
+
+        Notes:
+            The executor is acquired upon first access and released once the request finishes, such that the executor is not closed while in use.
+
+        """
+        git = getattr(self, '_git', None)
+        if git is None:
+            git = self._git = self.settings['simple_git'].acquire(self.get_query_argument('repo', default='.'))
+        return git
+
+    def on_finish(self):
+        """Release the Git command executor and record request metrics."""
+        registry = self.settings['simple_git']
+        git = getattr(self, '_git', None)
+        if git is not None:
+            self._git = None
+            registry.release(git)
+        metrics = registry.metrics
+        handler = type(self).__name__
+        metrics.inc('simple_git_requests_total', handler=handler, code=self.get_status())
+        metrics.observe('simple_git_request_duration_seconds', self.request.request_time(), handler=handler)
+
+
+class StreamingHandler(BaseHandler):
+    """Base handler class for operations which may stream intermediate results (e.g., progress updates or diff chunks).
+
+    Notes:
+        If a client disconnects before an operation completes, the operation is cancelled, and the underlying Git processes are killed.
+
+        If a client accepts `text/event-stream` responses, intermediate results are streamed as server-sent events (named by the `event` attribute) while an operation runs, each having JSON-encoded data. Upon completion, the server sends a `result` event whose data is the JSON object which would otherwise have been returned (including errors, such as timeouts, which would otherwise have been returned as HTTP status codes).
+
+    Attributes:
+        event: name of server-sent events carrying intermediate results
+        keyword: name of the keyword argument via which an operation accepts a callback for intermediate results
+
+    """
+
+    event = 'progress'
+    keyword = 'progress'
+
+    def initialize(self):
+        """Initialize a handler instance."""
+        self._task = None
+
+    def _send(self, data):
+        """Send an intermediate result to a client.
+
+        Args:
+            data: JSON-serializable intermediate result
+
+        """
+        self.write('event: '+self.event+'\ndata: '+json.dumps(data)+'\n\n')
+        self.flush()
+
+    def on_connection_close(self):
+        """Cancel a running operation when a client disconnects."""
+        if self._task is not None:
+            self._task.cancel()
+
+    async def respond(self, method, *args, **kwargs):
+        """Run an operation and respond with its results.
+
+        Args:
+            method: `Git` coroutine method which accepts a callback for intermediate results via the `keyword` keyword argument
+            args: method arguments
+            kwargs: method keyword arguments
+
+        """
+        stream = 'text/event-stream' in self.request.headers.get('Accept', '')
+        if stream:
+            self.set_header('Content-Type', 'text/event-stream')
+            self.set_header('Cache-Control', 'no-cache')
+
+            # Send headers immediately (`APIHandler.finish` would otherwise replace the content type):
+            self.flush()
+
+            kwargs[self.keyword] = self._send
+
+        self._task = asyncio.ensure_future(method(*args, **kwargs))
+        try:
+            res = await self._task
+        except asyncio.CancelledError:
+            # The client disconnected, so there is no one to respond to:
+            return
+        except tornado.web.HTTPError as err:
+            if not stream:
+                raise
+            res = {
+                'code': err.status_code,
+                'message': err.log_message
+            }
+
+        if stream:
+            self.write('event: result\ndata: '+json.dumps(res)+'\n\n')
+            self.finish()
+        else:
+            self.finish(res)
@@ -0,0 +1,183 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Parse `git blame --incremental --porcelain` output."""
+
+# Escape sequences which Git uses when quoting paths:
+ESCAPES = {
+    ord('a'): 7,
+    ord('b'): 8,
+    ord('t'): 9,
+    ord('n'): 10,
+    ord('v'): 11,
+    ord('f'): 12,
+    ord('r'): 13,
+    ord('"'): 34,
+    ord('\\'): 92
+}
+
+
+def unquote(path):
+    """Unquote a path which Git has quoted (e.g., a path containing double quotes or control characters).
+
+    Args:
+        path: path as output by Git
+
+    Returns:
+        unquoted path
+
+    """
+    if len(path) < 2 or path[0] != '"' or path[-1] != '"':
+        return path
+    data = path[1:-1].encode('utf8')
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        c = data[i]
+        if c == 92 and i+1 < len(data):
+            c = data[i+1]
+            if c in ESCAPES:
+                out.append(ESCAPES[c])
+                i += 2
+                continue
+            if 48 <= c <= 51:
+                # Octal escape sequence for a byte which is not printable (e.g., part of a multi-byte character):
+                out.append(int(data[i+1:i+4], 8))
+                i += 4
+                continue
+        out.append(c)
+        i += 1
+    return out.decode('utf8', 'replace')
+
+
+class BlameOutput():
+    """Class for incrementally parsing `git blame --incremental --porcelain` output.
+
+    Notes:
+        Git emits a group of lines for each range of consecutive lines attributed to the same commit, in the order in which ranges are resolved (i.e., not in line order). Each group begins with a header (`<hash> <original line> <final line> <number of lines>`), followed by commit metadata (only for the first group attributed to each commit), and ends with a `filename` line.
+
+        Upon completing a group, the range is written as a `dict` having the following format:
+
+        {
+            'ranges': [
+                {
+                    'commit': string,         # commit hash
+                    'line': int,              # first line number in the final file (1-based)
+                    'orig_line': int,         # first line number in the file as of the commit (1-based)
+                    'lines': int,             # number of lines
+                    'path': string            # file path as of the commit
+                }
+            ],
+            'commits': dict                   # commits which have not been previously written, keyed by commit hash
+        }
+
+        where each commit is a `dict` having the following format:
+
+        {
+            'author': string,         # author name
+            'email': string,          # author email
+            'time': int,              # author timestamp (seconds since the Unix epoch)
+            'summary': string,        # commit subject
+            'boundary': bool          # boolean indicating whether the commit is a boundary commit (e.g., the root commit)
+        }
+
+    Attributes:
+        ranges: list of parsed ranges
+        commits: `dict` of parsed commits
+
+    """
+
+    def __init__(self, write=None):
+        """Initialize a class instance.
+
+        Args:
+            write: function which is provided each parsed range (optional)
+
+        """
+        self.ranges = []
+        self.commits = {}
+        self._write = write
+        self._range = None
+        self._commit = None
+
+    def feed(self, line):
+        """Process a single line of output.
+
+        Args:
+            line: string
+
+        """
+        if self._range is None:
+            fields = line.split(' ')
+            if len(fields) < 4:
+                return
+            self._range = {
+                'commit': fields[0],
+                'line': int(fields[2]),
+                'orig_line': int(fields[1]),
+                'lines': int(fields[3])
+            }
+            if fields[0] not in self.commits:
+                self._commit = {
+                    'author': '',
+                    'email': '',
+                    'time': 0,
+                    'summary': '',
+                    'boundary': False
+                }
+            return
+
+        key, _, value = line.partition(' ')
+        commit = self._commit
+        if key == 'filename':
+            rng = self._range
+            rng['path'] = unquote(value)
+            self._range = None
+            self._commit = None
+            self.ranges.append(rng)
+            commits = {}
+            if commit is not None:
+                self.commits[rng['commit']] = commits[rng['commit']] = commit
+            if self._write is not None:
+                self._write({
+                    'ranges': [rng],
+                    'commits': commits
+                })
+        elif commit is None:
+            return
+        elif key == 'author':
+            commit['author'] = value
+        elif key == 'author-mail':
+            commit['email'] = value[1:-1] if value.startswith('<') and value.endswith('>') else value
+        elif key == 'author-time':
+            commit['time'] = int(value)
+        elif key == 'summary':
+            commit['summary'] = value
+        elif key == 'boundary':
+            commit['boundary'] = True
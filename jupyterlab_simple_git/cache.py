@@ -0,0 +1,173 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Cache command results."""
+
+import collections
+
+
+class StatusCache():
+    """Class for caching working tree status results.
+
+    Notes:
+        Cached results are keyed by method and pathspec and are tagged with the watcher generation observed before a result was computed. A cached result is only returned if no relevant file system event has occurred since. Accordingly, a result computed while the repository was changing is never returned.
+
+        If a watcher is unable to deliver file system events, nothing is cached.
+
+        Cached results are shared between callers and must not be mutated.
+
+    Attributes:
+        watcher: repository watcher
+
+    """
+
+    def __init__(self, watcher):
+        """Initialize a class instance."""
+        self.watcher = watcher
+        self._entries = {}
+        self._offset = 0
+
+    @property
+    def generation(self):
+        """Return the current cache generation."""
+        return self.watcher.generation + self._offset
+
+    def get(self, key):
+        """Return a cached result.
+
+        Args:
+            key: cache key
+
+        Returns:
+            A cached result or `None` if a result is either not cached or stale.
+
+        """
+        if not self.watcher.start():
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self.generation:
+            return None
+        return entry[1]
+
+    def invalidate(self):
+        """Invalidate all cached results.
+
+        Notes:
+            Mutating commands invalidate the cache explicitly, as the corresponding file system events may be delivered only after a command has returned.
+
+        """
+        self._offset += 1
+        self._entries.clear()
+
+    def set(self, key, generation, value):
+        """Cache a result.
+
+        Args:
+            key: cache key
+            generation: cache generation observed before the result was computed
+            value: result
+
+        """
+        if self.watcher.available and generation == self.generation:
+            self._entries[key] = (generation, value)
+
+
+class LRUCache():
+    """Class for caching results which never become stale, subject to a size limit.
+
+    Notes:
+        Results must be keyed by immutable inputs (e.g., object hashes), as cached results are never invalidated. Instead, once the total weight of cached results exceeds `capacity`, the least recently used results are evicted.
+
+        Cached results are shared between callers and must not be mutated.
+
+    Attributes:
+        capacity: maximum total weight of cached results
+        weight: function which returns the weight of a result (default: each result has unit weight)
+        size: total weight of cached results
+
+    """
+
+    def __init__(self, capacity, weight=None):
+        """Initialize a class instance."""
+        self.capacity = capacity
+        self.weight = weight or (lambda value: 1)
+        self.size = 0
+        self._entries = collections.OrderedDict()
+
+    def __contains__(self, key):
+        """Return a boolean indicating whether a result is cached."""
+        return key in self._entries
+
+    def __len__(self):
+        """Return the number of cached results."""
+        return len(self._entries)
+
+    def clear(self):
+        """Evict every cached result."""
+        self._entries.clear()
+        self.size = 0
+
+    def get(self, key):
+        """Return a cached result.
+
+        Args:
+            key: cache key
+
+        Returns:
+            A cached result or `None` if a result is not cached.
+
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, value):
+        """Cache a result.
+
+        Notes:
+            A result whose weight exceeds the capacity is not cached.
+
+        Args:
+            key: cache key
+            value: result
+
+        """
+        weight = self.weight(value)
+        if weight > self.capacity:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[0]
+        self._entries[key] = (weight, value)
+        self.size += weight
+        while self.size > self.capacity:
+            _, (w, _) = self._entries.popitem(last=False)
+            self.size -= w
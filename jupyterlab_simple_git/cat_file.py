@@ -0,0 +1,214 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Read Git objects through a long-lived `git cat-file` process."""
+
+import asyncio
+import collections
+
+
+class CatFileError(Exception):
+    """Exception raised when a `git cat-file` process exits unexpectedly."""
+
+
+class CatFile():
+    """Class for reading Git objects through a long-lived `git cat-file --batch` (or `--batch-check`) process.
+
+    Notes:
+        Requests are written to the standard input of a single child process and responses are read back in the order in which requests were written. Accordingly, concurrent callers share one process without spawning a new process per lookup.
+
+        If the child process exits unexpectedly, pending requests are retried once against a fresh process. If the process has not serviced a request for `idle_timeout` seconds, the process is shut down and is restarted on the next request.
+
+    Attributes:
+        root: canonical file system path of a Git repository
+        batch_check: boolean indicating whether to only resolve object information (and not object contents)
+        idle_timeout: number of seconds after which an idle process is shut down
+
+    """
+
+    def __init__(self, root, batch_check=False, idle_timeout=60):
+        """Initialize a class instance."""
+        self.root = root
+        self.batch_check = batch_check
+        self.idle_timeout = idle_timeout
+        self._proc = None
+        self._reader = None
+        self._pending = collections.deque()
+        self._lock = asyncio.Lock()
+        self._timer = None
+
+    async def _read_loop(self, proc):
+        """Read responses from a child process and resolve pending requests.
+
+        Args:
+            proc: child process
+
+        """
+        try:
+            while True:
+                header = await proc.stdout.readline()
+                if header == b'':
+                    raise CatFileError('git cat-file exited unexpectedly')
+
+                fields = header.rstrip(b'\n').split(b' ')
+                if len(fields) == 3 and fields[2].isdigit():
+                    size = int(fields[2])
+                    info = {
+                        'oid': fields[0].decode('ascii'),
+                        'type': fields[1].decode('ascii'),
+                        'size': size
+                    }
+                    if not self.batch_check:
+                        info['contents'] = (await proc.stdout.readexactly(size+1))[:-1]
+                else:
+                    # `<object> missing` or `<object> ambiguous`:
+                    info = None
+
+                fut = self._pending.popleft()
+                if not fut.done():
+                    fut.set_result(info)
+                if not self._pending:
+                    self._schedule_shutdown()
+        except (CatFileError, asyncio.IncompleteReadError, ConnectionError) as err:
+            if proc is self._proc:
+                self._proc = None
+            while self._pending:
+                fut = self._pending.popleft()
+                if not fut.done():
+                    fut.set_exception(CatFileError(str(err)))
+
+    def _schedule_shutdown(self):
+        """Schedule shutting down the child process after a period of inactivity."""
+        if self._timer is not None:
+            self._timer.cancel()
+        loop = asyncio.get_event_loop()
+        self._timer = loop.call_later(self.idle_timeout, lambda: asyncio.ensure_future(self._shutdown_if_idle()))
+
+    async def _shutdown_if_idle(self):
+        """Shut down the child process if no requests are pending."""
+        async with self._lock:
+            if not self._pending:
+                await self.close()
+
+    async def _start(self):
+        """Start a child process.
+
+        Returns:
+            child process
+
+        """
+        cmd = ['git', 'cat-file', '--batch-check' if self.batch_check else '--batch']
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=self.root,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._proc = proc
+        self._reader = asyncio.ensure_future(self._read_loop(proc))
+        return proc
+
+    async def _request(self, obj):
+        """Submit a request to the child process.
+
+        Args:
+            obj: object name
+
+        Returns:
+            A `dict` containing object information or `None` if an object does not exist.
+
+        """
+        async with self._lock:
+            proc = self._proc
+            if proc is None or proc.returncode is not None:
+                proc = await self._start()
+
+            fut = asyncio.get_event_loop().create_future()
+            self._pending.append(fut)
+            proc.stdin.write(obj.encode('utf8') + b'\n')
+            try:
+                await proc.stdin.drain()
+            except ConnectionError as err:
+                if not fut.done():
+                    fut.set_exception(CatFileError(str(err)))
+
+        return await fut
+
+    async def close(self):
+        """Shut down the child process."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        proc = self._proc
+        self._proc = None
+        if proc is None:
+            return
+        if proc.returncode is None:
+            proc.stdin.close()
+            try:
+                await asyncio.wait_for(proc.wait(), 5)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+
+        if self._reader is not None:
+            await self._reader
+            self._reader = None
+
+    async def read(self, obj):
+        """Read a Git object.
+
+        Args:
+            obj: object name (e.g., an object hash, `HEAD:README.md`, `master^{tree}`, etc)
+
+        Returns:
+            If an object exists, a `dict` having the following format:
+
+            {
+                'oid': string,        # object hash
+                'type': string,       # object type
+                'size': int,          # object size in bytes
+                'contents': bytes     # object contents (omitted for `--batch-check` processes)
+            }
+
+            Otherwise, `None`.
+
+        Raises:
+            CatFileError: unable to read an object after restarting the child process
+
+        """
+        if '\n' in obj:
+            return None
+        try:
+            return await self._request(obj)
+        except CatFileError:
+            # Retry once against a fresh process:
+            return await self._request(obj)
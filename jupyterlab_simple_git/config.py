@@ -0,0 +1,114 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Jupyter server extension configuration."""
+
+from traitlets import Bool, Float, Integer
+from traitlets.config import Configurable
+
+
+class SimpleGit(Configurable):
+    """Configuration for the Jupyter server extension.
+
+    Notes:
+        Options may be set in a Jupyter configuration file (e.g., `c.SimpleGit.max_repositories = 32`).
+
+    """
+
+    max_repositories = Integer(
+        16,
+        config=True,
+        help='Maximum number of repositories for which to retain state (e.g., caches, child processes, and file system watchers).'
+    )
+
+    idle_timeout = Float(
+        600.0,
+        config=True,
+        help='Number of seconds after which state retained for an unused repository is released.'
+    )
+
+    max_queue = Integer(
+        64,
+        config=True,
+        help='Maximum number of Git commands waiting to run against a single repository. Additional commands are rejected.'
+    )
+
+    network_timeout = Float(
+        120.0,
+        config=True,
+        help='Number of seconds a network operation (e.g., fetch or push) may run without reporting progress before being terminated. A value of 0 disables the timeout.'
+    )
+
+    prefetch_interval = Float(
+        0.0,
+        config=True,
+        help='Number of seconds between background fetches of the default remote for each retained repository, thus keeping ahead/behind counts current. Intervals are randomly perturbed and back off after failures. A value of 0 disables background fetches.'
+    )
+
+    diff_max_bytes = Integer(
+        2**20,
+        config=True,
+        help='Maximum number of bytes of diff output returned for a single file. Longer diffs are truncated.'
+    )
+
+    diff_max_lines = Integer(
+        20000,
+        config=True,
+        help='Maximum number of lines of diff output returned for a single file. Longer diffs are truncated.'
+    )
+
+    diff_max_file_size = Integer(
+        50*2**20,
+        config=True,
+        help='Maximum file size (in bytes) for which to compute a diff. Larger files are reported as oversized without reading their contents.'
+    )
+
+    diffstat_cache_size = Integer(
+        100000,
+        config=True,
+        help='Maximum number of cached line count entries (one per changed file plus one per pair of compared trees) for each retained repository. Least recently used entries are evicted.'
+    )
+
+    history_index = Bool(
+        True,
+        config=True,
+        help='Whether to maintain an on-disk commit index (`.git/simple-git/history.sqlite3`) for resolving commit histories filtered by path or author without walking the entire history.'
+    )
+
+    maintenance_interval = Float(
+        0.0,
+        config=True,
+        help='Number of seconds between background maintenance runs which keep enabled repository accelerators (e.g., the commit-graph and multi-pack-index) up-to-date (e.g., 3600). Background maintenance is disabled by default (0), as maintenance writes to every repository for which accelerators are enabled, including via global Git configuration. Accelerators are always built once when enabled via the server, and maintenance may be requested explicitly.'
+    )
+
+    blame_cache_size = Integer(
+        100000,
+        config=True,
+        help='Maximum number of cached line authorship entries (one per range of lines, one per commit, and one per file) for each retained repository. Least recently used entries are evicted.'
+    )
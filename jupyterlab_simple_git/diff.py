@@ -0,0 +1,263 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Parse and limit `git diff` output."""
+
+import re
+import tornado.web
+
+# Regular expression for matching the line which Git emits in lieu of a patch for binary files:
+BINARY_REGEXP = re.compile(rb'^Binary files .* differ$', re.MULTILINE)
+
+# Regular expression for matching the line which `git diff-tree --stdin` emits before the results for each pair of trees:
+TREES_REGEXP = re.compile(r'([0-9a-f]{40,64}) ([0-9a-f]{40,64})(?:\n|$)')
+
+# Hashes of the empty tree (keyed by hash length), against which root commits are compared:
+EMPTY_TREES = {
+    40: '4b825dc642cb6eb9a060e54bf8d69288fbee4904',
+    64: '6ef19b41225c5369f1c104d45d8d85efa9b057b53b14b4b9b939dd74decc5321'
+}
+
+
+def _numstat_entry(record, records, i):
+    """Parse a single `git diff --numstat -z` record.
+
+    Args:
+        record: record containing line counts
+        records: list of records
+        i: index of the record following `record`
+
+    Returns:
+        A `tuple` containing the parsed entry and the index of the next unprocessed record.
+
+    """
+    added, deleted, path = record.split('\t', 2)
+    original = None
+    if path == '':
+        # Copies and renames are followed by the original and destination paths as separate records:
+        original, path = records[i], records[i+1]
+        i += 2
+    binary = added == '-'
+    entry = {
+        'file': path,
+        'from': original,
+        'additions': None if binary else int(added),
+        'deletions': None if binary else int(deleted),
+        'binary': binary
+    }
+    return entry, i
+
+
+def diff_args(staged, rev):
+    """Return `git diff` arguments selecting which versions of files to compare.
+
+    Args:
+        staged: boolean indicating whether to compare the index (rather than the working tree)
+        rev: revision against which to compare (default: the index or, if comparing the index, `HEAD`)
+
+    Returns:
+        `list` of arguments
+
+    Raises:
+        HTTPError: must provide a valid revision argument
+
+    """
+    args = []
+    if staged:
+        args.append('--cached')
+    if rev is not None:
+        if not isinstance(rev, str) or rev == '' or rev.startswith('-'):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid revision argument.')
+        args.append(rev)
+    return args
+
+
+def parse_numstat(data):
+    """Parse `git diff --numstat -z` output.
+
+    Notes:
+        Each entry has the following format:
+
+        {
+            'file': string,           # changed file
+            'from': string|None,      # original path for copies and renames or `None`
+            'additions': int|None,    # number of added lines or `None` for binary files
+            'deletions': int|None,    # number of deleted lines or `None` for binary files
+            'binary': bool            # boolean indicating whether Git considers a file binary
+        }
+
+    Args:
+        data: command results
+
+    Returns:
+        `list` of entries
+
+    """
+    entries = []
+    records = data.split('\x00')
+    i = 0
+    n = len(records)
+    while i < n:
+        record = records[i]
+        i += 1
+        if record == '':
+            continue
+        entry, i = _numstat_entry(record, records, i)
+        entries.append(entry)
+    return entries
+
+
+def parse_tree_numstat(data):
+    """Parse `git diff-tree --stdin -r -z --numstat` output.
+
+    Notes:
+        For each pair of trees written to standard input, Git emits a newline-terminated line containing both tree hashes followed by the NUL-terminated numstat records for that pair (if any). Accordingly, a line containing tree hashes follows either a NUL (after the final record of the previous pair) or a newline (if the previous pair has no changes).
+
+    Args:
+        data: command results
+
+    Returns:
+        `dict` mapping each (tree, tree) pair to a `list` of entries (see `parse_numstat`)
+
+    """
+    results = {}
+    entries = None
+    records = data.split('\x00')
+    i = 0
+    n = len(records)
+    while i < n:
+        record = records[i]
+        i += 1
+        match = TREES_REGEXP.match(record)
+        while match is not None:
+            entries = results[(match.group(1), match.group(2))] = []
+            record = record[match.end():]
+            match = TREES_REGEXP.match(record)
+        if record == '' or entries is None:
+            continue
+        entry, i = _numstat_entry(record, records, i)
+        entries.append(entry)
+    return results
+
+
+class DiffOutput():
+    """Class for splitting `git diff` output into line-aligned chunks subject to line and byte limits.
+
+    Notes:
+        Output is provided in arbitrary chunks (e.g., as read from a pipe), and complete lines are written as soon as they are available, thus ensuring that multi-byte characters are never split across written chunks. Once writing further output would exceed either limit, output is truncated at the last complete line within the limits (or, for a single line exceeding the byte limit, at the byte limit), and no further output is accepted.
+
+    Attributes:
+        max_bytes: maximum number of bytes to write
+        max_lines: maximum number of lines to write
+        bytes: number of written bytes
+        lines: number of written lines
+        truncated: boolean indicating whether output was truncated
+        binary: boolean indicating whether Git reported a binary file
+
+    """
+
+    def __init__(self, write, max_bytes, max_lines):
+        """Initialize a class instance.
+
+        Args:
+            write: function which is provided each chunk of output as a string
+            max_bytes: maximum number of bytes to write
+            max_lines: maximum number of lines to write
+
+        """
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.bytes = 0
+        self.lines = 0
+        self.truncated = False
+        self.binary = False
+        self._write = write
+        self._partial = b''
+
+    def _emit(self, data):
+        """Write complete output, truncating output which exceeds the limits.
+
+        Args:
+            data: output consisting of complete lines (or a final partial line)
+
+        Returns:
+            A boolean indicating whether output was truncated.
+
+        """
+        truncated = False
+        remaining = self.max_lines - self.lines
+        if data.count(b'\n') > remaining:
+            end = -1
+            for _ in range(remaining):
+                end = data.index(b'\n', end+1)
+            data = data[:end+1]
+            truncated = True
+
+        remaining = self.max_bytes - self.bytes
+        if len(data) > remaining:
+            end = data.rfind(b'\n', 0, remaining)
+            data = data[:end+1] if end >= 0 else data[:remaining]
+            truncated = True
+
+        if data:
+            if not self.binary and BINARY_REGEXP.search(data) is not None:
+                self.binary = True
+            self.bytes += len(data)
+            self.lines += data.count(b'\n')
+            self._write(data.decode('utf8', 'replace'))
+
+        self.truncated = truncated
+        return truncated
+
+    def close(self):
+        """Write any remaining partial line."""
+        if self._partial and not self.truncated:
+            self._emit(self._partial)
+        self._partial = b''
+
+    def feed(self, chunk):
+        """Process a chunk of output.
+
+        Args:
+            chunk: bytes
+
+        Returns:
+            A boolean indicating whether a limit has been reached (and, thus, no further output should be provided).
+
+        """
+        data = self._partial + chunk
+        end = data.rfind(b'\n') + 1
+        self._partial = data[end:]
+        if end > 0 and self._emit(data[:end]):
+            return True
+        if self.bytes+len(self._partial) > self.max_bytes:
+            # A single line exceeds the remaining byte limit:
+            self._emit(self._partial)
+            self._partial = b''
+            return True
+        return False
@@ -0,0 +1,711 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Git commands for comparing revisions and reading objects."""
+
+import asyncio
+import base64
+import os
+import stat
+import tornado.web
+from jupyterlab_simple_git.blame import BlameOutput
+from jupyterlab_simple_git.cat_file import CatFileError
+from jupyterlab_simple_git.diff import EMPTY_TREES, DiffOutput, diff_args, parse_numstat, parse_tree_numstat
+
+# Maximum number of revisions for which to compute line counts in a single request:
+MAX_DIFFSTAT_REVS = 1000
+
+
+def _limit(value, default):
+    """Resolve a limit, which may not exceed a configured maximum.
+
+    Args:
+        value: requested limit (e.g., a query argument) or `None`
+        default: configured maximum
+
+    Returns:
+        limit
+
+    Raises:
+        HTTPError: must provide a valid limit argument
+
+    """
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = 0
+    if value <= 0:
+        raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid limit argument.')
+    return min(value, default)
+
+
+# Please keep class methods ordered in alphabetical order...
+
+
+class DiffCommands():
+    """Mixin class providing diffs, line counts, line authorship, and object contents (see `Git`)."""
+
+    async def _blame(self, commit, path, blob, write=None):
+        """Compute and cache line authorship for a file.
+
+        Args:
+            commit: commit hash
+            path: file path
+            blob: blob hash of the file as of the commit
+            write: callback function which is provided each range of lines as soon as Git attributes the range to a commit (optional)
+
+        Returns:
+            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
+
+            {
+                'code': int,             # command status code
+                'ranges': [...dict],     # ranges of lines, ordered by line number (see `BlameOutput`)
+                'commits': dict          # commits keyed by commit hash (see `BlameOutput`)
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        output = BlameOutput(write)
+
+        def clbk(response, line):
+            """Process a single line of command output.
+
+            Args:
+                response: response `dict`
+                line: string
+
+            """
+            output.feed(line)
+
+        response = await self._stream(['git', 'blame', '--incremental', '--porcelain', commit, '--', path], clbk, sep=b'\n')
+        if response['code'] != 0:
+            return response
+
+        result = {
+            'ranges': sorted(output.ranges, key=lambda rng: rng['line']),
+            'commits': output.commits
+        }
+        self._blames.set((commit, path, blob), result)
+        return dict(response, **result)
+
+    async def _tree_numstat(self, pairs):
+        """Return line counts for changed files between pairs of trees.
+
+        Notes:
+            As trees are immutable, results for a pair of trees never become stale, and, thus, results are cached indefinitely, subject to a size limit. Line counts for all pairs which are not cached are computed by a single `git diff-tree --stdin` invocation.
+
+            Rename detection is disabled, such that results only depend on the pair of trees, and not on configuration.
+
+        Args:
+            pairs: `list` of (tree hash, tree hash) pairs
+
+        Returns:
+            If able to successfully compute line counts, a `dict` mapping each pair to a `list` of entries (see `parse_numstat`), which are shared between callers and must not be mutated. Otherwise, a `dict` containing a command status code and an error message.
+
+        """
+        results = {}
+        missing = []
+        for pair in pairs:
+            entries = self._diffstats.get(pair)
+            if entries is not None:
+                results[pair] = entries
+            elif pair not in missing:
+                missing.append(pair)
+
+        self.metrics.inc('simple_git_diffstat_cache_requests_total', len(pairs)-len(missing), result='hit')
+        self.metrics.inc('simple_git_diffstat_cache_requests_total', len(missing), result='miss')
+        if len(missing) == 0:
+            return results
+
+        def clbk(response, data):
+            response['pairs'] = parse_tree_numstat(data)
+
+        cmd = ['git', 'diff-tree', '--stdin', '-r', '-z', '--numstat', '--no-renames']
+        stdin = ''.join(a+' '+b+'\n' for a, b in missing).encode('utf8')
+        response = await self._run(cmd, clbk, stdin=stdin)
+        if response['code'] != 0:
+            return response
+
+        for pair in missing:
+            entries = response['pairs'].get(pair, [])
+            self._diffstats.set(pair, entries)
+            results[pair] = entries
+        return results
+
+    async def blame(self, path, rev='HEAD', write=None):
+        """Return line authorship for a file at a specified revision.
+
+        Notes:
+            Line authorship is resolved by `git blame --incremental`, which reports ranges of lines as soon as they are attributed to a commit. Ranges are reported in the order in which Git resolves them (i.e., not in line order). If provided a callback function, each range is provided to the callback as soon as Git produces it, and the returned `dict` omits the `ranges` and `commits` fields.
+
+            As commits and blobs are immutable, results are cached by commit, path, and blob hash, subject to a size limit, and a repeated request is answered without running Git. If a result is cached, the callback function is provided every range at once. Identical concurrent requests which do not provide a callback function share a single execution.
+
+            If the file exceeds `diff_max_file_size` bytes, line authorship is not computed, and the file is reported as oversized.
+
+        Args:
+            path: file path relative to the repository root
+            rev: revision (default: 'HEAD')
+            write: callback function which is provided each range of lines (see `BlameOutput`) (optional)
+
+        Returns:
+            A `dict` containing line authorship. If able to successfully resolve line authorship, the returned `dict` has the following format:
+
+            {
+                'code': int,             # command status code
+                'commit': string,        # resolved commit hash
+                'blob': string,          # blob hash of the file as of the commit
+                'size': int,             # file size in bytes
+                'oversized': bool,       # boolean indicating whether the file exceeds the maximum file size (and, thus, no line authorship was computed)
+                'ranges': [...dict],     # ranges of lines, ordered by line number (omitted if provided a callback function)
+                'commits': dict          # commits keyed by commit hash (omitted if provided a callback function)
+            }
+
+            Each `dict` in `ranges` has the following format:
+
+            {
+                'commit': string,        # commit hash
+                'line': int,             # first line number (1-based)
+                'orig_line': int,        # first line number in the file as of the commit (1-based)
+                'lines': int,            # number of lines
+                'path': string           # file path as of the commit
+            }
+
+            Each `dict` in `commits` has the following format:
+
+            {
+                'author': string,        # author name
+                'email': string,         # author email
+                'time': int,             # author timestamp (seconds since the Unix epoch)
+                'summary': string,       # commit subject
+                'boundary': bool         # boolean indicating whether the commit is a boundary commit (e.g., the root commit)
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid path argument
+            HTTPError: must provide a valid revision argument
+
+        """
+        if not isinstance(path, str) or path == '' or '\x00' in path or '\n' in path:
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid path argument.')
+        if not isinstance(rev, str) or rev == '' or rev.startswith('-') or '\n' in rev:
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid revision argument.')
+
+        path = os.path.normpath(path).replace(os.sep, '/')
+        try:
+            commit = await self._object_info.read(rev+'^{commit}')
+            blob = None if commit is None else await self._object_info.read(commit['oid']+':'+path)
+        except CatFileError as err:
+            return {
+                'code': 1,
+                'message': str(err)
+            }
+
+        if commit is None:
+            return {
+                'code': 128,
+                'message': 'fatal: invalid revision \''+rev+'\''
+            }
+        if blob is None:
+            return {
+                'code': 128,
+                'message': 'fatal: path \''+path+'\' does not exist in \''+rev+'\''
+            }
+        if blob['type'] != 'blob':
+            return {
+                'code': 128,
+                'message': 'fatal: path \''+path+'\' is not a file in \''+rev+'\''
+            }
+
+        response = {
+            'code': 0,
+            'commit': commit['oid'],
+            'blob': blob['oid'],
+            'size': blob['size'],
+            'oversized': blob['size'] > self.diff_max_file_size
+        }
+        if response['oversized']:
+            if write is None:
+                response['ranges'] = []
+                response['commits'] = {}
+            return response
+
+        key = (commit['oid'], path, blob['oid'])
+        result = self._blames.get(key)
+        self.metrics.inc('simple_git_blame_cache_requests_total', result='miss' if result is None else 'hit')
+        if result is None:
+            if write is None:
+                result = await self._flights.run(('blame',)+key, lambda: self._blame(*key))
+            else:
+                result = await self._blame(*key, write=write)
+            if result['code'] != 0:
+                return result
+        elif write is not None:
+            write({
+                'ranges': result['ranges'],
+                'commits': result['commits']
+            })
+
+        if write is None:
+            response['ranges'] = result['ranges']
+            response['commits'] = result['commits']
+        return response
+
+    async def diff(self, path, staged=False, rev=None, max_bytes=None, max_lines=None, original=None, write=None):
+        """Return the diff of a single file.
+
+        Notes:
+            Diffs are intended to be loaded lazily, one file at a time (e.g., after listing changed files via `diff_summary`).
+
+            Before running `git diff`, the sizes of the compared versions of a file are resolved from object metadata and file system metadata. If either version exceeds `diff_max_file_size` bytes, no diff is computed, and the file is reported as oversized.
+
+            Diff output is processed incrementally, and at most `max_bytes` bytes and `max_lines` lines are returned, after which the command is terminated and the diff is reported as truncated. Accordingly, memory consumption does not depend on the size of a diff.
+
+            If provided a callback function, diff output is provided to the callback as line-aligned chunks as soon as Git produces it, and the returned `dict` omits the `diff` field.
+
+        Args:
+            path: file path
+            staged: boolean indicating whether to compare the index (rather than the working tree) (default: False)
+            rev: revision against which to compare (default: the index or, if comparing the index, `HEAD`)
+            max_bytes: maximum number of bytes of diff output (default: `diff_max_bytes`; may not exceed `diff_max_bytes`)
+            max_lines: maximum number of lines of diff output (default: `diff_max_lines`; may not exceed `diff_max_lines`)
+            original: original path of a copied or renamed file (e.g., the `from` field of a `diff_summary` entry), such that the diff describes the copy or rename (optional)
+            write: callback function which is provided each chunk of diff output as a string (optional)
+
+        Returns:
+            A `dict` containing the diff. If able to successfully compute a diff, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'binary': bool,       # boolean indicating whether Git considers the file binary
+                'oversized': bool,    # boolean indicating whether the file exceeds the maximum file size (and, thus, no diff was computed)
+                'size': int,          # size in bytes of the larger of the compared versions of the file
+                'truncated': bool,    # boolean indicating whether diff output was truncated
+                'bytes': int,         # number of returned bytes of diff output
+                'lines': int,         # number of returned lines of diff output
+                'diff': string        # unified diff (omitted if provided a callback function)
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid path argument
+            HTTPError: must provide a valid revision argument
+            HTTPError: must provide a valid limit argument
+
+        """
+        paths = [path] if original is None else [original, path]
+        if not all(isinstance(p, str) and p != '' and '\x00' not in p and '\n' not in p for p in paths):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid path argument.')
+        args = diff_args(staged, rev)
+        max_bytes = _limit(max_bytes, self.diff_max_bytes)
+        max_lines = _limit(max_lines, self.diff_max_lines)
+
+        # Resolve the sizes of the compared versions without reading file contents:
+        specs = [(rev or ('HEAD' if staged else ''))+':'+paths[0]]
+        if staged:
+            specs.append(':'+path)
+        sizes = [0]
+        for spec in specs:
+            try:
+                info = await self._object_info.read(spec)
+            except CatFileError:
+                info = None
+            if info is not None and info['type'] == 'blob':
+                sizes.append(info['size'])
+        if not staged:
+            try:
+                st = os.stat(os.path.join(self.root, path))
+                if stat.S_ISREG(st.st_mode):
+                    sizes.append(st.st_size)
+            except OSError:
+                pass
+
+        response = {
+            'code': 0,
+            'binary': False,
+            'oversized': max(sizes) > self.diff_max_file_size,
+            'size': max(sizes),
+            'truncated': False,
+            'bytes': 0,
+            'lines': 0
+        }
+        if response['oversized']:
+            if write is None:
+                response['diff'] = ''
+            return response
+
+        chunks = []
+        output = DiffOutput(chunks.append if write is None else write, max_bytes, max_lines)
+        cmd = ['git', '--literal-pathspecs', 'diff', '--no-color', '--no-ext-diff'] + args + ['--'] + paths
+        res = await self._chunks(cmd, output.feed)
+        if res['code'] != 0:
+            return res
+        output.close()
+
+        response['binary'] = output.binary
+        response['truncated'] = output.truncated
+        response['bytes'] = output.bytes
+        response['lines'] = output.lines
+        if write is None:
+            response['diff'] = ''.join(chunks)
+        return response
+
+    async def diff_summary(self, path='.', staged=False, rev=None):
+        """Return a summary of changes for each changed file.
+
+        Notes:
+            The summary only contains line counts, such that diffs of individual files may be loaded lazily (see `diff`).
+
+            Results are cached until a file system event indicates that the working tree, index, `HEAD`, or refs have changed.
+
+        Args:
+            path: subdirectory path, file path, or glob (default: '.')
+            staged: boolean indicating whether to compare the index (rather than the working tree) (default: False)
+            rev: revision against which to compare (default: the index or, if comparing the index, `HEAD`)
+
+        Returns:
+            A `dict` containing changed files. If able to successfully compute a summary, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'files': [...dict]    # changed files
+            }
+
+            Each `dict` in `files` has the following format:
+
+            {
+                'file': string,           # changed file
+                'from': string|None,      # original path for copies and renames or `None`
+                'additions': int|None,    # number of added lines or `None` for binary files
+                'deletions': int|None,    # number of deleted lines or `None` for binary files
+                'binary': bool            # boolean indicating whether Git considers the file binary
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid revision argument
+
+        """
+        cmd = ['git', 'diff', '--numstat', '-z', '--no-ext-diff'] + diff_args(staged, rev) + ['--', path]
+
+        def clbk(response, data):
+            response['files'] = parse_numstat(data)
+
+        return await self._cached(('diff_summary', path, bool(staged), rev), lambda: self._run(cmd, clbk))
+
+    async def diffstat(self, revs, files=False):
+        """Return line counts for changes introduced by commits or between revisions.
+
+        Notes:
+            A commit (e.g., `HEAD~2`) is compared against its first parent (or, for a root commit, against the empty tree), a range (e.g., `v1.0..HEAD`) compares the endpoints of the range, and a symmetric range (e.g., `main...topic`) compares the merge base of the endpoints against the second endpoint (as in `git diff main...topic`).
+
+            Revisions are resolved independently. A revision which cannot be resolved does not prevent computing line counts for the remaining revisions; instead, its entry in `stats` reports an error.
+
+            Results are keyed by the pair of compared trees. As trees are immutable, results never become stale and are cached until evicted by more recently used results. Line counts for all revisions which are not cached are computed by a single Git invocation (see `_tree_numstat`).
+
+            Renames are reported as a deletion and an addition.
+
+        Args:
+            revs: revision or `list` of revisions
+            files: boolean indicating whether to include line counts for each changed file (default: False)
+
+        Returns:
+            A `dict` containing line counts. If able to successfully compute line counts, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'stats': [...dict]    # line counts for each revision (in the order provided)
+            }
+
+            Each `dict` in `stats` has the following format:
+
+            {
+                'rev': string,            # revision
+                'from': string,           # hash of the tree compared against
+                'to': string,             # hash of the tree which was compared
+                'files_changed': int,     # number of changed files
+                'additions': int,         # number of added lines (excluding binary files)
+                'deletions': int,         # number of deleted lines (excluding binary files)
+                'files': [...dict]        # line counts for each changed file (see `diff_summary`) (only included if `files` is true)
+            }
+
+            If unable to resolve a revision, its entry in `stats` has the following format:
+
+            {
+                'rev': string,            # revision
+                'code': int,              # command status code
+                'message': string         # error message
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide valid revision arguments
+
+        """
+        if isinstance(revs, str):
+            revs = [revs]
+        if not isinstance(revs, (list, tuple)) or len(revs) == 0 or len(revs) > MAX_DIFFSTAT_REVS or not all(isinstance(rev, str) and rev != '' and not rev.startswith('-') and '\n' not in rev for rev in revs):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide valid revision arguments.')
+
+        # Resolve the merge base of each symmetric range:
+        bases = {}
+        for rev in revs:
+            a, sep, b = rev.partition('...')
+            if sep and rev not in bases:
+                a = a or 'HEAD'
+                b = b or 'HEAD'
+                if a.startswith('-') or b.startswith('-'):
+                    bases[rev] = None
+                    continue
+                res = await self._run(['git', 'merge-base', a, b])
+                bases[rev] = res['message'] if res['code'] == 0 and res['message'] != '' else None
+
+        specs = []
+        for rev in revs:
+            a, sep, b = rev.partition('...')
+            if sep:
+                base = bases[rev]
+                specs.append((None if base is None else base+'^{tree}', (b or 'HEAD')+'^{tree}'))
+                continue
+            a, sep, b = rev.partition('..')
+            if sep:
+                specs.append(((a or 'HEAD')+'^{tree}', (b or 'HEAD')+'^{tree}'))
+            else:
+                specs.append((rev+'^^{tree}', rev+'^{tree}'))
+
+        # Resolve all trees through the long-lived `git cat-file` process, pipelining requests:
+        try:
+            infos = await asyncio.gather(*[self._object_info.read(spec) for pair in specs for spec in pair if spec is not None])
+        except CatFileError as err:
+            return {
+                'code': 1,
+                'message': str(err)
+            }
+
+        infos = iter(infos)
+        pairs = []
+        for rev, (x, y) in zip(revs, specs):
+            a = None if x is None else next(infos)
+            b = next(infos)
+            if b is None or (a is None and '..' in rev):
+                pairs.append(None)
+                continue
+            if a is None:
+                # Root commits are compared against the empty tree:
+                a = {'oid': EMPTY_TREES[len(b['oid'])]}
+            pairs.append((a['oid'], b['oid']))
+
+        results = await self._tree_numstat([pair for pair in pairs if pair is not None])
+        if 'code' in results:
+            return results
+
+        stats = []
+        for rev, pair in zip(revs, pairs):
+            if pair is None:
+                stats.append({
+                    'rev': rev,
+                    'code': 128,
+                    'message': 'fatal: not a valid revision \''+rev+'\''
+                })
+                continue
+            entries = results[pair]
+            stat = {
+                'rev': rev,
+                'from': pair[0],
+                'to': pair[1],
+                'files_changed': len(entries),
+                'additions': sum(entry['additions'] or 0 for entry in entries),
+                'deletions': sum(entry['deletions'] or 0 for entry in entries)
+            }
+            if files:
+                stat['files'] = entries
+            stats.append(stat)
+
+        return {
+            'code': 0,
+            'stats': stats
+        }
+
+    async def file_contents(self, path, rev='HEAD'):
+        """Return the contents of a file at a specified revision.
+
+        Notes:
+            File contents are read from a long-lived `git cat-file` process, and, thus, do not require spawning a new process.
+
+        Args:
+            path: file path relative to the repository root
+            rev: revision (default: 'HEAD')
+
+        Returns:
+            A `dict` containing file contents. If able to successfully resolve file contents, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'oid': string,        # blob hash
+                'size': int,          # file size in bytes
+                'encoding': string,   # contents encoding (either 'text' or 'base64')
+                'contents': string    # file contents
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid path argument
+            HTTPError: must provide a valid revision argument
+
+        """
+        if not isinstance(path, str) or path == '' or '\x00' in path or '\n' in path:
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid path argument.')
+        if not isinstance(rev, str) or rev == '' or rev.startswith('-') or '\n' in rev:
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid revision argument.')
+
+        path = os.path.normpath(path).replace(os.sep, '/')
+        try:
+            obj = await self._objects.read(rev+':'+path)
+        except CatFileError as err:
+            return {
+                'code': 1,
+                'message': str(err)
+            }
+
+        if obj is None:
+            return {
+                'code': 128,
+                'message': 'fatal: path \''+path+'\' does not exist in \''+rev+'\''
+            }
+        if obj['type'] != 'blob':
+            return {
+                'code': 128,
+                'message': 'fatal: path \''+path+'\' is not a file in \''+rev+'\''
+            }
+
+        response = {
+            'code': 0,
+            'oid': obj['oid'],
+            'size': obj['size']
+        }
+        try:
+            response['contents'] = obj['contents'].decode('utf8')
+            response['encoding'] = 'text'
+        except UnicodeDecodeError:
+            response['contents'] = base64.b64encode(obj['contents']).decode('ascii')
+            response['encoding'] = 'base64'
+
+        return response
+
+    async def object_info(self, obj):
+        """Return information about a Git object.
+
+        Notes:
+            Object information is read from a long-lived `git cat-file --batch-check` process, and, thus, does not require spawning a new process.
+
+        Args:
+            obj: object name (e.g., an object hash, `HEAD:README.md`, `master^{tree}`, etc)
+
+        Returns:
+            A `dict` containing object information. If able to successfully resolve an object, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'oid': string,        # object hash
+                'type': string,       # object type
+                'size': int           # object size in bytes
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid object name
+
+        """
+        if not isinstance(obj, str) or obj == '':
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid object name.')
+
+        try:
+            info = await self._object_info.read(obj)
+        except CatFileError as err:
+            return {
+                'code': 1,
+                'message': str(err)
+            }
+
+        if info is None:
+            return {
+                'code': 128,
+                'message': 'fatal: not a valid object name \''+obj+'\''
+            }
+
+        return {
+            'code': 0,
+            'oid': info['oid'],
+            'type': info['type'],
+            'size': info['size']
+        }
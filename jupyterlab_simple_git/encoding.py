@@ -0,0 +1,289 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Encode and compress response bodies according to the media types and content codings accepted by a client."""
+
+import gzip
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Supported media types, mapped to a `tuple` of booleans indicating whether a media type uses the columnar layout and MessagePack serialization, respectively:
+MEDIA_TYPES = {
+    'application/json': (False, False),
+    'application/vnd.simple-git.columnar+json': (True, False),
+    'application/msgpack': (False, True),
+    'application/x-msgpack': (False, True),
+    'application/vnd.simple-git.columnar+msgpack': (True, True)
+}
+
+# Minimum size (in bytes) of a response body for which compression is worthwhile:
+MIN_COMPRESS_SIZE = 1024
+
+# Compression levels, favoring speed:
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+# Minimum estimated size (in bytes) of a response body for which encoding and compression are performed in an executor, rather than on the event loop:
+EXECUTOR_SIZE = 2**16
+
+
+def _preferences(header):
+    """Parse an `Accept` or `Accept-Encoding` request header.
+
+    Args:
+        header: header value
+
+    Returns:
+        `list` of (value, quality) pairs in header order
+
+    """
+    out = []
+    for part in header.split(','):
+        fields = part.split(';')
+        value = fields[0].strip().lower()
+        if value == '':
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            key, _, v = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        out.append((value, q))
+    return out
+
+
+def columnar(value):
+    """Convert each list of objects within a JSON-serializable value to the columnar layout.
+
+    Notes:
+        In the columnar layout, a non-empty list of `dict`s is replaced by a `dict` having a single `columns` field, which maps each key (in order of first appearance) to a list containing the value of that key for each `dict` (or `None` if a `dict` lacks the key). For example,
+
+            [{'file': 'a.txt', 'status': 'M'}, {'file': 'b.txt', 'status': '?'}]
+
+        becomes
+
+            {'columns': {'file': ['a.txt', 'b.txt'], 'status': ['M', '?']}}
+
+        Key names are thus encoded once per list, rather than once per entry.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        converted value
+
+    """
+    if isinstance(value, dict):
+        return {k: columnar(v) if isinstance(v, (dict, list)) else v for k, v in value.items()}
+    if not isinstance(value, list):
+        return value
+    if value and all(isinstance(item, dict) for item in value):
+        keys = {}
+        for item in value:
+            keys.update(dict.fromkeys(item))
+        columns = {}
+        for key in keys:
+            column = [item.get(key) for item in value]
+            if any(isinstance(v, (dict, list)) for v in column):
+                column = [columnar(v) for v in column]
+            columns[key] = column
+        return {
+            'columns': columns
+        }
+    return [columnar(item) if isinstance(item, (dict, list)) else item for item in value]
+
+
+def compress(data, coding):
+    """Compress a response body.
+
+    Args:
+        data: response body
+        coding: content coding ('br' or 'gzip')
+
+    Returns:
+        compressed response body
+
+    """
+    if coding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def encode(value, media_type):
+    """Serialize a response body.
+
+    Args:
+        value: JSON-serializable value
+        media_type: supported media type (see `MEDIA_TYPES`)
+
+    Returns:
+        response body
+
+    """
+    layout, binary = MEDIA_TYPES[media_type]
+    if layout:
+        value = columnar(value)
+    if binary:
+        return msgpack.packb(value, use_bin_type=True)
+    if layout:
+        return json.dumps(value, separators=(',', ':')).encode('utf8')
+
+    # Match `tornado.escape.json_encode`, which escapes `</` in order to allow embedding JSON in HTML:
+    return json.dumps(value).replace('</', '<\\/').encode('utf8')
+
+
+def encode_response(value, media_type, coding):
+    """Serialize and, if worthwhile, compress a response body.
+
+    Args:
+        value: JSON-serializable value
+        media_type: supported media type (see `MEDIA_TYPES`)
+        coding: content coding ('br', 'gzip', or `None`)
+
+    Returns:
+        `tuple` containing a response body and the applied content coding (or `None` if the response body is not compressed)
+
+    """
+    data = encode(value, media_type)
+    if coding is None or len(data) < MIN_COMPRESS_SIZE:
+        return data, None
+    return compress(data, coding), coding
+
+
+def estimate_size(value, limit):
+    """Estimate the size of a serialized JSON-serializable value.
+
+    Notes:
+        Strings are counted by length, separators are counted as a single byte, and any other value is counted as a few bytes. In order to bound the cost of an estimate, values are no longer visited once the estimate reaches `limit`.
+
+    Args:
+        value: JSON-serializable value
+        limit: size at which to stop estimating
+
+    Returns:
+        estimated size (in bytes), which is at least `limit` if the estimate reached `limit`
+
+    """
+    size = 0
+    stack = [value]
+    while stack and size < limit:
+        value = stack.pop()
+        if isinstance(value, str):
+            size += len(value) + 3
+        elif isinstance(value, dict):
+            # Account for separators before visiting items, such that large containers are not copied:
+            size += 2 + 2*len(value)
+            if size < limit:
+                stack.extend(value.keys())
+                stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            size += 2 + len(value)
+            if size < limit:
+                stack.extend(value)
+        else:
+            size += 8
+    return size
+
+
+def negotiate_encoding(header):
+    """Select a content coding for a response body.
+
+    Notes:
+        Brotli is only supported if the `brotli` package is installed. If a client accepts both Brotli and gzip with equal preference, Brotli is selected, as it achieves higher compression ratios on JSON.
+
+        A coding having a quality value of zero is never selected. A wildcard (`*`) is treated as gzip, unless gzip is listed explicitly.
+
+    Args:
+        header: `Accept-Encoding` request header value (or `None`)
+
+    Returns:
+        content coding ('br' or 'gzip') or `None` if a response body should not be compressed
+
+    """
+    explicit = {}
+    wildcard = None
+    for value, q in _preferences(header or ''):
+        if value == '*':
+            wildcard = q
+        elif value in ('br', 'gzip', 'x-gzip'):
+            coding = 'gzip' if value == 'x-gzip' else value
+            explicit[coding] = max(q, explicit.get(coding, q))
+
+    # A wildcard only applies to gzip when gzip is not listed explicitly (e.g., `*, gzip;q=0` does not accept gzip):
+    if 'gzip' not in explicit and wildcard is not None:
+        explicit['gzip'] = wildcard
+    if brotli is None:
+        explicit.pop('br', None)
+
+    best = None
+    rank = None
+    for coding, q in explicit.items():
+        # A quality value of zero indicates that a coding is not acceptable:
+        if q <= 0:
+            continue
+        if rank is None or (q, coding == 'br') > rank:
+            best = coding
+            rank = (q, coding == 'br')
+    return best
+
+
+def negotiate_type(header):
+    """Select a media type for a response body.
+
+    Notes:
+        MessagePack media types are only supported if the `msgpack` package is installed. If a client does not accept any supported media type (e.g., if a client does not provide an `Accept` header), the returned media type is `application/json`.
+
+    Args:
+        header: `Accept` request header value (or `None`)
+
+    Returns:
+        media type
+
+    """
+    best = 'application/json'
+    best_q = 0.0
+    for value, q in _preferences(header or ''):
+        if value not in MEDIA_TYPES or (MEDIA_TYPES[value][1] and msgpack is None):
+            continue
+        if q > best_q:
+            best = value
+            best_q = q
+    return best
@@ -0,0 +1,216 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Coalesce and schedule fetches from remote repositories."""
+
+import asyncio
+import random
+import time
+import tornado.web
+from jupyterlab_simple_git.metrics import Metrics
+
+# Maximum number of seconds between background fetches after repeated failures:
+MAX_BACKOFF = 3600.0
+
+
+class Fetcher():
+    """Class for coalescing and scheduling fetches from remote repositories.
+
+    Notes:
+        At most one fetch per remote (and set of fetch options) is in flight at a time. A fetch of the default remote is keyed by the name of the remote which Git would fetch (see `default_remote`), such that fetches which omit the remote and fetches which name the default remote are coalesced. Callers requesting a fetch while an identical fetch is running wait for the running fetch and share its result, rather than starting a duplicate network transfer. Progress updates are forwarded to each waiting caller, and a caller which joins a running fetch is immediately provided the most recent progress update. A running fetch is only cancelled once every waiting caller has been cancelled.
+
+        If `interval` is positive, the default remote is fetched in the background every `interval` seconds (randomly perturbed by up to `jitter` times the interval in order to avoid synchronized fetches across repositories), thus keeping remote-tracking branches (and, thus, ahead/behind counts) current. A background fetch is skipped if another fetch of the default remote (e.g., requested by a client) has completed since the background fetch was scheduled. After consecutive failures (e.g., when offline), the interval doubles for each failure up to `MAX_BACKOFF` seconds.
+
+    Attributes:
+        interval: number of seconds between background fetches (0 disables background fetches)
+        jitter: maximum random perturbation of the interval between background fetches as a fraction of the interval
+        failures: number of consecutive failed background fetches
+        metrics: metrics collector
+
+    """
+
+    def __init__(self, fetch, interval=0.0, jitter=0.1, metrics=None, default_remote=None):
+        """Initialize a class instance.
+
+        Args:
+            fetch: coroutine function which fetches from a remote repository and accepts `remote`, `prune`, `fetch_all`, and `progress` arguments
+            interval: number of seconds between background fetches (default: 0)
+            jitter: maximum random perturbation of the interval between background fetches as a fraction of the interval (default: 0.1)
+            metrics: metrics collector (optional)
+            default_remote: coroutine function which returns the name of the remote fetched when no remote is specified, or `None` if unable to resolve the remote (optional)
+
+        """
+        self.interval = interval
+        self.jitter = jitter
+        self.failures = 0
+        self.metrics = Metrics() if metrics is None else metrics
+        self._fetch = fetch
+        self._default_remote = default_remote
+        self._flights = {}
+        self._last = {}
+        self._timer = None
+        self._scheduled = None
+        self._task = None
+        if interval > 0:
+            self._schedule()
+
+    def _delay(self):
+        """Return the number of seconds until the next background fetch.
+
+        Returns:
+            number of seconds
+
+        """
+        delay = min(self.interval * 2**min(self.failures, 16), max(MAX_BACKOFF, self.interval))
+        return delay * random.uniform(1.0-self.jitter, 1.0+self.jitter)
+
+    def _done(self, key, flight):
+        """Process a completed fetch.
+
+        Args:
+            key: fetch key
+            flight: in-flight fetch `dict`
+
+        """
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        task = flight['task']
+        if not task.cancelled() and task.exception() is None and task.result()['code'] == 0:
+            self._last[key] = time.monotonic()
+
+    async def _prefetch(self):
+        """Fetch the default remote in the background."""
+        try:
+            key = (await self._remote(None, False), False, False)
+            if self._last.get(key, float('-inf')) > self._scheduled:
+                self.metrics.inc('simple_git_prefetches_total', result='skipped')
+                return
+            try:
+                response = await self.fetch(key[0])
+            except tornado.web.HTTPError:
+                response = {
+                    'code': -1
+                }
+            if response['code'] == 0:
+                self.failures = 0
+                self.metrics.inc('simple_git_prefetches_total', result='success')
+            else:
+                self.failures += 1
+                self.metrics.inc('simple_git_prefetches_total', result='failure')
+        finally:
+            self._task = None
+            if self.interval > 0:
+                self._schedule()
+
+    async def _remote(self, remote, fetch_all):
+        """Resolve the remote to fetch.
+
+        Args:
+            remote: name of remote or `None`
+            fetch_all: boolean indicating whether to fetch all remotes
+
+        Returns:
+            name of remote or `None` if fetching the default remote (or all remotes) and unable to resolve the default remote
+
+        """
+        if remote is None and not fetch_all and self._default_remote is not None:
+            remote = await self._default_remote()
+        return remote
+
+    def _schedule(self):
+        """Schedule the next background fetch."""
+        self._scheduled = time.monotonic()
+        self._timer = asyncio.get_event_loop().call_later(self._delay(), self._start_prefetch)
+
+    def _start_prefetch(self):
+        """Start a background fetch."""
+        self._timer = None
+        self._task = asyncio.ensure_future(self._prefetch())
+
+    async def close(self):
+        """Stop background fetches and cancel running fetches."""
+        self.interval = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        tasks = [flight['task'] for flight in self._flights.values()]
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def fetch(self, remote=None, prune=False, fetch_all=False, progress=None):
+        """Download objects and refs from a remote repository, sharing the result of an identical fetch if one is already running.
+
+        Args:
+            remote: name of remote (default: 'origin')
+            prune: boolean indicating whether to remove any remote-tracking references that no longer exist on the remote
+            fetch_all: boolean indicating whether to fetch all remotes
+            progress: callback function which is provided parsed progress updates (optional)
+
+        Returns:
+            A `dict` containing command results.
+
+        """
+        remote = await self._remote(remote, fetch_all)
+        key = (remote, bool(prune), bool(fetch_all))
+        flight = self._flights.get(key)
+        if flight is None:
+            self.metrics.inc('simple_git_fetch_requests_total', result='started')
+            flight = {
+                'listeners': [],
+                'waiters': 0,
+                'last': None
+            }
+
+            def clbk(info):
+                flight['last'] = info
+                for listener in list(flight['listeners']):
+                    listener(info)
+
+            flight['task'] = asyncio.ensure_future(self._fetch(remote, prune, fetch_all, clbk))
+            flight['task'].add_done_callback(lambda _: self._done(key, flight))
+            self._flights[key] = flight
+        else:
+            self.metrics.inc('simple_git_fetch_requests_total', result='coalesced')
+            if progress is not None and flight['last'] is not None:
+                progress(flight['last'])
+
+        if progress is not None:
+            flight['listeners'].append(progress)
+        flight['waiters'] += 1
+        try:
+            # Prevent a cancelled caller from cancelling a fetch on which other callers are waiting:
+            return await asyncio.shield(flight['task'])
+        finally:
+            flight['waiters'] -= 1
+            if progress is not None:
+                flight['listeners'].remove(progress)
+            if flight['waiters'] == 0 and not flight['task'].done():
+                flight['task'].cancel()
@@ -29,26 +29,218 @@
 
 """Execute Git commands."""
 
+import asyncio
+import inspect
 import os
-import subprocess
+import time
 import tornado.web
+from jupyterlab_simple_git.cache import LRUCache, StatusCache
+from jupyterlab_simple_git.cat_file import CatFile
+from jupyterlab_simple_git.diff_commands import DiffCommands
+from jupyterlab_simple_git.fetcher import Fetcher
+from jupyterlab_simple_git.history import HistoryIndex
+from jupyterlab_simple_git.history_commands import HistoryCommands
+from jupyterlab_simple_git.index import Index
+from jupyterlab_simple_git.maintenance import Maintainer
+from jupyterlab_simple_git.maintenance_commands import MaintenanceCommands
+from jupyterlab_simple_git.metrics import Metrics
+from jupyterlab_simple_git.notifier import ChangeNotifier
+from jupyterlab_simple_git.process import kill, read_env, subcommand
+from jupyterlab_simple_git.refs import Refs
+from jupyterlab_simple_git.remote_commands import RemoteCommands
+from jupyterlab_simple_git.scheduler import Scheduler
+from jupyterlab_simple_git.singleflight import SingleFlight
+from jupyterlab_simple_git.status_tree import StatusTree
+from jupyterlab_simple_git.watcher import Watcher
+from jupyterlab_simple_git.worktree_commands import WorktreeCommands
+
+# Maximum size (in bytes) of a single record when incrementally processing command results:
+STREAM_LIMIT = 2**24
+
+# Operations which may be combined in a batch:
+BATCH_OPERATIONS = ('add', 'checkout_branch', 'commit', 'delete_branch', 'delete_untracked_files', 'reset')
+
 
 # Please keep class methods ordered in alphabetical order...
 
 
-class Git():
+class Git(DiffCommands, HistoryCommands, MaintenanceCommands, RemoteCommands, WorktreeCommands):
     """Class for executing Git commands.
 
+    Notes:
+        Commands are grouped by area into base classes (`DiffCommands`, `HistoryCommands`, `MaintenanceCommands`, `RemoteCommands`, and `WorktreeCommands`), which rely on the state initialized by this class and on the command execution methods it defines (e.g., `_run` and `_stream`).
+
     Attributes:
         root: canonical file system path of a Git repository
+        scheduler: scheduler for commands operating on the repository
+        metrics: metrics collector
+        network_timeout: number of seconds a network operation may run without reporting progress before being terminated (0 disables the timeout)
+        diff_max_bytes: maximum number of bytes of diff output returned for a single file
+        diff_max_lines: maximum number of lines of diff output returned for a single file
+        diff_max_file_size: maximum file size (in bytes) for which to compute a diff
 
     """
 
-    def __init__(self, root):
+    def __init__(self, root, max_queue=64, metrics=None, network_timeout=120.0, prefetch_interval=0.0, diff_max_bytes=2**20, diff_max_lines=20000, diff_max_file_size=50*2**20, diffstat_cache_size=100000, history_index=True, maintenance_interval=0.0, blame_cache_size=100000):
         """Initialize a class instance."""
         self.root = os.path.realpath(os.path.expanduser(root))
+        self.metrics = Metrics() if metrics is None else metrics
+        self.network_timeout = network_timeout
+        self.diff_max_bytes = diff_max_bytes
+        self.diff_max_lines = diff_max_lines
+        self.diff_max_file_size = diff_max_file_size
+        self.scheduler = Scheduler(max_queue, self.metrics)
+        self._fetcher = Fetcher(self._fetch, prefetch_interval, metrics=self.metrics, default_remote=self._default_remote)
+        self._objects = CatFile(self.root)
+        self._object_info = CatFile(self.root, batch_check=True)
+        self._watcher = Watcher(self.root)
+        self._index = Index(self.root, self._watcher)
+        self._refs = Refs(self.root)
+        self._cache = StatusCache(self._watcher)
+        self._diffstats = LRUCache(diffstat_cache_size, lambda entries: len(entries)+1)
+        self._blames = LRUCache(blame_cache_size, lambda result: len(result['ranges'])+len(result['commits'])+1)
+        self._notifier = ChangeNotifier(self._watcher)
+        self._flights = SingleFlight(self.metrics)
+        self._history = HistoryIndex(self.root) if history_index else None
+        self._history_task = None
+        self._ignored_task = None
+        self._maintainer = Maintainer(self._maintain, maintenance_interval, metrics=self.metrics)
+        self._fsmonitor = None
+        self._tree = StatusTree()
+        self._tree_source = None
+
+    async def _cached(self, key, compute):
+        """Compute a result which depends on the working tree status.
+
+        Notes:
+            Results are cached until a file system event indicates that the working tree, index, `HEAD`, or refs have changed. Events for untracked files which Git ignores do not invalidate cached results (see `_update_ignored`). Upon a cache miss, identical concurrent requests share a single execution (see `_shared`).
+
+        Args:
+            key: cache key
+            compute: coroutine function which computes a response `dict` (e.g., by executing a read-only Git command)
+
+        Returns:
+            A `dict` containing command results.
+
+        """
+        response = self._cache.get(key)
+        if self._watcher.available and not self._watcher.ignoring and (self._ignored_task is None or self._ignored_task.done()):
+            self._ignored_task = asyncio.ensure_future(self._update_ignored())
+        self.metrics.inc('simple_git_status_cache_requests_total', method=key[0], result='miss' if response is None else 'hit')
+        if response is not None:
+            return response
+
+        generation = self._cache.generation
+        response = await self._shared(key, compute, generation)
+        if response['code'] == 0:
+            self._cache.set(key, generation, response)
+        return response
+
+    async def _chunks(self, cmd, clbk, operation=None):
+        """Execute a Git command and incrementally process its output in chunks.
+
+        Notes:
+            Unlike `_stream`, output is not split into records, and, thus, memory consumption is bounded even if the command emits arbitrarily long lines. Each chunk of standard output (as bytes) is provided to a callback function as soon as the command produces it. If the callback function returns `True`, no further output is processed, and the command is terminated.
+
+            If an error occurs during command execution, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Args:
+            cmd: command to run
+            clbk: function which processes a chunk of output
+            operation: operation name for labeling metrics (default: Git subcommand)
+
+        Returns:
+            A `dict` containing command results.
+
+        """
+        operation = operation or subcommand(cmd)
+        async with self.scheduler.read():
+            start = time.monotonic()
+            elapsed = 0.0
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=self.root,
+                env=read_env(),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stderr = asyncio.ensure_future(proc.stderr.read())
+            try:
+                while True:
+                    chunk = await proc.stdout.read(2**16)
+                    if chunk == b'':
+                        break
+                    t = time.monotonic()
+                    done = clbk(chunk)
+                    elapsed += time.monotonic() - t
+                    if done is True:
+                        return {
+                            'code': 0
+                        }
+
+                code = await proc.wait()
+                if code != 0:
+                    self.metrics.inc('simple_git_command_errors_total', operation=operation)
+                    return {
+                        'code': code,
+                        'message': (await stderr).decode('utf8')
+                    }
+                return {
+                    'code': 0
+                }
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                if not stderr.done():
+                    stderr.cancel()
+                self.metrics.inc('simple_git_commands_total', operation=operation)
+                self.metrics.observe('simple_git_command_duration_seconds', time.monotonic()-start-elapsed, operation=operation)
+                self.metrics.observe('simple_git_parse_duration_seconds', elapsed, operation=operation)
+
+    async def _exec(self, cmd, env=None, stdin=None):
+        """Spawn a Git command and wait for it to exit.
+
+        Notes:
+            The command runs as a child process whose output is consumed asynchronously, thus allowing the event loop to service other requests while the command executes.
+
+            If the awaiting task is cancelled, the child process is killed, along with any processes it has spawned (e.g., hooks and processes run by shell aliases), before the cancellation propagates.
+
+        Args:
+            cmd: command to run
+            env: environment variables (optional)
+            stdin: bytes to write to standard input (optional)
+
+        Returns:
+            A `tuple` containing the command status code and the combined contents of standard output and standard error as bytes.
 
-    def _run(self, cmd, clbk=None):
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=self.root,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL if stdin is None else asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True
+        )
+        try:
+            stdout, _ = await proc.communicate(stdin)
+        except asyncio.CancelledError:
+            if proc.returncode is None:
+                kill(proc)
+                await proc.wait()
+            raise
+
+        return proc.returncode, stdout
+
+    async def _run(self, cmd, clbk=None, write=False, operation=None, stdin=None):
         """Execute a Git command.
 
         Notes:
@@ -80,63 +272,214 @@ class Git():
         Args:
             cmd: command to run
             clbk: function which processes command results upon successful command execution
+            write: boolean indicating whether a command modifies the repository (default: False)
+            operation: operation name for labeling metrics (default: Git subcommand)
+            stdin: bytes to write to standard input (optional)
 
         Returns:
             A `dict` containing command results.
 
         """
+        operation = operation or subcommand(cmd)
         response = {}
-        try:
-            stdout = subprocess.run(cmd, cwd=self.root, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True).stdout
-        except subprocess.CalledProcessError as err:
-            response['code'] = err.returncode
-            response['message'] = err.output.decode('utf8')
+        if write:
+            async with self.scheduler.write():
+                start = time.monotonic()
+                code, stdout = await self._exec(cmd, stdin=stdin)
+            self._cache.invalidate()
+        else:
+            async with self.scheduler.read():
+                start = time.monotonic()
+                code, stdout = await self._exec(cmd, read_env(), stdin)
+
+        self.metrics.observe('simple_git_command_duration_seconds', time.monotonic()-start, operation=operation)
+        self.metrics.inc('simple_git_commands_total', operation=operation)
+        if code != 0:
+            self.metrics.inc('simple_git_command_errors_total', operation=operation)
+            response['code'] = code
+            response['message'] = stdout.decode('utf8')
             return response
 
+        start = time.monotonic()
         response['code'] = 0
         if clbk is not None:
             clbk(response, stdout.decode('utf8').strip())
         else:
             response['message'] = stdout.decode('utf8').strip()
 
+        self.metrics.observe('simple_git_parse_duration_seconds', time.monotonic()-start, operation=operation)
         return response
 
-    def add(self, path='.', update_all=True):
-        """Add file contents to the index.
+    async def _shared(self, key, compute, generation=None):
+        """Compute a result, sharing a single execution among identical concurrent requests.
+
+        Notes:
+            Requests are identical if they have the same key and observe the same cache generation. As the cache generation changes upon file system events and upon commands which modify the repository, a request never shares an execution which started before a change observed by the request.
+
+            If file system events are unavailable, the cache generation only reflects commands executed by this class instance, and a request may share an execution which started before an external change (e.g., a command run in a terminal). As the execution was in flight when the request arrived, the shared result is no older than the result of a request which had arrived moments earlier.
 
         Args:
-            path: a subdirectory path, file path, glob, or a list of paths and/or globs (default: '.')
-            update_all: boolean indicating whether to update all entries in the index to match the working tree (default: True)
+            key: request key whose first element is the method name (e.g., ('status', path))
+            compute: coroutine function which computes a response `dict`
+            generation: cache generation observed before the request (default: current generation)
 
         Returns:
-            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
+            A `dict` containing command results, which is shared between callers and must not be mutated.
 
-            {
-                'code': int,          # command status code
-                'message': string     # command results
-            }
+        """
+        if generation is None:
+            generation = self._cache.generation
+        return await self._flights.run(key+(generation,), compute)
 
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
+    async def _stream(self, cmd, clbk, sep=b'\x00', operation=None):
+        """Execute a Git command and incrementally process its results.
+
+        Notes:
+            Command output is split into records delimited by `sep`, and each record is provided to a callback function as soon as the command produces it. Accordingly, memory consumption does not depend on the total size of the command output. The callback function is provided two arguments:
+
+                -   response: output response `dict`
+                -   record: string containing a single record
+
+            If the callback function returns `True`, no further records are processed and the command is terminated. If the callback function returns an awaitable (e.g., in order to write processed records to disk), the awaitable is awaited before reading further records, and its result is interpreted in the same manner.
+
+            If an error occurs during command execution, the returned `dict` has the following format:
 
             {
                 'code': int,          # command status code
                 'message': string     # error message
             }
 
+        Args:
+            cmd: command to run
+            clbk: function which processes an individual record
+            sep: record delimiter (default: NUL)
+            operation: operation name for labeling metrics (default: Git subcommand)
+
+        Returns:
+            A `dict` containing command results.
+
         """
-        cmd = ['git', 'add']
-        if update_all:
-            cmd.append('-A')
+        operation = operation or subcommand(cmd)
+        async with self.scheduler.read():
+            start = time.monotonic()
+            elapsed = 0.0
+            response = {
+                'code': 0
+            }
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=self.root,
+                env=read_env(),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT
+            )
+            stderr = asyncio.ensure_future(proc.stderr.read())
+            try:
+                eof = False
+                while not eof:
+                    try:
+                        record = (await proc.stdout.readuntil(sep))[:-len(sep)]
+                    except asyncio.IncompleteReadError as err:
+                        # The final record may lack a trailing delimiter:
+                        record = err.partial
+                        eof = True
+                        if record == b'':
+                            break
+                    t = time.monotonic()
+                    done = clbk(response, record.decode('utf8', 'replace'))
+                    elapsed += time.monotonic() - t
+                    if inspect.isawaitable(done):
+                        done = await done
+                    if done is True:
+                        return response
+
+                code = await proc.wait()
+                if code != 0:
+                    self.metrics.inc('simple_git_command_errors_total', operation=operation)
+                    return {
+                        'code': code,
+                        'message': (await stderr).decode('utf8')
+                    }
+                return response
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                if not stderr.done():
+                    stderr.cancel()
+                self.metrics.inc('simple_git_commands_total', operation=operation)
+                self.metrics.observe('simple_git_command_duration_seconds', time.monotonic()-start-elapsed, operation=operation)
+                self.metrics.observe('simple_git_parse_duration_seconds', elapsed, operation=operation)
+
+    async def batch(self, operations):
+        """Execute a sequence of operations which modify the repository.
 
-        if isinstance(path, str):
-            cmd.append(path)
-        else:
-            # Assume we have been provided a list:
-            cmd = cmd + path
+        Notes:
+            Operations run in order while holding exclusive access to the repository, thus ensuring that no other command observes (or interleaves with) intermediate states. Execution stops at the first operation which fails.
+
+            Each operation is a `dict` having the following format:
 
-        return self._run(cmd)
+            {
+                'op': string,         # operation name (e.g., 'add', 'reset', 'commit')
+                ...                   # operation arguments (e.g., 'path' for 'add')
+            }
 
-    def checkout_branch(self, branch):
+            where the operation name is one of `BATCH_OPERATIONS` and operation arguments correspond to the arguments of the `Git` method having the same name.
+
+        Args:
+            operations: list of operations
+
+        Returns:
+            A `dict` having the following format:
+
+            {
+                'code': int,          # status code of the last executed operation
+                'results': [...dict]  # results of executed operations
+            }
+
+            If an operation rejects its arguments, its result contains the HTTP status code and error message, and no further operations are executed.
+
+        Raises:
+            HTTPError: must provide a list of valid operations
+
+        """
+        if not isinstance(operations, list) or not operations:
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a list of valid operations.')
+
+        steps = []
+        for operation in operations:
+            if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPERATIONS:
+                raise tornado.web.HTTPError(400, 'invalid argument. Must provide a list of valid operations.')
+            method = getattr(self, operation['op'])
+            args = {k: v for k, v in operation.items() if k != 'op'}
+            try:
+                inspect.signature(method).bind(**args)
+            except TypeError:
+                raise tornado.web.HTTPError(400, 'invalid argument. Invalid arguments for operation: %s.' % operation['op'])
+            steps.append((method, args))
+
+        results = []
+        async with self.scheduler.write():
+            for method, args in steps:
+                try:
+                    response = await method(**args)
+                except tornado.web.HTTPError as err:
+                    response = {
+                        'code': err.status_code,
+                        'message': err.log_message
+                    }
+                results.append(response)
+                if response['code'] != 0:
+                    break
+
+        return {
+            'code': results[-1]['code'],
+            'results': results
+        }
+
+    async def checkout_branch(self, branch):
         """Switch to a specified branch.
 
         Notes:
@@ -169,15 +512,36 @@ class Git():
 
         cmd1 = ['git', 'show-ref', '--quiet', 'refs/heads/'+branch]
         cmd2 = ['git', 'checkout']
-        try:
-            subprocess.run(cmd1, cwd=self.root, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True).stdout
-        except subprocess.CalledProcessError:
+        if (await self._run(cmd1))['code'] != 0:
             cmd2.append('-b')
 
         cmd2.append(branch)
-        return self._run(cmd2)
-
-    def commit(self, subject, body=None):
+        return await self._run(cmd2, write=True)
+
+    async def close(self):
+        """Release resources (e.g., long-lived child processes) held by a class instance."""
+        await self._fetcher.close()
+        await self._maintainer.close()
+        if self._history_task is not None and not self._history_task.done():
+            self._history_task.cancel()
+            try:
+                await self._history_task
+            except asyncio.CancelledError:
+                pass
+        if self._history is not None:
+            await asyncio.get_event_loop().run_in_executor(None, self._history.close)
+        if self._ignored_task is not None and not self._ignored_task.done():
+            self._ignored_task.cancel()
+            try:
+                await self._ignored_task
+            except asyncio.CancelledError:
+                pass
+        await self._objects.close()
+        await self._object_info.close()
+        self._notifier.close()
+        self._watcher.stop()
+
+    async def commit(self, subject, body=None):
         """Record changes to the repository.
 
         Args:
@@ -211,73 +575,14 @@ class Git():
             cmd.append('-m')
             cmd.append(body)
 
-        return self._run(cmd)
-
-    def commit_history(self, path='.', n=None):
-        """Return a commit history.
-
-        Args:
-            path: subdirectory path (default: '.')
-            n: number of commits
-
-        Returns:
-            A `dict` containing the commit history. If able to successfully resolve a commit history, the returned `dict` has the following format:
-
-            {
-                'code': int,              # command status code
-                'history': [...dict]      # commits
-            }
-
-            Each `dict` in `history` has the following format:
-
-            {
-                'hash': string,           # commit hash
-                'author': string,         # commit author
-                'relative_date': string,  # relative date of commit
-                'message': string         # commit message
-            }
-
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
+        return await self._run(cmd, write=True)
 
-            {
-                'code': int,          # command status code
-                'message': string     # error message
-            }
-
-        """
-        def clbk(response, lines):
-            """Process command results.
-
-            Args:
-                response: response `dict`
-                lines: command results
-
-            """
-            response['history'] = []
-            if lines == '':
-                return
-
-            stride = 4
-            i = 0
-            lines = lines.split('\n')
-            while i < len(lines):
-                tmp = {}
-                tmp['hash'] = lines[i]
-                tmp['author'] = lines[i+1]
-                tmp['relative_date'] = lines[i+2]
-                tmp['message'] = lines[i+3]
-                response['history'].append(tmp)
-                i += stride
-
-        cmd = ['git', 'log', '--pretty=format:%H%n%an%n%ar%n%s']
-        if n is not None:
-            cmd.append('-n '+str(n))
-        cmd.append(path)
-        return self._run(cmd, clbk)
-
-    def current_branch(self):
+    async def current_branch(self):
         """Return the current branch.
 
+        Notes:
+            The current branch is resolved by reading `HEAD` and refs directly, falling back to Git when unable to do so (e.g., when the current branch has no commits).
+
         Returns:
             A `dict` containing the current branch. If able to successfully resolve the current branch, the returned `dict` has the following format:
 
@@ -304,48 +609,20 @@ class Git():
             """
             response['branch'] = branch
 
-        cmd = ['git', 'rev-parse', '--abbrev-ref', 'HEAD']
-        return self._run(cmd, clbk)
-
-    def current_changed_files(self, path='.'):
-        """Return the list of files containing changes relative to the index.
-
-        Args:
-            path: subdirectory path (default: '.')
-
-        Returns:
-            A `dict` containing a list of changed files. If able to successfully resolve a list of changed files, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'files': [...string]  # list of changed files
+        async with self.scheduler.read():
+            branch = self._refs.current_branch()
+        if branch is not None:
+            self.metrics.inc('simple_git_ref_reads_total', result='exact')
+            return {
+                'code': 0,
+                'branch': branch
             }
 
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # error message
-            }
-
-        """
-        def clbk(response, lines):
-            """Process command results.
-
-            Args:
-                response: response `dict`
-                lines: command results
-
-            """
-            if lines == '':
-                response['files'] = []
-            else:
-                response['files'] = lines.split('\n')
-
-        cmd = ['git', 'diff', '--name-only', path]
-        return self._run(cmd, clbk)
+        self.metrics.inc('simple_git_ref_reads_total', result='fallback')
+        cmd = ['git', 'rev-parse', '--abbrev-ref', 'HEAD']
+        return await self._run(cmd, clbk)
 
-    def delete_branch(self, branch, force=False):
+    async def delete_branch(self, branch, force=False):
         """Delete a specified branch.
 
         Args:
@@ -378,68 +655,9 @@ class Git():
         if force:
             cmd.append('-f')
         cmd.append(branch)
-        return self._run(cmd)
-
-    def delete_untracked_files(self, path='.'):
-        """Delete untracked files.
-
-        Args:
-            path: subdirectory path (default: '.')
-
-        Returns:
-            A `dict` containing command results. If able to successfully delete untracked files, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # command results
-            }
-
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # error message
-            }
-
-        """
-        cmd = ['git', 'clean', '-df', path]
-        return self._run(cmd)
-
-    def fetch(self, remote=None, prune=False, fetch_all=False):
-        """Download objects and refs from a remote repository.
-
-        Args:
-            remote: name of remote (default: 'origin')
-            prune: boolean indicating whether to remove any remote-tracking references that no longer exist on the remote
-            fetch_all: boolean indicating whether to fetch all remotes
-
-        Returns:
-            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
+        return await self._run(cmd, write=True)
 
-            {
-                'code': int,          # command status code
-                'message': string     # command results
-            }
-
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # error message
-            }
-
-        """
-        cmd = ['git', 'fetch']
-        if prune:
-            cmd.append('--prune')
-        if fetch_all:
-            cmd.append('--all')
-        if remote is not None:
-            cmd.append(remote)
-
-        return self._run(cmd)
-
-    def init(self):
+    async def init(self):
         """Create an empty Git repository or reinitialize an existing repository.
 
         Returns:
@@ -459,11 +677,14 @@ class Git():
 
         """
         cmd = ['git', 'init']
-        return self._run(cmd)
+        return await self._run(cmd, write=True)
 
-    def local_branches(self):
+    async def local_branches(self):
         """Return a list of local branches.
 
+        Notes:
+            Local branches are resolved by reading loose refs and `packed-refs` directly, falling back to Git when unable to do so (e.g., for repositories using the `reftable` ref storage format).
+
         Returns:
             A `dict` containing a list of local branches. If able to successfully resolve a list of local branches, the returned `dict` has the following format:
 
@@ -493,79 +714,20 @@ class Git():
             else:
                 response['branches'] = lines.split('\n')
 
-        cmd = ['git', 'for-each-ref', '--format=\'%(refname:short)\'', 'refs/heads/']
-        return self._run(cmd, clbk)
-
-    def push(self, remote, branch=None):
-        """Update remote refs along with associated objects.
-
-        Args:
-            remote: remote name
-            branch: branch name (default: current branch name)
-
-        Returns:
-            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # command results
-            }
-
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # error message
-            }
-
-        """
-        if not isinstance(remote, str):
-            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid remote argument.')
-
-        cmd = ['git', 'push', remote]
-        if branch is None:
-            cmd.append(self.current_branch()['branch'])
-        else:
-            cmd.append(branch)
-
-        return self._run(cmd)
-
-    def reset(self, path=None):
-        """Remove file contents from the index.
-
-        Notes:
-            If not provided a path, this method removes all file contents from the index.
-
-        Args:
-            path: a subdirectory path, file path, glob, or a list of paths and/or globs
-
-        Returns:
-            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # command results
-            }
-
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # error message
+        async with self.scheduler.read():
+            branches = self._refs.branches()
+        if branches is not None:
+            self.metrics.inc('simple_git_ref_reads_total', result='exact')
+            return {
+                'code': 0,
+                'branches': branches
             }
 
-        """
-        cmd = ['git', 'reset']
-        if path is not None:
-            if isinstance(path, str):
-                cmd.append(path)
-            else:
-                # Assume we have been provided a list:
-                cmd = cmd + path
-
-        return self._run(cmd)
+        self.metrics.inc('simple_git_ref_reads_total', result='fallback')
+        cmd = ['git', 'for-each-ref', '--format=%(refname:short)', 'refs/heads/']
+        return await self._run(cmd, clbk)
 
-    def run(self, args='help'):
+    async def run(self, args='help'):
         """Run a Git command.
 
         Args:
@@ -603,125 +765,28 @@ class Git():
         else:
             cmd = cmd + args
 
-        return self._run(cmd, clbk)
+        return await self._run(cmd, clbk, write=True, operation='run')
+
+    def subscribe(self, clbk):
+        """Register a function to be invoked upon changes to the working tree, index, `HEAD`, or refs.
 
-    def status(self, path='.'):
-        """Return the working tree status.
+        Notes:
+            Changes are debounced. The registered function is provided a sorted `list` of changes, where each change is one of 'branch', 'staged', 'unstaged', or 'refs', thus allowing consumers to only refresh affected information. When a class instance is closed, the registered function is provided `None`.
 
         Args:
-            path: subdirectory path (default: '.')
+            clbk: function which is provided a `list` of changes
 
         Returns:
-            A `dict` containing a list of changes. If able to successfully resolve a list of changes, the returned `dict` has the following format:
-
-            {
-                'code': int,              # command status code
-                'differences': [...dict]  # list of changes
-            }
-
-            For modifications, additions, and deletions, each `dict` in `differences` has the following format:
-
-            {
-                'status': string,  # single-letter action abbreviation
-                'action': string,  # action
-                'file': string     # changed file
-            }
-
-            For copies and renames, each `dict` in `differences` has the following format:
-
-            {
-                'status': string,  # single-letter action abbreviation
-                'action': string,  # action
-                'to': string,      # original path
-                'from': string     # destination path
-            }
-
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # error message
-            }
+            A boolean indicating whether change notifications are available (i.e., whether file system events can be observed).
 
         """
-        def clbk(response, lines):
-            """Process command results.
-
-            Args:
-                response: response `dict`
-                lines: command results
+        return self._notifier.subscribe(clbk)
 
-            """
-            response['differences'] = []
-            if lines == '':
-                return
-
-            lines = lines.split('\n')
-            for line in lines:
-                line = line.strip()
-                tmp = {}
-                tmp['status'] = line[0]
-                if line[0] == 'M':
-                    tmp['action'] = 'modified'
-                    tmp['file'] = line[2:]
-                elif line[0] == 'A':
-                    tmp['action'] = 'added'
-                    tmp['file'] = line[2:]
-                elif line[0] == 'D':
-                    tmp['action'] = 'deleted'
-                    tmp['file'] = line[2:]
-                elif line[0] == 'C':
-                    line = line[2:].split(' -> ')
-                    tmp['action'] = 'copied'
-                    tmp['from'] = line[0]
-                    tmp['to'] = line[1]
-                elif line[0] == 'R':
-                    line = line[2:].split(' -> ')
-                    tmp['action'] = 'renamed'
-                    tmp['from'] = line[0]
-                    tmp['to'] = line[1]
-                elif line[0] == '?':
-                    tmp['action'] = 'untracked'
-                    tmp['file'] = line[3:]
-                response['differences'].append(tmp)
-
-        cmd = ['git', 'status', '--porcelain', '--renames', path]
-        return self._run(cmd, clbk)
-
-    def untracked_files(self, path='.'):
-        """Return a list of untracked files.
+    def unsubscribe(self, clbk):
+        """Remove a function registered via `subscribe`.
 
         Args:
-            path: subdirectory path (default: '.')
-
-        Returns:
-            A `dict` containing a list of untracked files. If able to successfully resolve a list of untracked files, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'files': [...string]  # list of untracked files
-            }
-
-            Otherwise, if an error is encountered, the returned `dict` has the following format:
-
-            {
-                'code': int,          # command status code
-                'message': string     # error message
-            }
+            clbk: previously registered function
 
         """
-        def clbk(response, lines):
-            """Process command results.
-
-            Args:
-                response: response `dict`
-                lines: command results
-
-            """
-            if lines == '':
-                response['files'] = []
-            else:
-                response['files'] = lines.split('\n')
-
-        cmd = ['git', 'ls-files', '-o', '--exclude-standard', path]
-        return self._run(cmd, clbk)
+        self._notifier.unsubscribe(clbk)
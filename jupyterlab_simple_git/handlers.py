@@ -31,31 +31,57 @@
 
 # pylint: disable=W0223
 
+import asyncio
+import json
 import tornado.web
-from notebook.base.handlers import APIHandler
 from notebook.utils import url_path_join
+from jupyterlab_simple_git.base_handlers import BaseHandler, StreamingHandler
+from jupyterlab_simple_git.history_handlers import Blame, CommitCount, CommitHistory, Diff, DiffSummary, Diffstat, FileContents
 
 
-class BaseHandler(APIHandler):
-    """Base handler class.
+# Please keep handler classes in alphabetical order...
 
-    Attributes:
-        git: Git command executer
+class Accelerators(BaseHandler):
+    """Handler for detecting and enabling repository accelerators (e.g., the commit-graph and the untracked cache)."""
 
-    """
+    async def get(self):
+        """Return which repository accelerators are enabled and present.
 
-    @property
-    def git(self):
-        """Return the Git command executor."""
-        return self.settings['git']
+        Response:
+            A JSON object having the following format:
 
+            {
+                'code': int,              # command status code
+                'accelerators': object,   # accelerators, where each accelerator is an object having `supported`, `enabled`, and `present` fields
+                'maintenance': {
+                    'running': bool,      # boolean indicating whether maintenance is running
+                    'interval': float     # number of seconds between background maintenance runs
+                }
+            }
+
+        """
+        res = await self.git.accelerators()
+        self.finish(res)
+
+    async def post(self):
+        """Enable repository accelerators and build them in the background.
+
+        Fields:
+            accelerators: list of accelerator names (one of 'commit_graph', 'multi_pack_index', 'untracked_cache', 'fsmonitor', or 'many_files') (optional)
+
+        Response:
+            A JSON object having the same format as a `GET` response.
+
+        """
+        data = self.get_json_body() or {}
+        res = await self.git.enable_accelerators(data.get('accelerators'))
+        self.finish(res)
 
-# Please keep handler classes in alphabetical order...
 
 class AddFiles(BaseHandler):
     """Handler for adding file contents to the index."""
 
-    def post(self):
+    async def post(self):
         """Add file contents to the index.
 
         Fields:
@@ -82,14 +108,42 @@ class AddFiles(BaseHandler):
         else:
             update_all = True
 
-        res = self.git.add(path, update_all)
+        res = await self.git.add(path, update_all)
+        self.finish(res)
+
+
+class Batch(BaseHandler):
+    """Handler for executing a sequence of operations which modify the repository."""
+
+    async def post(self):
+        """Execute a sequence of operations which modify the repository.
+
+        Fields:
+            operations: list of operations, where each operation is an object having an `op` field (one of 'add', 'checkout_branch', 'commit', 'delete_branch', 'delete_untracked_files', or 'reset') and operation arguments (e.g., `{'op': 'add', 'path': ['a.txt'], 'update_all': false}` or `{'op': 'commit', 'subject': '...'}`)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,            # status code of the last executed operation
+                'results': [...object]  # results of executed operations
+            }
+
+            Operations run in order, and execution stops at the first operation which fails.
+
+        """
+        data = self.get_json_body()
+        if 'operations' not in data:
+            raise tornado.web.HTTPError(400, 'must provide a list of operations')
+
+        res = await self.git.batch(data['operations'])
         self.finish(res)
 
 
 class CheckoutBranch(BaseHandler):
     """Handler for switching to a specified branch."""
 
-    def post(self):
+    async def post(self):
         """Switch to a specified branch.
 
         Fields:
@@ -108,14 +162,14 @@ class CheckoutBranch(BaseHandler):
         if 'branch' not in data:
             raise tornado.web.HTTPError(400, 'must provide a branch name')
 
-        res = self.git.checkout_branch(data['branch'])
+        res = await self.git.checkout_branch(data['branch'])
         self.finish(res)
 
 
 class Commit(BaseHandler):
     """Handler to record changes to the repository."""
 
-    def post(self):
+    async def post(self):
         """Record changes to the repository.
 
         Fields:
@@ -140,49 +194,14 @@ class Commit(BaseHandler):
         else:
             body = None
 
-        res = self.git.commit(data['subject'], body)
-        self.finish(res)
-
-
-class CommitHistory(BaseHandler):
-    """Handler for returning a commit history."""
-
-    def get(self):
-        """Return a commit history.
-
-        Parameters:
-            path: subdirectory path (optional)
-            n: number of commits (optional)
-
-        Response:
-            A JSON object having the following format:
-
-            {
-                'code': int,               # command status code
-                'history': [...Object]     # command results
-            }
-
-            where each `Object` in `history` has the following format:
-
-
-            {
-                'hash': string,           # commit hash
-                'author': string,         # commit author
-                'relative_date': string,  # relative date of commit
-                'message': string         # commit message
-            }
-
-        """
-        path = self.get_query_argument('path', default='.')
-        n = self.get_query_argument('n', default=None)
-        res = self.git.commit_history(path, n)
+        res = await self.git.commit(data['subject'], body)
         self.finish(res)
 
 
 class CurrentBranch(BaseHandler):
     """Handler for returning the current branch."""
 
-    def get(self):
+    async def get(self):
         """Return the current branch.
 
         Response:
@@ -194,14 +213,14 @@ class CurrentBranch(BaseHandler):
             }
 
         """
-        res = self.git.current_branch()
+        res = await self.git.current_branch()
         self.finish(res)
 
 
 class CurrentChangedFiles(BaseHandler):
     """Handler for retrieving a list of files containing changes relative to the index."""
 
-    def get(self):
+    async def get(self):
         """Retrieve a list of files containing changes relative to the index.
 
         Parameters:
@@ -217,14 +236,14 @@ class CurrentChangedFiles(BaseHandler):
 
         """
         path = self.get_query_argument('path', default='.')
-        res = self.git.current_changed_files(path)
+        res = await self.git.current_changed_files(path)
         self.finish(res)
 
 
 class DeleteBranch(BaseHandler):
     """Handler to delete a specified branch."""
 
-    def delete(self):
+    async def delete(self):
         """Delete a specified branch.
 
         Fields:
@@ -247,13 +266,14 @@ class DeleteBranch(BaseHandler):
         elif force == 'False':
             force = False
 
-        self.git.delete_branch(branch, force)
+        res = await self.git.delete_branch(branch, force)
+        self.finish(res)
 
 
 class DeleteUntrackedFiles(BaseHandler):
     """Handler for deleting untracked files."""
 
-    def delete(self):
+    async def delete(self):
         """Delete untracked files.
 
         Fields:
@@ -269,14 +289,80 @@ class DeleteUntrackedFiles(BaseHandler):
 
         """
         path = self.get_query_argument('path', default='.')
-        res = self.git.delete_untracked_files(path)
+        res = await self.git.delete_untracked_files(path)
         self.finish(res)
 
 
-class Fetch(BaseHandler):
+class Events(BaseHandler):
+    """Handler for streaming repository change notifications."""
+
+    # Number of seconds between keep-alive messages:
+    keepalive = 15
+
+    def initialize(self):
+        """Initialize a handler instance."""
+        self._queue = asyncio.Queue()
+
+    async def get(self):
+        """Stream repository change notifications as server-sent events.
+
+        Notes:
+            Upon subscribing, the server sends a `ready` event. Thereafter, whenever the working tree, index, `HEAD`, or refs change, the server sends a `change` event whose data is a JSON object having the following format:
+
+            {
+                'changes': [...string]  # list of changes
+            }
+
+            where each change is one of the following:
+
+                -   'branch': the current branch, current commit, or ahead/behind counts may have changed
+                -   'staged': changes in the index relative to `HEAD` may have changed
+                -   'unstaged': changes in the working tree relative to the index (including untracked files) may have changed
+                -   'refs': branches or remote-tracking branches may have changed
+
+            Changes are debounced, and clients should only re-fetch information corresponding to reported changes.
+
+            If the server stops watching a repository (e.g., upon shutdown), the stream ends, and clients should reconnect.
+
+        Response:
+            A `text/event-stream` response. If the server is unable to observe file system events, the server responds with a 501 status code, and clients should fall back to polling.
+
+        """
+        git = self.git
+        clbk = self._queue.put_nowait
+        if not git.subscribe(clbk):
+            raise tornado.web.HTTPError(501, 'repository change notifications are unavailable')
+
+        self.set_header('Content-Type', 'text/event-stream')
+        self.set_header('Cache-Control', 'no-cache')
+        try:
+            self.write('event: ready\ndata: {}\n\n')
+            await self.flush()
+            while True:
+                try:
+                    changes = await asyncio.wait_for(self._queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    self.write(': keepalive\n\n')
+                    await self.flush()
+                    continue
+                if changes is None:
+                    break
+                self.write('event: change\ndata: '+json.dumps({'changes': changes})+'\n\n')
+                await self.flush()
+        except tornado.iostream.StreamClosedError:
+            return
+        finally:
+            git.unsubscribe(clbk)
+
+    def on_connection_close(self):
+        """Stop streaming when a client disconnects."""
+        self._queue.put_nowait(None)
+
+
+class Fetch(StreamingHandler):
     """Handler to download objects and refs from a remote repository."""
 
-    def get(self):
+    async def get(self):
         """Download objects and refs from a remote repository.
 
         parameters:
@@ -290,6 +376,8 @@ class Fetch(BaseHandler):
                 'message': string     # command results
             }
 
+            If the client accepts `text/event-stream` responses, progress updates (e.g., `{"phase": "Receiving objects", "percent": 45, "current": 450, "total": 1000, "bytes": 1258291, "throughput": 2516582, ...}`) are streamed as `progress` events (see `StreamingHandler`).
+
         """
         remote = self.get_query_argument('remote', default=None)
         prune = self.get_query_argument('prune', default='False')
@@ -304,14 +392,13 @@ class Fetch(BaseHandler):
         elif fetch_all == 'False':
             fetch_all = False
 
-        res = self.git.fetch(remote, prune, fetch_all)
-        self.finish(res)
+        await self.respond(self.git.fetch, remote, prune, fetch_all)
 
 
 class Init(BaseHandler):
     """Handler to create an empty Git repository or reinitialize an existing repository."""
 
-    def post(self):
+    async def post(self):
         """Create an empty Git repository or reinitialize an existing repository.
 
         Response:
@@ -321,14 +408,14 @@ class Init(BaseHandler):
             }
 
         """
-        res = self.git.init()
+        res = await self.git.init()
         self.finish(res)
 
 
 class LocalBranches(BaseHandler):
     """Handler for returning a list of local branches."""
 
-    def get(self):
+    async def get(self):
         """Return a list of local branches.
 
         Response:
@@ -340,14 +427,49 @@ class LocalBranches(BaseHandler):
             }
 
         """
-        res = self.git.local_branches()
+        res = await self.git.local_branches()
+        self.finish(res)
+
+
+class Maintenance(BaseHandler):
+    """Handler for maintaining enabled repository accelerators."""
+
+    async def post(self):
+        """Maintain enabled repository accelerators.
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,          # command status code
+                'tasks': [...string]  # performed tasks
+            }
+
+        """
+        res = await self.git.maintain()
         self.finish(res)
 
 
-class Push(BaseHandler):
+class Metrics(BaseHandler):
+    """Handler for returning server extension metrics."""
+
+    async def get(self):
+        """Return server extension metrics.
+
+        Response:
+            Metrics (e.g., Git command counts, error counts, and latency histograms) in the Prometheus text exposition format.
+
+        """
+        self.set_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+
+        # Bypass `APIHandler.finish`, which forces a JSON content type and records API activity (scrapes should not prevent the server from being culled as idle):
+        tornado.web.RequestHandler.finish(self, self.settings['simple_git'].metrics.render())
+
+
+class Push(StreamingHandler):
     """Handler for updating remote refs along with associated objects."""
 
-    def push(self):
+    async def post(self):
         """Update remote refs along with associated objects.
 
         Fields:
@@ -362,6 +484,8 @@ class Push(BaseHandler):
                 'message': string     # command results
             }
 
+            If the client accepts `text/event-stream` responses, progress updates (e.g., `{"phase": "Writing objects", "percent": 45, "current": 450, "total": 1000, "bytes": 1258291, "throughput": 2516582, ...}`) are streamed as `progress` events (see `StreamingHandler`).
+
         """
         data = self.get_json_body()
         if 'remote' not in data:
@@ -372,14 +496,13 @@ class Push(BaseHandler):
         else:
             branch = None
 
-        res = self.git.push(data['remote'], branch)
-        self.finish(res)
+        await self.respond(self.git.push, data['remote'], branch)
 
 
 class Reset(BaseHandler):
     """Handler for removing file contents from the index."""
 
-    def delete(self):
+    async def delete(self):
         """Remove file contents from the index.
 
         Fields:
@@ -395,14 +518,14 @@ class Reset(BaseHandler):
 
         """
         path = self.get_query_argument('path', default=None)
-        res = self.git.reset(path)
+        res = await self.git.reset(path)
         self.finish(res)
 
 
 class Run(BaseHandler):
     """Handler to run a Git command."""
 
-    def post(self):
+    async def post(self):
         """Run a Git command.
 
         Fields:
@@ -423,14 +546,44 @@ class Run(BaseHandler):
         else:
             args = 'help'
 
-        res = self.git.run(args)
+        res = await self.git.run(args)
+        self.finish(res)
+
+
+class Snapshot(BaseHandler):
+    """Handler for returning the current branch and working tree status."""
+
+    async def get(self):
+        """Return the current branch and working tree status.
+
+        Parameters:
+            path: subdirectory path (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,              # command status code
+                'branch': string,         # branch name
+                'oid': string|null,       # current commit hash or `null` if the current branch has no commits
+                'upstream': string|null,  # upstream branch or `null` if the current branch does not have an upstream branch
+                'ahead': int,             # number of commits in the current branch which are not in the upstream branch
+                'behind': int,            # number of commits in the upstream branch which are not in the current branch
+                'staged': [...Object],    # list of changes in the index (see `Status`)
+                'unstaged': [...Object],  # list of changes in the working tree relative to the index (see `Status`)
+                'untracked': [...string]  # list of untracked files
+            }
+
+        """
+        path = self.get_query_argument('path', default='.')
+        res = await self.git.snapshot(path)
         self.finish(res)
 
 
 class Status(BaseHandler):
     """Handler for returning the working tree status."""
 
-    def get(self):
+    async def get(self):
         """Return the working tree status.
 
         parameters:
@@ -447,30 +600,61 @@ class Status(BaseHandler):
             For modifications, additions, and deletions, each `Object` in `differences` has the following format:
 
             {
-                'status': string,  # single-letter action abbreviation
-                'action': string,  # action
-                'file': string     # changed file
+                'status': string,          # single-letter action abbreviation
+                'action': string,          # action
+                'file': string,            # changed file
+                'index': string,           # single-letter index status ('.' if unmodified)
+                'worktree': string,        # single-letter working tree status ('.' if unmodified)
+                'staged': boolean,         # boolean indicating whether a file has staged changes
+                'unstaged': boolean,       # boolean indicating whether a file has unstaged changes
+                'submodule': Object|null   # submodule state or `null` if a path is not a submodule
             }
 
-            For copies and renames, each `Object` in `differences` has the following format:
+            For copies and renames, each `Object` in `differences` has the following additional fields (in lieu of `file`):
+
+            {
+                'from': string,            # original path
+                'to': string,              # destination path
+                'score': int               # similarity score (percent)
+            }
+
+            For unmerged files, each `Object` in `differences` has an additional `conflict` field containing the two-letter conflict type (e.g., 'UU').
+
+        """
+        path = self.get_query_argument('path', default='.')
+        res = await self.git.status(path)
+        self.finish(res)
+
+
+class StatusTree(BaseHandler):
+    """Handler for returning per-directory counts of changed files."""
+
+    async def get(self):
+        """Return the number of changed files beneath a directory and beneath each of its immediate children.
+
+        Parameters:
+            path: directory path (optional)
+
+        Response:
+            A JSON object having the following format:
 
             {
-                'status': string,  # single-letter action abbreviation
-                'action': string,  # action
-                'to': string,      # original path
-                'from': string     # destination path
+                'code': int,              # command status code
+                'path': string,           # normalized directory path
+                'counts': object,         # number of changed files beneath the directory for each category ('modified', 'added', 'untracked', and 'conflicted')
+                'entries': [...object]    # immediate children which contain changes, where each directory has `name`, `path`, `type`, and `counts` fields and each file has `name`, `path`, `type`, and `category` fields
             }
 
         """
         path = self.get_query_argument('path', default='.')
-        res = self.git.status(path)
+        res = await self.git.status_tree(path)
         self.finish(res)
 
 
 class UntrackedFiles(BaseHandler):
     """Handler for retrieving a list of untracked files."""
 
-    def get(self):
+    async def get(self):
         """Retrieve a list of untracked files.
 
         Parameters:
@@ -486,7 +670,7 @@ class UntrackedFiles(BaseHandler):
 
         """
         path = self.get_query_argument('path', default='.')
-        res = self.git.untracked_files(path)
+        res = await self.git.untracked_files(path)
         self.finish(res)
 
 
@@ -499,21 +683,34 @@ def add_handlers(web_app):
     """
     handlers = [
         # Please keep handlers in alphabetical order...
+        ('/simple_git/accelerators', Accelerators),
         ('/simple_git/add', AddFiles),
+        ('/simple_git/batch', Batch),
+        ('/simple_git/blame', Blame),
         ('/simple_git/checkout_branch', CheckoutBranch),
         ('/simple_git/commit', Commit),
+        ('/simple_git/commit_count', CommitCount),
         ('/simple_git/commit_history', CommitHistory),
         ('/simple_git/current_branch', CurrentBranch),
         ('/simple_git/current_changed_files', CurrentChangedFiles),
         ('/simple_git/delete_branch', DeleteBranch),
         ('/simple_git/delete_untracked_files', DeleteUntrackedFiles),
+        ('/simple_git/diff', Diff),
+        ('/simple_git/diff_summary', DiffSummary),
+        ('/simple_git/diffstat', Diffstat),
+        ('/simple_git/events', Events),
         ('/simple_git/fetch', Fetch),
+        ('/simple_git/file_contents', FileContents),
         ('/simple_git/init', Init),
         ('/simple_git/local_branches', LocalBranches),
+        ('/simple_git/maintenance', Maintenance),
+        ('/simple_git/metrics', Metrics),
         ('/simple_git/push', Push),
         ('/simple_git/reset', Reset),
         ('/simple_git/run', Run),
+        ('/simple_git/snapshot', Snapshot),
         ('/simple_git/status', Status),
+        ('/simple_git/status_tree', StatusTree),
         ('/simple_git/untracked_files', UntrackedFiles)
     ]
 
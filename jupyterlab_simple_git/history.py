@@ -0,0 +1,479 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Index commits and the paths they modify in an on-disk database."""
+
+import os
+import posixpath
+import sqlite3
+import threading
+from jupyterlab_simple_git.pathspec import literal
+from jupyterlab_simple_git.utils import git_dir
+
+# Database schema version (stored as `PRAGMA user_version`):
+SCHEMA_VERSION = 2
+
+# Database tables:
+SCHEMA = (
+    'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+    'CREATE TABLE commits (id INTEGER PRIMARY KEY, hash TEXT NOT NULL UNIQUE, author TEXT NOT NULL, email TEXT NOT NULL, time INTEGER NOT NULL, subject TEXT NOT NULL)',
+    'CREATE TABLE paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE)',
+    'CREATE TABLE changes (path_id INTEGER NOT NULL, commit_id INTEGER NOT NULL, PRIMARY KEY (path_id, commit_id)) WITHOUT ROWID',
+    'CREATE TABLE lineage (seq INTEGER PRIMARY KEY, commit_id INTEGER NOT NULL UNIQUE)',
+    'CREATE TABLE tips (hash TEXT PRIMARY KEY, used INTEGER NOT NULL)'
+)
+
+# Maximum number of previously indexed tips to retain (see `HistoryIndex.tips`):
+MAX_TIPS = 64
+
+
+class HistoryIndexError(Exception):
+    """Exception raised when unable to read or update a commit index."""
+
+
+def _plural(n, unit):
+    """Format a quantity.
+
+    Args:
+        n: quantity
+        unit: singular unit
+
+    Returns:
+        formatted quantity
+
+    """
+    return '%d %s%s' % (n, unit, '' if n == 1 else 's')
+
+
+def relative_date(timestamp, now):
+    """Format a timestamp relative to the current time in the same manner as Git (e.g., `git log --format=%ar`).
+
+    Args:
+        timestamp: Unix timestamp
+        now: current Unix timestamp
+
+    Returns:
+        relative date (e.g., '3 days ago')
+
+    """
+    diff = int(now) - int(timestamp)
+    if diff < 0:
+        return 'in the future'
+    if diff < 90:
+        return _plural(diff, 'second')+' ago'
+    diff = (diff+30) // 60
+    if diff < 90:
+        return _plural(diff, 'minute')+' ago'
+    diff = (diff+30) // 60
+    if diff < 36:
+        return _plural(diff, 'hour')+' ago'
+    diff = (diff+12) // 24
+    if diff < 14:
+        return _plural(diff, 'day')+' ago'
+    if diff < 70:
+        return _plural((diff+3) // 7, 'week')+' ago'
+    if diff < 365:
+        return _plural((diff+15) // 30, 'month')+' ago'
+    if diff < 1825:
+        months = (diff*12*2+365) // (365*2)
+        if months % 12:
+            return _plural(months // 12, 'year')+', '+_plural(months % 12, 'month')+' ago'
+        return _plural(months // 12, 'year')+' ago'
+    return _plural((diff+183) // 365, 'year')+' ago'
+
+
+def parse_commit(record):
+    """Parse a commit emitted by `git log -z --name-only --format=%x1e%H%x1f%P%x1f%an%x1f%ae%x1f%at%x1f%s`.
+
+    Notes:
+        The returned `dict` has the following format:
+
+        {
+            'hash': string,       # commit hash
+            'parents': int,       # number of parents
+            'author': string,     # author name
+            'email': string,      # author email
+            'time': int,          # author timestamp
+            'subject': string,    # commit subject
+            'paths': set          # modified files and their ancestor directories
+        }
+
+    Args:
+        record: command results for a single commit (excluding the leading record separator)
+
+    Returns:
+        `dict` describing a commit
+
+    """
+    header, _, files = record.partition('\x00')
+    fields = header.split('\x1f', 5)
+    if files.startswith('\n'):
+        files = files[1:]
+
+    paths = set()
+    for path in files.split('\x00'):
+        if path == '':
+            continue
+        while path != '' and path not in paths:
+            paths.add(path)
+            path = path.rpartition('/')[0]
+
+    return {
+        'hash': fields[0],
+        'parents': len(fields[1].split()),
+        'author': fields[2],
+        'email': fields[3],
+        'time': int(fields[4]),
+        'subject': fields[5],
+        'paths': paths
+    }
+
+
+def history_path(path):
+    """Normalize a path for querying the commit index.
+
+    Args:
+        path: subdirectory or file path
+
+    Returns:
+        path relative to the repository root (or an empty string for the entire repository), or `None` if the commit index cannot resolve the path (e.g., a glob or a path outside of the repository)
+
+    """
+    if not isinstance(path, str) or path == '' or not literal([path]) or path.startswith('/'):
+        return None
+    path = posixpath.normpath(path)
+    if path == '..' or path.startswith('../'):
+        return None
+    return '' if path == '.' else path
+
+
+def history_args(rev, path):
+    """Return `git log` and `git rev-list` arguments selecting the commits reachable from a revision which modify a path.
+
+    Notes:
+        History simplification is disabled (i.e., `--full-history`) in order to match the commit index (see `HistoryIndex`), and the repository root selects every commit, including commits which do not modify any file.
+
+    Args:
+        rev: revision
+        path: subdirectory path, file path, or glob
+
+    Returns:
+        `list` of arguments
+
+    """
+    if history_path(path) == '':
+        return [rev, '--']
+    return ['--full-history', rev, '--', path]
+
+
+class HistoryIndex():
+    """Class for maintaining an on-disk index of commits and the paths they modify.
+
+    Notes:
+        The index is a SQLite database within the Git directory, which records, for each indexed commit, its metadata and the files (and the ancestor directories of those files) it modifies. For merge commits, paths which differ from any parent are recorded. Accordingly, queries for a path list the same commits as `git log --full-history <path>`, which, unlike `git log <path>`, does not simplify history by following only a parent from which a merge does not differ (and thus lists commits on side branches whose changes were discarded by a merge, along with the merges which brought in changes from side branches). Queries without a path list every commit in the lineage, as listed by `git log`.
+
+        The index additionally records the "lineage", which is the list of commits reachable from the most recently indexed commit (the tip) in the order listed by `git rev-list`. As commits are immutable, indexed commits are retained when the tip changes (e.g., after switching branches), and only the lineage needs to be rebuilt.
+
+        Database errors are raised as `HistoryIndexError`, such that callers may fall back to querying Git.
+
+        Methods perform blocking database operations and should be run in an executor. Access to the database connection is serialized, such that methods may be called from any thread.
+
+    Attributes:
+        root: canonical file system path of a Git repository
+
+    """
+
+    def __init__(self, root):
+        """Initialize a class instance."""
+        self.root = root
+        self._conn = None
+        self._path_ids = {}
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Return a database connection, creating the database if necessary.
+
+        Raises:
+            HistoryIndexError: unable to open database
+
+        """
+        if self._conn is not None:
+            return self._conn
+
+        gitdir = git_dir(self.root)
+        if gitdir is None:
+            raise HistoryIndexError('unable to resolve Git directory')
+        path = os.path.join(gitdir, 'simple-git', 'history.sqlite3')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # Indexes are derived data, so discard an index created by a different version:
+                conn.execute('BEGIN')
+                for (name,) in conn.execute('SELECT name FROM sqlite_master WHERE type = \'table\'').fetchall():
+                    conn.execute('DROP TABLE "%s"' % name)
+                for stmt in SCHEMA:
+                    conn.execute(stmt)
+                conn.execute('PRAGMA user_version = %d' % SCHEMA_VERSION)
+                conn.execute('COMMIT')
+            # Lineage updates are staged in a connection-private table (see `stage_lineage`):
+            conn.execute('CREATE TEMP TABLE staged (seq INTEGER PRIMARY KEY, commit_id INTEGER NOT NULL)')
+        except (OSError, sqlite3.Error) as err:
+            raise HistoryIndexError(str(err))
+
+        self._conn = conn
+        return conn
+
+    def _path_id(self, cursor, path):
+        """Return the identifier of a path, inserting the path if necessary.
+
+        Args:
+            cursor: database cursor
+            path: file or directory path
+
+        Returns:
+            path identifier
+
+        """
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            cursor.execute('INSERT OR IGNORE INTO paths (path) VALUES (?)', (path,))
+            if cursor.rowcount > 0:
+                path_id = cursor.lastrowid
+            else:
+                path_id = cursor.execute('SELECT id FROM paths WHERE path = ?', (path,)).fetchone()[0]
+            self._path_ids[path] = path_id
+        return path_id
+
+    def _query(self, columns, path, author):
+        """Return a query over the lineage.
+
+        Args:
+            columns: result columns
+            path: file or directory path (or `None` for all commits)
+            author: string which must be included in the author name and email (formatted as `name <email>`) (optional)
+
+        Returns:
+            `tuple` containing a SQL statement and parameters
+
+        """
+        if path is None:
+            # Commits which do not modify any path (e.g., empty commits and merges which do not differ from a parent) are not listed in `changes`:
+            sql = 'SELECT '+columns+' FROM lineage l JOIN commits c ON c.id = l.commit_id WHERE 1'
+            params = []
+        else:
+            sql = 'SELECT '+columns+' FROM paths p JOIN changes ch ON ch.path_id = p.id JOIN lineage l ON l.commit_id = ch.commit_id JOIN commits c ON c.id = ch.commit_id WHERE p.path = ?'
+            params = [path]
+        if author is not None:
+            sql += ' AND instr(c.author || \' <\' || c.email || \'>\', ?) > 0'
+            params.append(author)
+        return sql, params
+
+    def add(self, commits):
+        """Index commits.
+
+        Notes:
+            Commits which have already been indexed are ignored.
+
+        Args:
+            commits: `list` of commits (see `parse_commit`)
+
+        Raises:
+            HistoryIndexError: unable to update database
+
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN')
+                for commit in commits:
+                    cursor.execute('INSERT OR IGNORE INTO commits (hash, author, email, time, subject) VALUES (?, ?, ?, ?, ?)', (commit['hash'], commit['author'], commit['email'], commit['time'], commit['subject']))
+                    if cursor.rowcount == 0:
+                        continue
+                    commit_id = cursor.lastrowid
+                    cursor.executemany('INSERT OR IGNORE INTO changes (path_id, commit_id) VALUES (?, ?)', [(self._path_id(cursor, path), commit_id) for path in commit['paths']])
+                cursor.execute('COMMIT')
+            except sqlite3.Error as err:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                self._path_ids.clear()
+                raise HistoryIndexError(str(err))
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._path_ids.clear()
+
+    def count(self, path=None, author=None):
+        """Return the number of commits in the lineage which modify a path.
+
+        Args:
+            path: file or directory path (or `None` for all commits) (optional)
+            author: string which must be included in the author name and email (formatted as `name <email>`) (optional)
+
+        Returns:
+            number of commits
+
+        Raises:
+            HistoryIndexError: unable to query database
+
+        """
+        sql, params = self._query('COUNT(*)', path, author)
+        with self._lock:
+            try:
+                return self._connect().execute(sql, params).fetchone()[0]
+            except sqlite3.Error as err:
+                raise HistoryIndexError(str(err))
+
+    def history(self, path=None, author=None, offset=0, n=None):
+        """Return commits in the lineage which modify a path, most recent first.
+
+        Args:
+            path: file or directory path (or `None` for all commits) (optional)
+            author: string which must be included in the author name and email (formatted as `name <email>`) (optional)
+            offset: number of matching commits to skip (default: 0)
+            n: maximum number of commits (default: all commits)
+
+        Returns:
+            `list` of `tuple`s containing a commit hash, author name, author timestamp, and subject
+
+        Raises:
+            HistoryIndexError: unable to query database
+
+        """
+        sql, params = self._query('c.hash, c.author, c.time, c.subject', path, author)
+        sql += ' ORDER BY l.seq DESC LIMIT ? OFFSET ?'
+        params += [-1 if n is None else n, offset]
+        with self._lock:
+            try:
+                return self._connect().execute(sql, params).fetchall()
+            except sqlite3.Error as err:
+                raise HistoryIndexError(str(err))
+
+    def set_lineage(self, tip, reset=False):
+        """Update the lineage with staged commits (see `stage_lineage`).
+
+        Notes:
+            The lineage and the tip are updated in a single transaction, such that queries never observe a partially updated lineage. Staged commits are discarded.
+
+        Args:
+            tip: commit hash of the new tip
+            reset: boolean indicating whether to replace (rather than extend) the lineage (default: False)
+
+        Raises:
+            HistoryIndexError: unable to update database
+
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN')
+                if reset:
+                    conn.execute('DELETE FROM lineage')
+                seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM lineage').fetchone()[0]
+                conn.execute('INSERT OR IGNORE INTO lineage (seq, commit_id) SELECT ?+seq, commit_id FROM staged ORDER BY seq', (seq,))
+                conn.execute('DELETE FROM staged')
+                conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (\'tip\', ?)', (tip,))
+                conn.execute('INSERT OR REPLACE INTO tips (hash, used) VALUES (?, (SELECT COALESCE(MAX(used), 0)+1 FROM tips))', (tip,))
+                conn.execute('DELETE FROM tips WHERE hash NOT IN (SELECT hash FROM tips ORDER BY used DESC LIMIT ?)', (MAX_TIPS,))
+                conn.execute('COMMIT')
+            except sqlite3.Error as err:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise HistoryIndexError(str(err))
+
+    def stage_lineage(self, hashes, clear=False):
+        """Stage commits for inclusion in the lineage.
+
+        Notes:
+            Staged commits are stored in a temporary table, such that the lineage may be updated from the output of `git rev-list` in batches, without retaining the entire list of commits in memory. Staged commits are not visible to queries until the lineage is updated (see `set_lineage`).
+
+            All commits must have already been indexed.
+
+        Args:
+            hashes: `list` of commit hashes, such that every commit follows its parents
+            clear: boolean indicating whether to discard previously staged commits (default: False)
+
+        Raises:
+            HistoryIndexError: unable to update database
+
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN')
+                if clear:
+                    conn.execute('DELETE FROM staged')
+                conn.executemany('INSERT INTO staged (commit_id) SELECT id FROM commits WHERE hash = ?', ((oid,) for oid in hashes))
+                conn.execute('COMMIT')
+            except sqlite3.Error as err:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise HistoryIndexError(str(err))
+
+    @property
+    def tip(self):
+        """Return the commit hash of the tip or `None` if no commits have been indexed.
+
+        Raises:
+            HistoryIndexError: unable to query database
+
+        """
+        with self._lock:
+            try:
+                row = self._connect().execute('SELECT value FROM meta WHERE key = \'tip\'').fetchone()
+            except sqlite3.Error as err:
+                raise HistoryIndexError(str(err))
+        return None if row is None else row[0]
+
+    def tips(self):
+        """Return previously indexed tips, most recently indexed first.
+
+        Notes:
+            As every commit reachable from a previously indexed tip has been indexed, listing commits which need indexing may exclude the history of previous tips.
+
+        Returns:
+            `list` of commit hashes
+
+        Raises:
+            HistoryIndexError: unable to query database
+
+        """
+        with self._lock:
+            try:
+                return [row[0] for row in self._connect().execute('SELECT hash FROM tips ORDER BY used DESC')]
+            except sqlite3.Error as err:
+                raise HistoryIndexError(str(err))
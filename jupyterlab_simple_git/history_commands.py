@@ -0,0 +1,425 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Git commands for resolving commit histories."""
+
+import asyncio
+import time
+import tornado.web
+from jupyterlab_simple_git.cat_file import CatFileError
+from jupyterlab_simple_git.diff_commands import MAX_DIFFSTAT_REVS
+from jupyterlab_simple_git.history import HistoryIndexError, history_args, history_path, parse_commit, relative_date
+
+# Default number of commits per page when paginating a commit history:
+HISTORY_PAGE_SIZE = 100
+
+# Number of commits to index per database transaction when updating the commit index:
+HISTORY_INDEX_BATCH_SIZE = 1000
+
+
+# Please keep class methods ordered in alphabetical order...
+
+
+class HistoryCommands():
+    """Mixin class providing commit histories and maintaining the commit index (see `Git`)."""
+
+    async def _history_index(self):
+        """Return the commit index, if up-to-date with `HEAD`.
+
+        Notes:
+            If the commit index lags behind `HEAD`, the index is updated. If the repository has not yet been indexed, the index is built in the background, and, in the meantime, callers are expected to query Git.
+
+        Returns:
+            A commit index or `None` if a commit index is unavailable.
+
+        """
+        if self._history is None:
+            return None
+        try:
+            info = await self._object_info.read('HEAD')
+        except CatFileError:
+            info = None
+        if info is None:
+            return None
+
+        head = info['oid']
+        history = self._history
+        try:
+            tip = await asyncio.get_event_loop().run_in_executor(None, lambda: history.tip)
+        except HistoryIndexError:
+            # E.g., the Git directory is not writable:
+            self._history = None
+            return None
+        if tip == head:
+            return self._history
+
+        task = self._history_task
+        if task is None or task.done():
+            task = self._history_task = asyncio.ensure_future(self._update_history(head))
+        if tip is None:
+            return None
+        await asyncio.shield(task)
+        if self._history is not None and await asyncio.get_event_loop().run_in_executor(None, lambda: history.tip) == head:
+            return self._history
+        return None
+
+    async def _update_history(self, head):
+        """Update the commit index.
+
+        Notes:
+            Commits are indexed by a single `git log` invocation which excludes the history of previously indexed tips, and, thus, only lists commits which have not been indexed. If the previous tip is an ancestor of `head`, the lineage is extended with the commits listed by `git rev-list head --not <tip>`. Otherwise (e.g., after switching branches or rewriting history), the lineage is rebuilt from `git rev-list head`, which does not require computing any diffs.
+
+            Indexed commits are written to the database in batches, thus bounding memory consumption and the duration of each database transaction. Similarly, the commits listed by `git rev-list` are staged in batches before updating the lineage in a single transaction. Database operations are run in an executor, such that the event loop is not blocked, and command results are not read while a batch is being written.
+
+        Args:
+            head: commit hash
+
+        """
+        history = self._history
+        loop = asyncio.get_event_loop()
+        try:
+            tip = await loop.run_in_executor(None, lambda: history.tip)
+            tips = await loop.run_in_executor(None, history.tips)
+            infos = await asyncio.gather(*[self._object_info.read(oid) for oid in tips])
+
+            batch = []
+
+            def index(response, record):
+                """Index an individual commit."""
+                if record == '':
+                    return False
+                commit = parse_commit(record)
+                if batch and batch[-1]['hash'] == commit['hash']:
+                    # Merge commits are listed once for each parent from which they differ, and modify paths which differ from any parent (as in `git log --full-history`):
+                    batch[-1]['paths'] |= commit['paths']
+                    return False
+                if len(batch) >= HISTORY_INDEX_BATCH_SIZE:
+                    return write(batch.copy(), commit)
+                batch.append(commit)
+                return False
+
+            async def write(commits, commit):
+                """Write a batch of commits to the database."""
+                await loop.run_in_executor(None, history.add, commits)
+                batch[:] = [commit]
+                return False
+
+            # Exclude previously indexed tips which still exist (e.g., have not been garbage collected after a rebase):
+            exclude = [oid for oid, info in zip(tips, infos) if info is not None]
+            cmd = ['git', 'log', '-z', '--root', '--name-only', '--no-renames', '--diff-merges=separate', '--format=%x1e%H%x1f%P%x1f%an%x1f%ae%x1f%at%x1f%s', head]
+            if exclude:
+                cmd += ['--not'] + exclude
+            response = await self._stream(cmd+['--'], index, sep=b'\x1e')
+            if response['code'] != 0:
+                raise HistoryIndexError(response['message'])
+            await loop.run_in_executor(None, history.add, batch)
+
+            reset = tip is None or (await self._run(['git', 'merge-base', '--is-ancestor', tip, head]))['code'] != 0
+            hashes = []
+            cmd = ['git', 'rev-list', '--reverse', head]
+            if not reset:
+                cmd += ['--not', tip]
+
+            # Discard commits staged by a previous update which failed:
+            await loop.run_in_executor(None, history.stage_lineage, [], True)
+
+            def extend(response, record):
+                """Extend the lineage by an individual commit."""
+                if record != '':
+                    hashes.append(record)
+                if len(hashes) >= HISTORY_INDEX_BATCH_SIZE:
+                    return stage()
+                return False
+
+            async def stage():
+                """Stage a batch of commits."""
+                staged = hashes.copy()
+                hashes.clear()
+                await loop.run_in_executor(None, history.stage_lineage, staged)
+                return False
+
+            response = await self._stream(cmd+['--'], extend, sep=b'\n')
+            if response['code'] != 0:
+                raise HistoryIndexError(response['message'])
+            await stage()
+            await loop.run_in_executor(None, history.set_lineage, head, reset)
+        except (CatFileError, HistoryIndexError, tornado.web.HTTPError):
+            self.metrics.inc('simple_git_history_index_updates_total', result='error')
+            return
+        self.metrics.inc('simple_git_history_index_updates_total', result='reset' if reset else 'extend')
+
+    async def commit_count(self, path='.', author=None):
+        """Return the number of commits which modify a path.
+
+        Notes:
+            If a path is a literal file or directory path, the count is resolved from the commit index (see `commit_history`), and, thus, typically does not require spawning a process. Otherwise, the count is resolved by `git rev-list --count`.
+
+            Commits are counted in the same manner as commits are listed by `commit_history`. Accordingly, the repository root counts every commit (including commits which do not modify any file), and any other path counts commits as listed by `git rev-list --full-history`.
+
+        Args:
+            path: subdirectory path, file path, or glob (default: '.')
+            author: string which must be included in the commit author name and email (formatted as `name <email>`) (optional)
+
+        Returns:
+            A `dict` containing the number of commits. If able to successfully count commits, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'count': int          # number of commits
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid author argument
+
+        """
+        if author is not None and (not isinstance(author, str) or author == ''):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid author argument.')
+
+        hpath = history_path(path)
+        if hpath is not None:
+            index = await self._history_index()
+            self.metrics.inc('simple_git_history_index_requests_total', result='fallback' if index is None else 'hit')
+            if index is not None:
+                try:
+                    return {
+                        'code': 0,
+                        'count': await asyncio.get_event_loop().run_in_executor(None, index.count, hpath or None, author)
+                    }
+                except HistoryIndexError:
+                    pass
+
+        def clbk(response, count):
+            response['count'] = int(count)
+
+        cmd = ['git', 'rev-list', '--count']
+        if author is not None:
+            cmd += ['--fixed-strings', '--author='+author]
+        cmd += history_args('HEAD', path)
+        return await self._run(cmd, clbk)
+
+    async def commit_history(self, path='.', n=None, cursor=None, stats=False, author=None):
+        """Return a commit history.
+
+        Notes:
+            A commit history is paginated. The returned `dict` includes a cursor which may be provided in a subsequent call in order to resume the commit history immediately after the last returned commit. If not provided a page size `n`, a page includes at most `HISTORY_PAGE_SIZE` commits. A cursor identifies the commit at which the history started, and, thus, subsequent pages are unaffected by commits added after the first page was returned.
+
+            Command results are processed incrementally, such that memory consumption is proportional to the page size, rather than the length of the history.
+
+            Identical concurrent requests share a single execution (see `_shared`).
+
+            If a history is filtered by a literal file or directory path, or by author, commits are resolved from an on-disk commit index, which is updated incrementally as `HEAD` changes (see `HistoryIndex`). Accordingly, filtered histories do not require walking the entire history and computing diffs for each commit. While a repository is first indexed, commits are resolved by `git log`. The commit index lists commits in the order listed by `git rev-list`.
+
+            A history of the repository root lists every commit, including commits which do not modify any file (e.g., empty commits). A history of any other path is resolved without history simplification (i.e., as by `git log --full-history`), regardless of whether commits are resolved from the commit index or by `git log`. Accordingly, for non-linear histories, the history includes commits on side branches whose changes to a path were discarded by a merge, and merges which differ from any parent at that path, both of which `git log <path>` omits by default.
+
+            When requested, line counts for the changes introduced by each returned commit (across the entire commit, and not only `path`) are computed by a single Git invocation, and are cached indefinitely (see `diffstat`).
+
+        Args:
+            path: subdirectory path (default: '.')
+            n: number of commits, which must be a positive integer (default: `HISTORY_PAGE_SIZE`)
+            cursor: cursor returned by a previous call (optional)
+            stats: boolean indicating whether to include line counts for each commit (default: False)
+            author: string which must be included in the commit author name and email (formatted as `name <email>`) (optional)
+
+        Returns:
+            A `dict` containing the commit history. If able to successfully resolve a commit history, the returned `dict` has the following format:
+
+            {
+                'code': int,              # command status code
+                'history': [...dict],     # commits
+                'cursor': string|None     # cursor for resolving the next page or `None` if no commits remain
+            }
+
+            Each `dict` in `history` has the following format:
+
+            {
+                'hash': string,           # commit hash
+                'author': string,         # commit author
+                'relative_date': string,  # relative date of commit
+                'message': string,        # commit message
+                'stats': dict             # line counts (only included if `stats` is true)
+            }
+
+            Each `stats` `dict` has the following format:
+
+            {
+                'files_changed': int,     # number of changed files
+                'additions': int,         # number of added lines (excluding binary files)
+                'deletions': int          # number of deleted lines (excluding binary files)
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid cursor
+            HTTPError: must provide a valid author argument
+            HTTPError: must provide a valid page size argument
+
+        """
+        if author is not None and (not isinstance(author, str) or author == ''):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid author argument.')
+        if n is not None:
+            try:
+                n = int(n)
+            except (TypeError, ValueError):
+                n = 0
+            if n <= 0:
+                raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid page size argument.')
+        else:
+            n = HISTORY_PAGE_SIZE
+        if cursor is not None:
+            try:
+                tip, offset = cursor.split(':')
+                offset = int(offset)
+                int(tip, 16)
+            except ValueError:
+                raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid cursor.')
+        else:
+            tip = 'HEAD'
+            offset = 0
+
+            # Pin the first page to the current commit so that subsequent pages are stable:
+            try:
+                info = await self._object_info.read('HEAD')
+            except CatFileError:
+                info = None
+            if info is not None:
+                tip = info['oid']
+
+        def clbk(response, record):
+            """Process an individual commit.
+
+            Args:
+                response: response `dict`
+                record: command results for a single commit
+
+            Returns:
+                A boolean indicating whether to stop processing command results.
+
+            """
+            history = response.setdefault('history', [])
+            response.setdefault('cursor', None)
+            if len(history) == n:
+                # An additional commit exists, so there is another page:
+                response['cursor'] = tip+':'+str(offset+n)
+                return True
+
+            fields = record.split('\x1f', 3)
+            history.append({
+                'hash': fields[0],
+                'author': fields[1],
+                'relative_date': fields[2],
+                'message': fields[3]
+            })
+            return False
+
+        cmd = ['git', 'log', '-z', '--pretty=format:%H%x1f%an%x1f%ar%x1f%s']
+        if author is not None:
+            cmd += ['--fixed-strings', '--author='+author]
+        if offset > 0:
+            cmd.append('--skip='+str(offset))
+        cmd.append('--max-count='+str(n+1))
+        cmd += history_args(tip, path)
+
+        async def compute():
+            response = await self._stream(cmd, clbk)
+            if response['code'] == 0:
+                response.setdefault('history', [])
+                response.setdefault('cursor', None)
+            return response
+
+        response = None
+        hpath = history_path(path)
+        if hpath is not None and (hpath != '' or author is not None):
+            index = await self._history_index()
+            try:
+                loop = asyncio.get_event_loop()
+                if index is not None and tip != 'HEAD' and tip != await loop.run_in_executor(None, lambda: index.tip):
+                    # The cursor was issued for a different tip:
+                    index = None
+                if index is not None:
+                    rows = await loop.run_in_executor(None, index.history, hpath or None, author, offset, n+1)
+            except HistoryIndexError:
+                index = None
+            self.metrics.inc('simple_git_history_index_requests_total', result='fallback' if index is None else 'hit')
+            if index is not None:
+                now = time.time()
+                response = {
+                    'code': 0,
+                    'history': [{
+                        'hash': oid,
+                        'author': name,
+                        'relative_date': relative_date(timestamp, now),
+                        'message': subject
+                    } for oid, name, timestamp, subject in rows[:n]],
+                    'cursor': None
+                }
+                if len(rows) > n:
+                    response['cursor'] = tip+':'+str(offset+n)
+
+        if response is None:
+            response = await self._shared(('commit_history', path, tip, offset, n, author), compute)
+        if not stats or response['code'] != 0 or len(response['history']) == 0:
+            return response
+
+        hashes = [commit['hash'] for commit in response['history']]
+        counts = []
+        for i in range(0, len(hashes), MAX_DIFFSTAT_REVS):
+            res = await self.diffstat(hashes[i:i+MAX_DIFFSTAT_REVS])
+            if res['code'] != 0:
+                return res
+            for stat in res['stats']:
+                if 'code' in stat:
+                    # A commit may have become unreachable and been pruned since the history was resolved:
+                    return {
+                        'code': stat['code'],
+                        'message': stat['message']
+                    }
+            counts += res['stats']
+
+        # As the shared response must not be mutated, return a copy which includes line counts:
+        history = []
+        for commit, stat in zip(response['history'], counts):
+            history.append(dict(commit, stats={
+                'files_changed': stat['files_changed'],
+                'additions': stat['additions'],
+                'deletions': stat['deletions']
+            }))
+        return dict(response, history=history)
@@ -0,0 +1,299 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Handlers which inspect commit histories, diffs, line authorship, and file contents."""
+
+# pylint: disable=W0223
+
+from jupyterlab_simple_git.base_handlers import BaseHandler, StreamingHandler
+
+
+# Please keep handler classes in alphabetical order...
+
+class Blame(StreamingHandler):
+    """Handler for returning line authorship for a file."""
+
+    event = 'ranges'
+    keyword = 'write'
+
+    async def get(self):
+        """Return line authorship for a file.
+
+        Parameters:
+            path: file path
+            rev: revision (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,             # command status code
+                'commit': string,        # resolved commit hash
+                'blob': string,          # blob hash of the file as of the commit
+                'size': int,             # file size in bytes
+                'oversized': bool,       # boolean indicating whether the file exceeds the maximum file size (and, thus, no line authorship was computed)
+                'ranges': [...object],   # ranges of lines, ordered by line number, where each range is an object having `commit`, `line`, `orig_line`, `lines`, and `path` fields
+                'commits': object        # commits keyed by commit hash, where each commit is an object having `author`, `email`, `time`, `summary`, and `boundary` fields
+            }
+
+            If the client accepts `text/event-stream` responses, ranges are streamed as `ranges` events as soon as Git attributes them to a commit, each having a JSON object with `ranges` and `commits` fields (where `commits` only contains commits which have not been previously sent), and the final `result` event omits the `ranges` and `commits` fields (see `StreamingHandler`).
+
+        """
+        path = self.get_query_argument('path', default=None)
+        rev = self.get_query_argument('rev', default='HEAD')
+        await self.respond(self.git.blame, path, rev)
+
+
+class CommitCount(BaseHandler):
+    """Handler for returning the number of commits which modify a path."""
+
+    async def get(self):
+        """Return the number of commits which modify a path.
+
+        Parameters:
+            path: subdirectory path, file path, or glob (optional)
+            author: string which must be included in the commit author name and email (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,          # command status code
+                'count': int          # number of commits
+            }
+
+        """
+        path = self.get_query_argument('path', default='.')
+        author = self.get_query_argument('author', default=None)
+        res = await self.git.commit_count(path, author)
+        self.finish(res)
+
+
+class CommitHistory(BaseHandler):
+    """Handler for returning a commit history."""
+
+    async def get(self):
+        """Return a commit history.
+
+        Parameters:
+            path: subdirectory path (optional)
+            n: number of commits per page (optional; default: 100)
+            cursor: cursor returned by a previous request for resolving the next page of results (optional)
+            stats: boolean indicating whether to include line counts for each commit (optional)
+            author: string which must be included in the commit author name and email (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,               # command status code
+                'history': [...Object],    # command results
+                'cursor': string|null      # cursor for resolving the next page or `null` if no commits remain
+            }
+
+            where each `Object` in `history` has the following format:
+
+
+            {
+                'hash': string,           # commit hash
+                'author': string,         # commit author
+                'relative_date': string,  # relative date of commit
+                'message': string,        # commit message
+                'stats': Object           # line counts (only included if `stats` is true)
+            }
+
+            where each `stats` `Object` has the following format:
+
+            {
+                'files_changed': int,     # number of changed files
+                'additions': int,         # number of added lines (excluding binary files)
+                'deletions': int          # number of deleted lines (excluding binary files)
+            }
+
+        """
+        path = self.get_query_argument('path', default='.')
+        n = self.get_query_argument('n', default=None)
+        cursor = self.get_query_argument('cursor', default=None)
+        stats = self.get_query_argument('stats', default='False') == 'True'
+        author = self.get_query_argument('author', default=None)
+        res = await self.git.commit_history(path, n, cursor, stats, author)
+        self.finish(res)
+
+
+class Diff(StreamingHandler):
+    """Handler for returning the diff of a single file."""
+
+    event = 'chunk'
+    keyword = 'write'
+
+    async def get(self):
+        """Return the diff of a single file.
+
+        Parameters:
+            path: file path
+            staged: boolean indicating whether to compare the index (rather than the working tree) (optional)
+            rev: revision against which to compare (optional)
+            max_bytes: maximum number of bytes of diff output (optional; may not exceed the configured maximum)
+            max_lines: maximum number of lines of diff output (optional; may not exceed the configured maximum)
+            from: original path of a copied or renamed file (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,          # command status code
+                'binary': bool,       # boolean indicating whether Git considers the file binary
+                'oversized': bool,    # boolean indicating whether the file exceeds the maximum file size (and, thus, no diff was computed)
+                'size': int,          # size in bytes of the larger of the compared versions of the file
+                'truncated': bool,    # boolean indicating whether diff output was truncated
+                'bytes': int,         # number of returned bytes of diff output
+                'lines': int,         # number of returned lines of diff output
+                'diff': string        # unified diff
+            }
+
+            If the client accepts `text/event-stream` responses, diff output is streamed as `chunk` events, each having a JSON string containing one or more complete lines, and the final `result` event omits the `diff` field (see `StreamingHandler`).
+
+        """
+        path = self.get_query_argument('path', default=None)
+        staged = self.get_query_argument('staged', default='False') == 'True'
+        rev = self.get_query_argument('rev', default=None)
+        max_bytes = self.get_query_argument('max_bytes', default=None)
+        max_lines = self.get_query_argument('max_lines', default=None)
+        original = self.get_query_argument('from', default=None)
+        await self.respond(self.git.diff, path, staged, rev, max_bytes, max_lines, original)
+
+
+class DiffSummary(BaseHandler):
+    """Handler for returning a summary of changes for each changed file."""
+
+    async def get(self):
+        """Return a summary of changes for each changed file.
+
+        Parameters:
+            path: subdirectory path, file path, or glob (optional)
+            staged: boolean indicating whether to compare the index (rather than the working tree) (optional)
+            rev: revision against which to compare (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,              # command status code
+                'files': [...Object]      # changed files
+            }
+
+            where each `Object` in `files` has the following format:
+
+            {
+                'file': string,           # changed file
+                'from': string|null,      # original path for copies and renames or `null`
+                'additions': int|null,    # number of added lines or `null` for binary files
+                'deletions': int|null,    # number of deleted lines or `null` for binary files
+                'binary': bool            # boolean indicating whether Git considers the file binary
+            }
+
+        """
+        path = self.get_query_argument('path', default='.')
+        staged = self.get_query_argument('staged', default='False') == 'True'
+        rev = self.get_query_argument('rev', default=None)
+        res = await self.git.diff_summary(path, staged, rev)
+        self.finish(res)
+
+
+class Diffstat(BaseHandler):
+    """Handler for returning line counts for changes introduced by commits or between revisions."""
+
+    async def get(self):
+        """Return line counts for changes introduced by commits or between revisions.
+
+        Parameters:
+            rev: commit (e.g., `HEAD~2`), range (e.g., `v1.0..HEAD`), or symmetric range (e.g., `main...topic`), which may be repeated
+            files: boolean indicating whether to include line counts for each changed file (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,              # command status code
+                'stats': [...Object]      # line counts for each revision
+            }
+
+            where each `Object` in `stats` has the following format:
+
+            {
+                'rev': string,            # revision
+                'from': string,           # hash of the tree compared against
+                'to': string,             # hash of the tree which was compared
+                'files_changed': int,     # number of changed files
+                'additions': int,         # number of added lines (excluding binary files)
+                'deletions': int,         # number of deleted lines (excluding binary files)
+                'files': [...Object]      # line counts for each changed file (only included if `files` is true)
+            }
+
+            If unable to resolve a revision, its `Object` in `stats` has the following format:
+
+            {
+                'rev': string,            # revision
+                'code': int,              # command status code
+                'message': string         # error message
+            }
+
+        """
+        revs = self.get_query_arguments('rev')
+        files = self.get_query_argument('files', default='False') == 'True'
+        res = await self.git.diffstat(revs, files)
+        self.finish(res)
+
+
+class FileContents(BaseHandler):
+    """Handler for returning the contents of a file at a specified revision."""
+
+    async def get(self):
+        """Return the contents of a file at a specified revision.
+
+        Parameters:
+            path: file path relative to the repository root
+            rev: revision (optional)
+
+        Response:
+            A JSON object having the following format:
+
+            {
+                'code': int,          # command status code
+                'oid': string,        # blob hash
+                'size': int,          # file size in bytes
+                'encoding': string,   # contents encoding (either 'text' or 'base64')
+                'contents': string    # file contents
+            }
+
+        """
+        path = self.get_query_argument('path')
+        rev = self.get_query_argument('rev', default='HEAD')
+        res = await self.git.file_contents(path, rev)
+        self.finish(res)
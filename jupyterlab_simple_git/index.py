@@ -0,0 +1,491 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Read the Git index without spawning a process."""
+
+import bisect
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import threading
+from jupyterlab_simple_git.utils import git_dir
+
+# Index entry flags:
+ASSUME_VALID = 0x8000
+EXTENDED = 0x4000
+STAGE_MASK = 0x3000
+NAME_MASK = 0x0fff
+
+# Extended index entry flags (index version 3 and later):
+SKIP_WORKTREE = 0x4000
+INTENT_TO_ADD = 0x2000
+
+# Index entry file modes:
+MODE_GITLINK = 0o160000
+MODE_REGULAR = 0o100000
+
+_HEADER = struct.Struct('>4sII')
+
+_EXTENSION = struct.Struct('>4sI')
+
+_UINT16 = struct.Struct('>H')
+
+_MASK = 0xffffffff
+
+# Comparison results for index entries which are not clean:
+CHANGED = 'changed'
+STAT_DIRTY = 'stat_dirty'
+AMBIGUOUS = 'ambiguous'
+
+
+class IndexFormatError(Exception):
+    """Exception raised when unable to parse an index file."""
+
+
+def _hash_size(gitdir):
+    """Resolve the object hash size of a repository.
+
+    Args:
+        gitdir: Git directory
+
+    Returns:
+        object hash size in bytes
+
+    """
+    paths = [os.path.join(gitdir, 'config')]
+    try:
+        with open(os.path.join(gitdir, 'commondir'), 'r') as f:
+            paths.append(os.path.join(gitdir, f.readline().strip(), 'config'))
+    except OSError:
+        pass
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    key, _, value = line.partition('=')
+                    if key.strip().lower() == 'objectformat' and value.strip().lower() == 'sha256':
+                        return 32
+        except OSError:
+            pass
+    return 20
+
+
+def _varint(data, offset):
+    """Decode a variable-length integer used for prefix compression in version 4 index files.
+
+    Args:
+        data: index file contents
+        offset: byte offset
+
+    Returns:
+        A `tuple` containing the decoded integer and the byte offset immediately following the encoded integer.
+
+    """
+    c = data[offset]
+    value = c & 127
+    while c & 128:
+        offset += 1
+        c = data[offset]
+        value = ((value+1) << 7) | (c & 127)
+    return value, offset+1
+
+
+def parse_index(data, hash_size=20):
+    """Parse the contents of a Git index file.
+
+    Notes:
+        Index versions 2, 3, and 4 are supported. Extensions are skipped rather than parsed, and their contents are returned undecoded. In particular, the untracked cache (`UNTR`) and file system monitor (`FSMN`) extensions are not used to narrow a comparison against the working tree (see `Index`, which instead relies on a repository watcher). Extensions whose signatures do not begin with an uppercase letter (e.g., the split index (`link`) and sparse index (`sdir`) extensions) are required in order to correctly interpret index entries.
+
+        Each entry is a `tuple` having the following format:
+
+            (path, fields, extended_flags)
+
+        where `path` is a byte string relative to the repository root and `fields` is a `tuple` containing (truncated) stat data, the raw object hash, and entry flags:
+
+            (ctime, ctime_nsec, mtime, mtime_nsec, dev, ino, mode, uid, gid, size, oid, flags)
+
+    Args:
+        data: index file contents (e.g., a `bytes` or `mmap` object)
+        hash_size: object hash size in bytes (default: 20)
+
+    Returns:
+        A `dict` having the following format:
+
+        {
+            'version': int,        # index version
+            'entries': [...tuple], # index entries
+            'extensions': dict     # mapping of extension signatures to extension contents
+        }
+
+    Raises:
+        IndexFormatError: unable to parse an index file
+
+    """
+    if len(data) < _HEADER.size+hash_size:
+        raise IndexFormatError('truncated index file')
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b'DIRC':
+        raise IndexFormatError('invalid index signature')
+    if version not in (2, 3, 4):
+        raise IndexFormatError('unsupported index version: %d' % version)
+
+    entry = struct.Struct('>10I%dsH' % hash_size)
+    unpack = entry.unpack_from
+    find = data.find
+    end = len(data) - hash_size
+    entries = []
+    append = entries.append
+    offset = _HEADER.size
+    path = b''
+    try:
+        for _ in range(count):
+            fields = unpack(data, offset)
+            flags = fields[11]
+            i = offset + entry.size
+            extended = 0
+            if flags & EXTENDED:
+                if version < 3:
+                    raise IndexFormatError('unexpected extended flags')
+                extended = _UINT16.unpack_from(data, i)[0]
+                i += 2
+            if version == 4:
+                n, i = _varint(data, i)
+                j = find(b'\x00', i, end)
+                if j < 0 or n > len(path):
+                    raise IndexFormatError('invalid index entry')
+                path = path[:len(path)-n] + data[i:j]
+                offset = j + 1
+            else:
+                # Path lengths which do not fit in the entry flags require searching for the terminating NUL byte:
+                j = i + (flags & NAME_MASK)
+                if flags & NAME_MASK == NAME_MASK:
+                    j = find(b'\x00', i, end)
+                if j < 0 or j > end:
+                    raise IndexFormatError('invalid index entry')
+                path = data[i:j]
+
+                # Entries are padded with one to eight NUL bytes to a multiple of eight bytes:
+                offset += (j-offset+8) & ~7
+            append((path, fields, extended))
+    except (struct.error, IndexError) as err:
+        raise IndexFormatError('truncated index file') from err
+
+    extensions = {}
+    while offset+_EXTENSION.size <= end:
+        signature, size = _EXTENSION.unpack_from(data, offset)
+        offset += _EXTENSION.size
+        if offset+size > end:
+            raise IndexFormatError('truncated index extension')
+        extensions[signature.decode('ascii', 'replace')] = data[offset:offset+size]
+        offset += size
+
+    return {
+        'version': version,
+        'entries': entries,
+        'extensions': extensions
+    }
+
+
+class Index():
+    """Class for comparing the Git index against the working tree without spawning a process.
+
+    Notes:
+        The index file is memory-mapped and parsed only when it changes. Comparing an index entry against the working tree only requires an `lstat` call. An entry whose stat data matches the working tree is unchanged. An entry whose file is missing or whose file type differs is changed. An entry for a regular file whose stat data differs is "stat-dirty", and whether its contents changed must be determined by hashing the file (e.g., after touching a file or when applying clean filters). Symbolic link targets are hashed in-process. Other entries (submodules, intent-to-add entries, and changes to the executable bit) are ambiguous and must be resolved by Git.
+
+        As in Git, an entry whose modification time is not older than the index file is "racily clean" and is treated as stat-dirty.
+
+        If a watcher is delivering file system events, a comparison is incremental. Only entries which changed in the index, entries which were previously not clean, and entries whose files were reported by the watcher are compared against the working tree.
+
+    Attributes:
+        root: canonical file system path of a Git repository
+        watcher: repository watcher (optional)
+
+    """
+
+    def __init__(self, root, watcher=None):
+        """Initialize a class instance."""
+        self.root = root
+        self.watcher = watcher
+        self._path = None
+        self._hash_size = 20
+        self._hash = 'sha1'
+        self._key = None
+        self._index = None
+        self._state = None
+        self._lock = threading.Lock()
+
+    def _compare(self, entries):
+        """Compare index entries against the working tree.
+
+        Args:
+            entries: index entries
+
+        Returns:
+            A `dict` mapping the path of each entry which is not clean to a comparison result (`CHANGED`, `STAT_DIRTY`, or `AMBIGUOUS`).
+
+        """
+        root = os.fsencode(self.root) + b'/'
+        ts_sec, ts_nsec = self._index['timestamp']
+        lstat = os.lstat
+        out = {}
+        for name, fields, extended in entries:
+            flags = fields[11]
+            if flags & STAGE_MASK:
+                out[name] = CHANGED
+                continue
+            if flags & ASSUME_VALID or extended & SKIP_WORKTREE:
+                continue
+            mode = fields[6] & 0o170000
+            if extended & INTENT_TO_ADD or mode == MODE_GITLINK:
+                out[name] = AMBIGUOUS
+                continue
+            try:
+                s = lstat(root+name)
+            except (FileNotFoundError, NotADirectoryError):
+                out[name] = CHANGED
+                continue
+            if stat.S_IFMT(s.st_mode) != mode:
+                out[name] = CHANGED
+                continue
+            if mode == MODE_REGULAR and (fields[6] ^ s.st_mode) & 0o100:
+                out[name] = AMBIGUOUS
+                continue
+            mtime, mtime_nsec = divmod(s.st_mtime_ns, 1000000000)
+            ctime, ctime_nsec = divmod(s.st_ctime_ns, 1000000000)
+            if (
+                fields[2] != mtime & _MASK or
+                fields[3] != mtime_nsec or
+                fields[0] != ctime & _MASK or
+                fields[1] != ctime_nsec or
+                fields[5] != s.st_ino & _MASK or
+                fields[7] != s.st_uid & _MASK or
+                fields[8] != s.st_gid & _MASK or
+                fields[9] != s.st_size & _MASK or
+                ts_sec < fields[2] or (ts_sec == fields[2] and ts_nsec <= fields[3])
+            ):
+                if mode == MODE_REGULAR:
+                    out[name] = STAT_DIRTY
+                elif self._hash_link(root+name) != fields[10]:
+                    out[name] = CHANGED
+
+        return out
+
+    def _hash_link(self, path):
+        """Compute the object hash of a symbolic link.
+
+        Args:
+            path: file system path
+
+        Returns:
+            raw object hash or `None` if unable to read a symbolic link
+
+        """
+        try:
+            target = os.readlink(path)
+        except OSError:
+            return None
+        h = hashlib.new(self._hash)
+        h.update(b'blob %d\x00' % len(target))
+        h.update(target)
+        return h.digest()
+
+    def _select(self, path):
+        """Return the index entries for a path and, if a path is a directory, for all paths beneath it.
+
+        Args:
+            path: byte string relative to the repository root
+
+        Returns:
+            list of index entries
+
+        """
+        names = self._index['names']
+        entries = self._index['entries']
+        out = entries[bisect.bisect_left(names, path):bisect.bisect_right(names, path)]
+
+        # Paths beneath a directory are contiguous, as `/` immediately precedes `0`:
+        out.extend(entries[bisect.bisect_left(names, path+b'/'):bisect.bisect_left(names, path+b'0')])
+        return out
+
+    def changed_files(self, path='.'):
+        """Compare the index against the working tree.
+
+        Notes:
+            Entries which are marked "assume unchanged" or "skip worktree" are never reported as changed. Unmerged entries are always reported as changed. Submodules and intent-to-add entries are reported as ambiguous.
+
+            This method performs blocking file system calls and should be run in an executor.
+
+        Args:
+            path: subdirectory path relative to the repository root (default: '.')
+
+        Returns:
+            If able to compare the index against the working tree in-process, a `dict` having the following format:
+
+            {
+                'changed': [...bytes],     # sorted list of changed files
+                'stat_dirty': [...tuple],  # sorted list of (file, object hash) pairs for files whose contents must be hashed
+                'ambiguous': [...bytes]    # sorted list of files which must be compared by Git
+            }
+
+            Otherwise (e.g., if not a Git repository, if provided a path outside of the repository, or if an index uses a split or sparse index), `None`.
+
+        Raises:
+            IndexFormatError: unable to parse the index file
+
+        """
+        path = os.path.normpath(path)
+        if path.startswith('..') or os.path.isabs(path) or ':' in path or any(c in path for c in '*?[\\'):
+            return None
+        prefix = b'' if path == '.' else os.fsencode(path)
+
+        with self._lock:
+            if self.load() is None:
+                return None
+            index = self._index
+            state = self._state
+            watching = self.watcher is not None and self.watcher.available
+            paths = self.watcher.drain() if watching else None
+            if paths is not None:
+                paths = [os.fsencode(os.path.relpath(p, self.root)) for p in paths]
+            if not watching:
+                state = None
+                dirty = self._compare(self._select(prefix) if prefix else index['entries'])
+            elif state is None or paths is None or b'.' in paths or index['timestamp'] < state['index']['timestamp']:
+                dirty = self._compare(index['entries'])
+            else:
+                candidates = []
+                if index is not state['index']:
+                    previous = state['index']['lookup']
+                    candidates = [e for e in index['entries'] if previous.get(e[0]) != e]
+                lookup = index['lookup']
+                candidates.extend(lookup[name] for name in state['dirty'] if name in lookup)
+                for p in paths:
+                    if not p.startswith(b'..'):
+                        candidates.extend(self._select(p))
+                dirty = self._compare(candidates)
+            if watching:
+                self._state = {
+                    'index': index,
+                    'dirty': dirty
+                }
+
+        out = {
+            CHANGED: [],
+            STAT_DIRTY: [],
+            AMBIGUOUS: []
+        }
+        lookup = index['lookup']
+        for name in sorted(dirty):
+            if prefix and not (name.startswith(prefix) and (len(name) == len(prefix) or name[len(prefix)] == 0x2f)):
+                continue
+            result = dirty[name]
+            if result == STAT_DIRTY:
+                out[result].append((name, lookup[name][1][10].hex()))
+            else:
+                out[result].append(name)
+
+        return out
+
+    def lookup(self):
+        """Return a mapping of index entry paths to index entries.
+
+        Returns:
+            A `dict` mapping paths (as byte strings) to index entries or `None` if unable to read the index in-process.
+
+        Raises:
+            IndexFormatError: unable to parse the index file
+
+        """
+        with self._lock:
+            index = self.load()
+        return None if index is None else index['lookup']
+
+    def load(self):
+        """Load the index, reusing a previously parsed index if the index file has not changed.
+
+        Notes:
+            In addition to the fields returned by `parse_index`, a loaded index includes the following fields:
+
+            {
+                'names': [...bytes],   # entry paths
+                'lookup': dict,        # mapping of paths to entries
+                'timestamp': tuple     # index file modification time (seconds, nanoseconds)
+            }
+
+        Returns:
+            A loaded index or `None` if unable to resolve a Git directory or if the index uses unsupported extensions.
+
+        Raises:
+            IndexFormatError: unable to parse the index file
+
+        """
+        if self._path is None:
+            gitdir = git_dir(self.root)
+            if gitdir is None:
+                return None
+            self._path = os.path.join(gitdir, 'index')
+            self._hash_size = _hash_size(gitdir)
+            self._hash = 'sha256' if self._hash_size == 32 else 'sha1'
+        try:
+            f = open(self._path, 'rb')
+        except FileNotFoundError:
+            # Nothing has been added to a new repository:
+            f = None
+            key = None
+            index = {
+                'version': 2,
+                'entries': [],
+                'extensions': {}
+            }
+            ts = (0, 0)
+
+        if f is not None:
+            with f:
+                s = os.fstat(f.fileno())
+                key = (s.st_ino, s.st_size, s.st_mtime_ns)
+                if key == self._key:
+                    return self._index
+                if s.st_size == 0:
+                    raise IndexFormatError('empty index file')
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    index = parse_index(data, self._hash_size)
+            ts = divmod(s.st_mtime_ns, 1000000000)
+
+        if any(not 'A' <= name[0] <= 'Z' for name in index['extensions']):
+            index = None
+        else:
+            index['names'] = [e[0] for e in index['entries']]
+            index['lookup'] = dict(zip(index['names'], index['entries']))
+            index['timestamp'] = ts
+
+        self._key = key
+        self._index = index
+        return index
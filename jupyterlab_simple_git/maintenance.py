@@ -0,0 +1,197 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Schedule background repository maintenance."""
+
+import asyncio
+import random
+import time
+import tornado.web
+from jupyterlab_simple_git.metrics import Metrics
+
+# Maximum number of seconds between maintenance runs after repeated failures:
+MAX_BACKOFF = 86400.0
+
+
+class Maintainer():
+    """Class for coalescing and scheduling repository maintenance (e.g., updating the commit-graph).
+
+    Notes:
+        At most one maintenance run is in flight at a time. Callers requesting maintenance while a run is in flight wait for the running maintenance and share its result. A running maintenance run is only cancelled once every waiting caller has been cancelled, unless the run was started in the background.
+
+        If `interval` is positive, maintenance runs in the background every `interval` seconds (randomly perturbed by up to `jitter` times the interval in order to avoid synchronized runs across repositories). A background run is skipped if another run (e.g., requested by a client) has completed since the background run was scheduled. After consecutive failures, the interval doubles for each failure up to `MAX_BACKOFF` seconds.
+
+    Attributes:
+        interval: number of seconds between background maintenance runs (0 disables background maintenance)
+        jitter: maximum random perturbation of the interval between background runs as a fraction of the interval
+        failures: number of consecutive failed maintenance runs
+        metrics: metrics collector
+
+    """
+
+    def __init__(self, maintain, interval=0.0, jitter=0.1, metrics=None):
+        """Initialize a class instance.
+
+        Args:
+            maintain: coroutine function which performs maintenance and returns a response `dict`
+            interval: number of seconds between background maintenance runs (default: 0)
+            jitter: maximum random perturbation of the interval between background runs as a fraction of the interval (default: 0.1)
+            metrics: metrics collector (optional)
+
+        """
+        self.interval = interval
+        self.jitter = jitter
+        self.failures = 0
+        self.metrics = Metrics() if metrics is None else metrics
+        self._maintain = maintain
+        self._flight = None
+        self._last = float('-inf')
+        self._timer = None
+        self._scheduled = None
+        self._task = None
+        if interval > 0:
+            self._schedule()
+
+    async def _background(self):
+        """Run maintenance in the background."""
+        try:
+            if self._last > self._scheduled:
+                self.metrics.inc('simple_git_maintenance_runs_total', result='skipped')
+                return
+            try:
+                await self.maintain()
+            except tornado.web.HTTPError:
+                pass
+        finally:
+            self._task = None
+            if self.interval > 0:
+                self._schedule()
+
+    def _delay(self):
+        """Return the number of seconds until the next background maintenance run.
+
+        Returns:
+            number of seconds
+
+        """
+        delay = min(self.interval * 2**min(self.failures, 16), max(MAX_BACKOFF, self.interval))
+        return delay * random.uniform(1.0-self.jitter, 1.0+self.jitter)
+
+    def _done(self, flight):
+        """Process a completed maintenance run.
+
+        Args:
+            flight: in-flight maintenance `dict`
+
+        """
+        if self._flight is flight:
+            self._flight = None
+        task = flight['task']
+        if task.cancelled():
+            return
+        if task.exception() is None and task.result()['code'] == 0:
+            self._last = time.monotonic()
+            self.failures = 0
+            self.metrics.inc('simple_git_maintenance_runs_total', result='success')
+        else:
+            self.failures += 1
+            self.metrics.inc('simple_git_maintenance_runs_total', result='failure')
+
+    def _flight_for(self, background):
+        """Return the in-flight maintenance run, starting a run if none is in flight.
+
+        Args:
+            background: boolean indicating whether the run should continue after every waiting caller has been cancelled
+
+        Returns:
+            in-flight maintenance `dict`
+
+        """
+        flight = self._flight
+        if flight is None:
+            flight = self._flight = {
+                'waiters': 0,
+                'background': background
+            }
+            flight['task'] = asyncio.ensure_future(self._maintain())
+            flight['task'].add_done_callback(lambda _: self._done(flight))
+        elif background:
+            flight['background'] = True
+        return flight
+
+    def _schedule(self):
+        """Schedule the next background maintenance run."""
+        self._scheduled = time.monotonic()
+        self._timer = asyncio.get_event_loop().call_later(self._delay(), self._start_background)
+
+    def _start_background(self):
+        """Start a background maintenance run."""
+        self._timer = None
+        self._task = asyncio.ensure_future(self._background())
+
+    async def close(self):
+        """Stop background maintenance and cancel running maintenance."""
+        self.interval = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        tasks = []
+        if self._flight is not None:
+            tasks.append(self._flight['task'])
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def maintain(self):
+        """Run maintenance, sharing the result of a maintenance run if one is already running.
+
+        Returns:
+            A `dict` containing maintenance results.
+
+        """
+        flight = self._flight_for(False)
+        flight['waiters'] += 1
+        try:
+            # Prevent a cancelled caller from cancelling maintenance on which other callers are waiting:
+            return await asyncio.shield(flight['task'])
+        finally:
+            flight['waiters'] -= 1
+            if flight['waiters'] == 0 and not flight['background'] and not flight['task'].done():
+                flight['task'].cancel()
+
+    @property
+    def running(self):
+        """Return a boolean indicating whether maintenance is running."""
+        return self._flight is not None
+
+    def start(self):
+        """Start maintenance in the background without waiting for the result (e.g., after enabling accelerators)."""
+        self._flight_for(True)
@@ -0,0 +1,289 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Git commands for repository maintenance and accelerators."""
+
+import asyncio
+import tornado.web
+from jupyterlab_simple_git.accelerators import ACCELERATORS, detect, parse_config
+from jupyterlab_simple_git.index import IndexFormatError
+from jupyterlab_simple_git.process import low_priority
+from jupyterlab_simple_git.utils import git_dir
+from jupyterlab_simple_git.watcher import MAX_IGNORED
+
+
+# Please keep class methods ordered in alphabetical order...
+
+
+class MaintenanceCommands():
+    """Mixin class providing background maintenance and repository accelerators (see `Git`)."""
+
+    async def _detect(self):
+        """Detect which accelerators are enabled and present.
+
+        Returns:
+            A `dict` containing command results. If able to successfully detect accelerators, the returned `dict` has the following format:
+
+            {
+                'code': int,              # command status code
+                'accelerators': dict,     # accelerators (see `accelerators.detect`)
+                'index': dict|None        # loaded index or `None` if unable to load the index
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        gitdir = git_dir(self.root)
+        if gitdir is None:
+            return {
+                'code': 128,
+                'message': 'fatal: not a git repository: '+self.root
+            }
+
+        if self._fsmonitor is None:
+            response = await self._run(['git', 'version', '--build-options'])
+            if response['code'] != 0:
+                return response
+            self._fsmonitor = 'fsmonitor--daemon' in response['message']
+
+        def clbk(response, data):
+            response['config'] = parse_config(data)
+
+        response = await self._run(['git', 'config', '--list', '-z'], clbk)
+        if response['code'] != 0:
+            return response
+
+        try:
+            index = await asyncio.get_event_loop().run_in_executor(None, self._index.load)
+        except (OSError, IndexFormatError):
+            index = None
+
+        return {
+            'code': 0,
+            'accelerators': detect(gitdir, response['config'], index, self._fsmonitor),
+            'index': index
+        }
+
+    async def _maintain(self):
+        """Maintain enabled accelerators.
+
+        Notes:
+            Maintenance performs the following tasks, depending on which accelerators are enabled:
+
+                -   commit-graph: write a commit-graph (including changed-path Bloom filters, which accelerate path-limited history) or, if already present, incrementally update the commit-graph (`git maintenance run --task=commit-graph`).
+                -   multi-pack-index: write a multi-pack-index or, if already present, incrementally repack small pack files (`git maintenance run --task=incremental-repack`).
+                -   index-version: rewrite the index using version 4 (`feature.manyFiles`).
+                -   refresh-index: refresh cached file system information in the index, thus updating the untracked cache and file system monitor state, which read-only commands (e.g., `status`) never write.
+
+            Tasks which only operate on the object database run with low CPU and I/O priority and do not wait for other commands. Tasks which update the index run exclusively (see `Scheduler`), and, thus, run with normal priority in order to avoid delaying other commands.
+
+        Returns:
+            A `dict` containing command results. If able to successfully perform maintenance, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'tasks': [...string]  # performed tasks
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        response = await self._detect()
+        if response['code'] != 0:
+            return response
+        accelerators = response['accelerators']
+        index = response['index']
+
+        tasks = []
+        cmds = []
+        maintenance = []
+        if accelerators['commit_graph']['enabled']:
+            tasks.append('commit-graph')
+            if accelerators['commit_graph']['present']:
+                maintenance.append('--task=commit-graph')
+            else:
+                cmds.append(['git', 'commit-graph', 'write', '--reachable', '--changed-paths', '--split', '--no-progress'])
+        if accelerators['multi_pack_index']['enabled']:
+            tasks.append('multi-pack-index')
+            if accelerators['multi_pack_index']['present']:
+                maintenance.append('--task=incremental-repack')
+            else:
+                cmds.append(['git', 'multi-pack-index', 'write', '--no-progress'])
+        if maintenance:
+            cmds.append(['git', 'maintenance', 'run', '--quiet'] + maintenance)
+
+        for cmd in cmds:
+            response = await self._run(low_priority(cmd), operation='maintenance')
+            if response['code'] != 0:
+                return response
+
+        if accelerators['many_files']['enabled'] and index is not None and index['version'] != 4:
+            tasks.append('index-version')
+            response = await self._run(['git', 'update-index', '--index-version', '4'], write=True, operation='maintenance')
+            if response['code'] != 0:
+                return response
+
+        if any(accelerators[name]['enabled'] for name in ('untracked_cache', 'fsmonitor', 'many_files')):
+            tasks.append('refresh-index')
+            response = await self._run(['git', 'status', '--porcelain', '-z'], write=True, operation='maintenance')
+            if response['code'] != 0:
+                return response
+
+        return {
+            'code': 0,
+            'tasks': tasks
+        }
+
+    async def _update_ignored(self):
+        """Provide the watcher with the untracked paths which Git ignores, such that changes to those paths do not invalidate cached results.
+
+        Notes:
+            Entirely ignored directories (e.g., build output) are listed as a single path. Ignored paths are listed again whenever ignore rules or the index change (see `Watcher.ignore`).
+
+        """
+        generation = self._watcher.ignored_generation
+        paths = []
+
+        def clbk(response, record):
+            """Record an individual ignored path."""
+            if record != '':
+                paths.append(record)
+            return len(paths) >= MAX_IGNORED
+
+        response = await self._stream(['git', '--no-optional-locks', 'ls-files', '-z', '--others', '--ignored', '--exclude-standard', '--directory'], clbk)
+        if response['code'] == 0:
+            self._watcher.ignore(paths, generation)
+
+    async def accelerators(self):
+        """Return which repository accelerators (e.g., the commit-graph and the untracked cache) are enabled and present.
+
+        Returns:
+            A `dict` containing command results. If able to successfully detect accelerators, the returned `dict` has the following format:
+
+            {
+                'code': int,              # command status code
+                'accelerators': dict,     # accelerators (see `accelerators.detect`)
+                'maintenance': {
+                    'running': bool,      # boolean indicating whether maintenance is running
+                    'interval': float     # number of seconds between background maintenance runs
+                }
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        response = await self._detect()
+        if response['code'] != 0:
+            return response
+        return {
+            'code': 0,
+            'accelerators': response['accelerators'],
+            'maintenance': {
+                'running': self._maintainer.running,
+                'interval': self._maintainer.interval
+            }
+        }
+
+    async def enable_accelerators(self, names=None):
+        """Enable repository accelerators.
+
+        Notes:
+            Accelerators are enabled by setting repository configuration settings (see `accelerators.ACCELERATORS`). Accelerators which are not supported by the installed Git (e.g., the built-in file system monitor on some platforms) are skipped.
+
+            Once enabled, accelerators are built by a maintenance run in the background (see `maintain`).
+
+        Args:
+            names: list of accelerator names (default: all accelerators)
+
+        Returns:
+            A `dict` containing command results (see `accelerators`).
+
+        Raises:
+            HTTPError: invalid argument
+
+        """
+        if names is None:
+            names = list(ACCELERATORS)
+        elif not isinstance(names, list) or any(name not in ACCELERATORS for name in names):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid accelerators argument.')
+
+        response = await self._detect()
+        if response['code'] != 0:
+            return response
+        for name in names:
+            if not response['accelerators'][name]['supported']:
+                continue
+            for key, _ in ACCELERATORS[name]:
+                res = await self._run(['git', 'config', key, 'true'], write=True)
+                if res['code'] != 0:
+                    return res
+
+        self._maintainer.start()
+        return await self.accelerators()
+
+    async def maintain(self):
+        """Maintain enabled repository accelerators.
+
+        Notes:
+            If maintenance is already running (e.g., in the background), this method waits for the running maintenance and returns its result (see `Maintainer`).
+
+            If `maintenance_interval` is positive, maintenance also runs in the background every `maintenance_interval` seconds. Background maintenance is disabled by default.
+
+        Returns:
+            A `dict` containing command results. If able to successfully perform maintenance, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'tasks': [...string]  # performed tasks
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        return await self._maintainer.maintain()
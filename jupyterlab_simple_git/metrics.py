@@ -0,0 +1,190 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Collect metrics and render them in the Prometheus text exposition format."""
+
+import bisect
+import collections
+
+# Histogram bucket upper bounds (in seconds):
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Metric descriptions:
+DESCRIPTIONS = {
+    'simple_git_commands_total': ('counter', 'Number of executed Git commands.'),
+    'simple_git_command_errors_total': ('counter', 'Number of Git commands which exited with a non-zero status code.'),
+    'simple_git_command_timeouts_total': ('counter', 'Number of network operations terminated for failing to report progress.'),
+    'simple_git_command_cancellations_total': ('counter', 'Number of network operations terminated because a client disconnected.'),
+    'simple_git_fetch_requests_total': ('counter', 'Number of fetch requests, labeled by whether a request started a fetch or joined a running fetch.'),
+    'simple_git_prefetches_total': ('counter', 'Number of scheduled background fetches, labeled by outcome.'),
+    'simple_git_command_duration_seconds': ('histogram', 'Time spent waiting for Git commands to exit.'),
+    'simple_git_parse_duration_seconds': ('histogram', 'Time spent processing Git command results.'),
+    'simple_git_queue_wait_seconds': ('histogram', 'Time spent waiting for the repository scheduler before running a Git command.'),
+    'simple_git_status_cache_requests_total': ('counter', 'Number of working tree status cache lookups.'),
+    'simple_git_blame_cache_requests_total': ('counter', 'Number of line authorship lookups, labeled by whether results were cached.'),
+    'simple_git_diffstat_cache_requests_total': ('counter', 'Number of line count lookups for pairs of trees, labeled by whether results were cached.'),
+    'simple_git_singleflight_requests_total': ('counter', 'Number of read requests, labeled by whether a request started an execution (leader) or awaited an identical in-flight execution (shared).'),
+    'simple_git_history_index_requests_total': ('counter', 'Number of filtered commit history queries, labeled by whether the commit index was consulted (hit) or Git was consulted (fallback).'),
+    'simple_git_history_index_updates_total': ('counter', 'Number of commit index updates, labeled by whether the lineage was extended, rebuilt (reset), or the update failed.'),
+    'simple_git_maintenance_runs_total': ('counter', 'Number of repository maintenance runs, labeled by outcome.'),
+    'simple_git_ref_reads_total': ('counter', 'Number of branch lookups, labeled by whether Git was consulted.'),
+    'simple_git_index_reads_total': ('counter', 'Number of in-process comparisons of the index against the working tree, labeled by whether Git was consulted.'),
+    'simple_git_requests_total': ('counter', 'Number of handled HTTP requests.'),
+    'simple_git_request_duration_seconds': ('histogram', 'Time spent handling HTTP requests.'),
+    'simple_git_repositories': ('gauge', 'Number of repositories for which state is retained.')
+}
+
+
+def _escape(value):
+    """Escape a label value.
+
+    Args:
+        value: label value
+
+    Returns:
+        escaped label value
+
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=None):
+    """Format a label set.
+
+    Args:
+        labels: `tuple` of label name-value pairs
+        extra: additional label name-value pair (optional)
+
+    Returns:
+        formatted label set
+
+    """
+    if extra is not None:
+        labels = labels + (extra,)
+    if not labels:
+        return ''
+    return '{' + ','.join('%s="%s"' % (k, _escape(v)) for k, v in labels) + '}'
+
+
+def _number(value):
+    """Format a sample value.
+
+    Args:
+        value: sample value
+
+    Returns:
+        formatted sample value
+
+    """
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics():
+    """Class for collecting counters, gauges, and latency histograms.
+
+    Notes:
+        Label sets are provided as keyword arguments. In order to bound memory consumption, label values should be drawn from a small, fixed set (e.g., Git subcommands and handler names).
+
+    """
+
+    def __init__(self):
+        """Initialize a class instance."""
+        self._values = collections.defaultdict(dict)
+        self._histograms = collections.defaultdict(dict)
+
+    def inc(self, name, value=1, **labels):
+        """Increment a counter.
+
+        Args:
+            name: metric name
+            value: increment (default: 1)
+            labels: label name-value pairs
+
+        """
+        key = tuple(sorted(labels.items()))
+        series = self._values[name]
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Record an observation in a histogram.
+
+        Args:
+            name: metric name
+            value: observed value (in seconds)
+            labels: label name-value pairs
+
+        """
+        key = tuple(sorted(labels.items()))
+        series = self._histograms[name]
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = [[0]*len(BUCKETS), 0.0, 0]
+        i = bisect.bisect_left(BUCKETS, value)
+        if i < len(BUCKETS):
+            hist[0][i] += 1
+        hist[1] += value
+        hist[2] += 1
+
+    def render(self):
+        """Render metrics in the Prometheus text exposition format.
+
+        Returns:
+            string
+
+        """
+        lines = []
+        for name in sorted(set(self._values) | set(self._histograms)):
+            kind, description = DESCRIPTIONS.get(name, ('untyped', ''))
+            lines.append('# HELP %s %s' % (name, description))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for key, value in sorted(self._values.get(name, {}).items()):
+                lines.append('%s%s %s' % (name, _labels(key), _number(value)))
+            for key, (counts, total, count) in sorted(self._histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, counts):
+                    cumulative += n
+                    lines.append('%s_bucket%s %d' % (name, _labels(key, ('le', _number(bound))), cumulative))
+                lines.append('%s_bucket%s %d' % (name, _labels(key, ('le', '+Inf')), count))
+                lines.append('%s_sum%s %s' % (name, _labels(key), _number(total)))
+                lines.append('%s_count%s %d' % (name, _labels(key), count))
+
+        return '\n'.join(lines) + '\n'
+
+    def set(self, name, value, **labels):
+        """Set a gauge.
+
+        Args:
+            name: metric name
+            value: gauge value
+            labels: label name-value pairs
+
+        """
+        self._values[name][tuple(sorted(labels.items()))] = value
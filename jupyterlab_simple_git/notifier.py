@@ -0,0 +1,141 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Notify subscribers of repository changes."""
+
+import asyncio
+import time
+
+# Mapping from watcher change categories to the repository information which may have changed:
+CHANGES = {
+    'worktree': ('unstaged',),
+    'index': ('staged', 'unstaged'),
+    'head': ('branch', 'staged'),
+    'refs': ('branch', 'refs', 'staged')
+}
+
+
+class ChangeNotifier():
+    """Class for notifying subscribers of repository changes.
+
+    Notes:
+        File system events are coalesced, such that a burst of events (e.g., when switching branches) results in a single notification. A notification is sent once no further events have arrived for `delay` seconds, but no later than `max_delay` seconds after the first event in a burst.
+
+        Subscribers are provided a sorted `list` of changes, where each change is one of the following:
+
+            -   'branch': the current branch, current commit, or ahead/behind counts may have changed
+            -   'staged': changes in the index relative to `HEAD` may have changed
+            -   'unstaged': changes in the working tree relative to the index (including untracked files) may have changed
+            -   'refs': branches or remote-tracking branches may have changed
+
+        When a notifier is closed, subscribers are provided `None`.
+
+    Attributes:
+        watcher: repository watcher
+        delay: number of seconds to wait for further events before notifying subscribers
+        max_delay: maximum number of seconds to delay a notification
+
+    """
+
+    def __init__(self, watcher, delay=0.1, max_delay=1.0):
+        """Initialize a class instance."""
+        self.watcher = watcher
+        self.delay = delay
+        self.max_delay = max_delay
+        self._subscribers = []
+        self._pending = set()
+        self._first = None
+        self._timer = None
+
+    def _flush(self):
+        """Notify subscribers of pending changes."""
+        self._timer = None
+        self._first = None
+        changes = sorted(self._pending)
+        self._pending.clear()
+        for clbk in list(self._subscribers):
+            clbk(changes)
+
+    def _on_change(self, categories):
+        """Process watcher change categories.
+
+        Args:
+            categories: `set` of watcher change categories
+
+        """
+        for category in categories:
+            self._pending.update(CHANGES[category])
+
+        now = time.monotonic()
+        if self._first is None:
+            self._first = now
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = min(self.delay, max(self._first+self.max_delay-now, 0))
+        self._timer = asyncio.get_event_loop().call_later(delay, self._flush)
+
+    def close(self):
+        """Close a notifier and notify subscribers."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.watcher.unsubscribe(self._on_change)
+        subscribers = self._subscribers
+        self._subscribers = []
+        for clbk in subscribers:
+            clbk(None)
+
+    def subscribe(self, clbk):
+        """Register a function to be invoked upon repository changes.
+
+        Args:
+            clbk: function which is provided a `list` of changes
+
+        Returns:
+            A boolean indicating whether change notifications are available.
+
+        """
+        if not self.watcher.start():
+            return False
+        if not self._subscribers:
+            self.watcher.subscribe(self._on_change)
+        self._subscribers.append(clbk)
+        return True
+
+    def unsubscribe(self, clbk):
+        """Remove a registered function.
+
+        Args:
+            clbk: previously registered function
+
+        """
+        if clbk in self._subscribers:
+            self._subscribers.remove(clbk)
+        if not self._subscribers:
+            self.watcher.unsubscribe(self._on_change)
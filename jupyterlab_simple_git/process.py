@@ -0,0 +1,107 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Utilities for running Git commands as child processes."""
+
+import os
+import shutil
+import signal
+
+
+def kill(proc):
+    """Kill a child process along with any processes it has spawned (e.g., remote helpers).
+
+    Args:
+        proc: child process started in a new session
+
+    """
+    if proc.returncode is not None:
+        return
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+def low_priority(cmd):
+    """Prefix a command such that it runs with low CPU and I/O priority (e.g., for background maintenance).
+
+    Args:
+        cmd: command
+
+    Returns:
+        command
+
+    """
+    prefix = []
+    if shutil.which('ionice') is not None:
+        # Only perform I/O when no other process needs the disk:
+        prefix += ['ionice', '-c', '3']
+    if shutil.which('nice') is not None:
+        prefix += ['nice', '-n', '19']
+    return prefix + cmd
+
+
+def read_env():
+    """Return environment variables for running read-only commands.
+
+    Notes:
+        Setting `GIT_OPTIONAL_LOCKS=0` prevents read-only commands (e.g., `git status`) from opportunistically refreshing the index, which would otherwise require acquiring `.git/index.lock`.
+
+    Returns:
+        environment variables
+
+    """
+    env = dict(os.environ)
+    env['GIT_OPTIONAL_LOCKS'] = '0'
+    return env
+
+
+def subcommand(cmd):
+    """Return the Git subcommand of a command (e.g., for labeling metrics).
+
+    Args:
+        cmd: command
+
+    Returns:
+        subcommand
+
+    """
+    i = 1
+    while i < len(cmd):
+        if cmd[i] in ('-c', '-C'):
+            i += 2
+        elif cmd[i].startswith('-'):
+            i += 1
+        else:
+            return cmd[i]
+    return 'git'
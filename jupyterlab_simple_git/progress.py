@@ -0,0 +1,100 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Parse Git `--progress` output."""
+
+import re
+
+# Regular expression for matching a progress line (e.g., 'Receiving objects:  45% (450/1000), 1.20 MiB | 2.40 MiB/s'):
+PROGRESS_REGEXP = re.compile(r'^(remote: )?([^:\d][^:]*): +(?:(\d+)% \((\d+)/(\d+)\)|(\d+))(?:, ([\d.]+) (\w+)(?: \| ([\d.]+) (\w+)/s)?)?(, done\.?)?')
+
+# Mapping from size units to multipliers:
+UNITS = {
+    'bytes': 1,
+    'KiB': 2**10,
+    'MiB': 2**20,
+    'GiB': 2**30
+}
+
+
+def _size(value, unit):
+    """Convert a size having units to a number of bytes.
+
+    Args:
+        value: numeric string (e.g., '1.20')
+        unit: size unit (e.g., 'MiB')
+
+    Returns:
+        number of bytes or `None` if a size is not provided or has unrecognized units
+
+    """
+    if value is None or unit not in UNITS:
+        return None
+    return int(float(value) * UNITS[unit])
+
+
+def parse_progress(line):
+    """Parse a single line of `--progress` output.
+
+    Notes:
+        Git writes progress to standard error, terminating intermediate updates with a carriage return and final updates with a newline. Accordingly, callers should split output on both characters.
+
+        A parsed progress line has the following format:
+
+        {
+            'phase': string,          # phase (e.g., 'Counting objects', 'Receiving objects', 'Resolving deltas', 'Writing objects')
+            'remote': bool,           # boolean indicating whether the remote reported the phase
+            'percent': int|None,      # percent complete or `None` if the total is unknown
+            'current': int,           # number of items processed
+            'total': int|None,        # total number of items or `None` if unknown
+            'bytes': int|None,        # number of bytes transferred or `None` if not reported
+            'throughput': int|None,   # transfer rate in bytes per second or `None` if not reported
+            'done': bool              # boolean indicating whether the phase has completed
+        }
+
+    Args:
+        line: line of command output
+
+    Returns:
+        A `dict` describing progress or `None` if a line does not report progress.
+
+    """
+    m = PROGRESS_REGEXP.match(line.strip())
+    if m is None:
+        return None
+    remote, phase, percent, current, total, count, size, unit, rate, rate_unit, done = m.groups()
+    return {
+        'phase': phase.strip(),
+        'remote': remote is not None,
+        'percent': None if percent is None else int(percent),
+        'current': int(count if current is None else current),
+        'total': None if total is None else int(total),
+        'bytes': _size(size, unit),
+        'throughput': _size(rate, rate_unit),
+        'done': done is not None
+    }
@@ -0,0 +1,253 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Read Git refs without spawning a process."""
+
+import os
+import re
+from jupyterlab_simple_git.utils import common_dir, git_dir
+
+# Regular expression for matching object hashes (SHA-1 or SHA-256):
+OID_REGEXP = re.compile(r'[0-9a-f]{40}(?:[0-9a-f]{24})?')
+
+# Regular expression for matching ref names which may be resolved outside of `refs/` (e.g., `HEAD` and `FETCH_HEAD`):
+ROOT_REF_REGEXP = re.compile(r'[A-Z_]+')
+
+
+def _stat_key(path):
+    """Return a key which changes whenever a file or directory changes.
+
+    Args:
+        path: file system path
+
+    Returns:
+        A `tuple` or `None` if a path does not exist.
+
+    """
+    try:
+        s = os.stat(path)
+    except OSError:
+        return None
+    return (s.st_ino, s.st_size, s.st_mtime_ns)
+
+
+class Refs():
+    """Class for reading `HEAD`, loose refs, and `packed-refs` directly from the Git directory.
+
+    Notes:
+        Parsed files and directory listings are cached and are only read again when their modification times (or sizes) change. As Git updates refs by renaming lock files into place, updating a loose ref also changes the modification time of its parent directory.
+
+        Methods return `None` whenever a result cannot be determined from the files alone (e.g., for repositories using the `reftable` ref storage format or for ref names which would be abbreviated ambiguously), in which case callers should fall back to Git.
+
+    Attributes:
+        root: canonical file system path of a Git repository
+
+    """
+
+    def __init__(self, root):
+        """Initialize a class instance."""
+        self.root = root
+        self._git_dir = None
+        self._common_dir = None
+        self._files = {}
+        self._dirs = {}
+
+    def _dirs_resolved(self):
+        """Resolve the Git directory and common directory of a repository.
+
+        Notes:
+            In linked working trees, `HEAD` is specific to a working tree, while branches are shared with the main working tree via the "common" directory.
+
+        Returns:
+            A boolean indicating whether refs are stored as files.
+
+        """
+        if self._git_dir is None:
+            gitdir = git_dir(self.root)
+            if gitdir is None:
+                return False
+            self._git_dir = gitdir
+            self._common_dir = common_dir(gitdir)
+
+        return not os.path.isdir(os.path.join(self._common_dir, 'reftable'))
+
+    def _listing(self, path, prefix):
+        """Return the loose refs beneath a directory.
+
+        Args:
+            path: directory path
+            prefix: ref name prefix corresponding to the directory (e.g., `refs/heads/`)
+
+        Returns:
+            A `dict` mapping ref names to (stripped) loose ref file contents.
+
+        """
+        key = _stat_key(path)
+        cached = self._dirs.get(path)
+        if cached is None or cached[0] != key:
+            files = {}
+            subdirs = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.name.endswith('.lock'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            value = self._read(entry.path)
+                            if value is not None:
+                                files[prefix+entry.name] = value
+            except OSError:
+                pass
+            cached = (key, files, subdirs)
+            self._dirs[path] = cached
+
+        out = dict(cached[1])
+        for name in cached[2]:
+            out.update(self._listing(os.path.join(path, name), prefix+name+'/'))
+        return out
+
+    def _packed(self):
+        """Return the refs contained in `packed-refs`.
+
+        Returns:
+            A `dict` mapping ref names to object hashes.
+
+        """
+        path = os.path.join(self._common_dir, 'packed-refs')
+        key = _stat_key(path)
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        refs = {}
+        try:
+            with open(path, 'r', encoding='utf8', errors='surrogateescape') as f:
+                for line in f:
+                    if line.startswith('#') or line.startswith('^'):
+                        continue
+                    fields = line.rstrip('\n').split(' ', 1)
+                    if len(fields) == 2:
+                        refs[fields[1]] = fields[0]
+        except OSError:
+            pass
+        self._files[path] = (key, refs)
+        return refs
+
+    def _read(self, path):
+        """Read a ref file (e.g., `HEAD` or a loose ref).
+
+        Args:
+            path: file path
+
+        Returns:
+            stripped file contents or `None` if unable to read a file
+
+        """
+        try:
+            with open(path, 'r', encoding='utf8', errors='surrogateescape') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _refs(self):
+        """Return all refs beneath `refs/`.
+
+        Returns:
+            A `dict` mapping ref names to (stripped) loose ref file contents or, for packed refs, object hashes.
+
+        """
+        refs = dict(self._packed())
+        refs.update(self._listing(os.path.join(self._common_dir, 'refs'), 'refs/'))
+        return refs
+
+    def _shorten(self, name, refs):
+        """Shorten a branch ref name as done by `git rev-parse --abbrev-ref` and `%(refname:short)`.
+
+        Args:
+            name: full ref name beginning with `refs/heads/`
+            refs: all refs (see `_refs`)
+
+        Returns:
+            short ref name or `None` if the short name would be ambiguous
+
+        """
+        short = name[len('refs/heads/'):]
+        for candidate in ('refs/'+short, 'refs/tags/'+short, 'refs/remotes/'+short, 'refs/remotes/'+short+'/HEAD'):
+            if candidate in refs:
+                return None
+        if ROOT_REF_REGEXP.fullmatch(short) and os.path.isfile(os.path.join(self._git_dir, short)):
+            return None
+        return short
+
+    def branches(self):
+        """Return the local branches.
+
+        Returns:
+            A sorted list of short branch names or `None` if unable to resolve local branches without Git.
+
+        """
+        if not self._dirs_resolved():
+            return None
+
+        refs = self._refs()
+        out = []
+        for name in sorted(refs, key=lambda name: name.encode('utf8', 'surrogateescape')):
+            if not name.startswith('refs/heads/'):
+                continue
+            if not OID_REGEXP.fullmatch(refs[name]):
+                # Let Git handle symbolic and broken refs:
+                return None
+            short = self._shorten(name, refs)
+            if short is None:
+                return None
+            out.append(short)
+        return out
+
+    def current_branch(self):
+        """Return the current branch.
+
+        Returns:
+            The short name of the current branch, `HEAD` if `HEAD` is detached, or `None` if unable to resolve the current branch without Git (e.g., if the current branch has no commits).
+
+        """
+        if not self._dirs_resolved():
+            return None
+        head = self._read(os.path.join(self._git_dir, 'HEAD'))
+        if head is None:
+            return None
+        if not head.startswith('ref: '):
+            return 'HEAD'
+
+        name = head[len('ref: '):].strip()
+        refs = self._refs()
+        if not name.startswith('refs/heads/') or name not in refs or not OID_REGEXP.fullmatch(refs[name]):
+            return None
+        return self._shorten(name, refs)
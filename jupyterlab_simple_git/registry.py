@@ -0,0 +1,208 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Resolve request paths to Git repositories."""
+
+import asyncio
+import collections
+import os
+import time
+import tornado.ioloop
+import tornado.web
+from jupyterlab_simple_git.git import Git
+from jupyterlab_simple_git.metrics import Metrics
+
+
+class Registry():
+    """Class for resolving request paths to Git repositories.
+
+    Notes:
+        Each repository is associated with a single `Git` instance, which retains per-repository state (e.g., caches, child processes, and file system watchers). Callers acquire an instance for the duration of a request and release the instance once the request finishes (see `acquire` and `release`). In order to bound memory consumption and the number of open file descriptors, at most `capacity` idle instances are retained. When the limit is exceeded, the least recently used idle instance is closed. Idle instances which have not been used for `idle_timeout` seconds are also closed. Instances which are in use are never closed, and, thus, the number of retained instances may temporarily exceed `capacity`.
+
+        Paths which are not contained within a repository (e.g., the server root directory) are associated with a transient `Git` instance, which is closed once released, thus allowing a repository to be created (e.g., via `git init`) without retaining state for (or watching) arbitrary directories.
+
+    Attributes:
+        root: canonical file system path of the server root directory
+        capacity: maximum number of retained idle `Git` instances
+        idle_timeout: number of seconds after which an unused `Git` instance is closed
+        metrics: metrics collector shared by all `Git` instances
+        options: keyword arguments provided to each `Git` instance
+
+    """
+
+    def __init__(self, root, capacity=16, idle_timeout=600, metrics=None, **options):
+        """Initialize a class instance."""
+        self.root = os.path.realpath(os.path.expanduser(root))
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self.metrics = Metrics() if metrics is None else metrics
+        self.options = options
+        self._repos = collections.OrderedDict()
+        self._last_used = {}
+        self._refs = {}
+        self._timer = None
+
+    def _close(self, root):
+        """Close a retained `Git` instance.
+
+        Args:
+            root: repository root
+
+        """
+        git = self._repos.pop(root)
+        del self._last_used[root]
+        self._refs.pop(root, None)
+        self.metrics.set('simple_git_repositories', len(self._repos))
+        asyncio.ensure_future(git.close())
+
+    def _directory(self, path):
+        """Resolve a path to a directory within the server root directory.
+
+        Args:
+            path: path relative to the server root directory
+
+        Returns:
+            Canonical file system path of the directory (or, if the path is a file, its parent directory).
+
+        Raises:
+            HTTPError: path must be located within the server root directory
+            HTTPError: path must exist
+
+        """
+        path = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise tornado.web.HTTPError(403, 'invalid argument. Path must be located within the server root directory.')
+        if not os.path.exists(path):
+            raise tornado.web.HTTPError(404, 'invalid argument. Path does not exist.')
+        if not os.path.isdir(path):
+            path = os.path.dirname(path)
+        return path
+
+    def _evict(self):
+        """Close least recently used idle `Git` instances in excess of `capacity`."""
+        for root in list(self._repos):
+            if len(self._repos) <= self.capacity:
+                break
+            if not self._refs.get(root):
+                self._close(root)
+
+    def _evict_idle(self):
+        """Close idle `Git` instances which have not been used recently."""
+        now = time.monotonic()
+        for root in list(self._repos):
+            if not self._refs.get(root) and now-self._last_used[root] >= self.idle_timeout:
+                self._close(root)
+
+    def acquire(self, path='.'):
+        """Return a `Git` instance for the repository containing a specified path.
+
+        Notes:
+            The returned instance must be released once no longer in use (see `release`).
+
+        Args:
+            path: path relative to the server root directory (default: '.')
+
+        Returns:
+            `Git` instance
+
+        Raises:
+            HTTPError: path must be located within the server root directory
+            HTTPError: path must exist
+
+        """
+        root = self.find_repository(path)
+        if root is None:
+            return Git(self._directory(path), metrics=self.metrics, **self.options)
+
+        git = self._repos.get(root)
+        if git is None:
+            git = Git(root, metrics=self.metrics, **self.options)
+            self._repos[root] = git
+        else:
+            self._repos.move_to_end(root)
+        self._refs[root] = self._refs.get(root, 0) + 1
+        self._last_used[root] = time.monotonic()
+        self._evict()
+        self.metrics.set('simple_git_repositories', len(self._repos))
+        return git
+
+    def close(self):
+        """Close all retained `Git` instances."""
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        for root in list(self._repos):
+            self._close(root)
+
+    def find_repository(self, path):
+        """Resolve the repository containing a specified path.
+
+        Args:
+            path: path relative to the server root directory
+
+        Returns:
+            Canonical file system path of a repository root or `None` if the path is not contained within a repository located within the server root directory.
+
+        Raises:
+            HTTPError: path must be located within the server root directory
+            HTTPError: path must exist
+
+        """
+        directory = self._directory(path)
+        while True:
+            if os.path.exists(os.path.join(directory, '.git')):
+                return directory
+            if directory == self.root:
+                return None
+            directory = os.path.dirname(directory)
+
+    def release(self, git):
+        """Release a `Git` instance returned by `acquire`.
+
+        Notes:
+            Transient instances (i.e., for paths which are not contained within a repository) are closed immediately. Retained instances are closed once idle (see `Registry`).
+
+        Args:
+            git: `Git` instance
+
+        """
+        root = git.root
+        if self._repos.get(root) is not git:
+            asyncio.ensure_future(git.close())
+            return
+        self._refs[root] -= 1
+        self._last_used[root] = time.monotonic()
+        self._evict()
+
+    def start(self):
+        """Start periodically closing unused `Git` instances."""
+        if self._timer is None:
+            interval = max(self.idle_timeout/4, 1) * 1000
+            self._timer = tornado.ioloop.PeriodicCallback(self._evict_idle, interval)
+            self._timer.start()
@@ -0,0 +1,279 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Git commands which communicate with remote repositories."""
+
+import asyncio
+import re
+import time
+import tornado.web
+from jupyterlab_simple_git.process import kill, read_env, subcommand
+from jupyterlab_simple_git.progress import parse_progress
+
+
+# Please keep class methods ordered in alphabetical order...
+
+
+class RemoteCommands():
+    """Mixin class providing fetches and pushes (see `Git`)."""
+
+    async def _default_remote(self):
+        """Resolve the remote which `git fetch` fetches when no remote is specified.
+
+        Notes:
+            Git fetches the remote configured for the current branch (`branch.<name>.remote`), or, if none is configured, the only remote (if exactly one remote is configured) or `origin`.
+
+        Returns:
+            name of remote or `None` if unable to resolve the remote
+
+        """
+        response = await self.current_branch()
+        if response['code'] != 0:
+            return None
+        branch = response['branch']
+
+        def clbk(response, output):
+            """Process command results.
+
+            Args:
+                response: response `dict`
+                output: command output
+
+            """
+            response['config'] = output
+
+        response = await self._run(['git', 'config', '-z', '--get-regexp', r'^(branch\..*\.remote|remote\..*\.url)$'], clbk)
+        if response['code'] not in (0, 1):
+            # Git exits with status 1 if no configuration entries match:
+            return None
+
+        remotes = []
+        for record in response.get('config', '').split('\x00'):
+            key, _, value = record.partition('\n')
+            if key == 'branch.'+branch+'.remote':
+                return value
+            if key.startswith('remote.') and key.endswith('.url'):
+                remotes.append(key[len('remote.'):-len('.url')])
+        if len(remotes) == 1:
+            return remotes[0]
+        return 'origin'
+
+    async def _fetch(self, remote, prune, fetch_all, progress):
+        """Run `git fetch`.
+
+        Args:
+            remote: name of remote or `None`
+            prune: boolean indicating whether to remove any remote-tracking references that no longer exist on the remote
+            fetch_all: boolean indicating whether to fetch all remotes
+            progress: callback function which processes progress updates
+
+        Returns:
+            A `dict` containing command results.
+
+        """
+        cmd = ['git', 'fetch']
+        if prune:
+            cmd.append('--prune')
+        if fetch_all:
+            cmd.append('--all')
+        if remote is not None:
+            cmd.append(remote)
+
+        return await self._network(cmd, progress)
+
+    async def _network(self, cmd, progress=None):
+        """Execute a Git command which communicates with a remote repository.
+
+        Notes:
+            The command runs with `--progress` in a new session (i.e., process group). If the command does not report progress for `network_timeout` seconds (e.g., because a remote does not respond), or if the awaiting task is cancelled (e.g., because a client disconnected), the command and any processes it has spawned (e.g., remote helpers and SSH clients) are killed.
+
+            If provided a callback function, the callback is provided each parsed progress update (see `parse_progress`) as soon as the command reports it. Progress lines are omitted from the returned command results.
+
+            Once the command exits, cached status results are invalidated (see `StatusCache`).
+
+        Args:
+            cmd: command to run, where the second element is the Git subcommand (e.g., ['git', 'fetch', 'origin'])
+            progress: callback function which processes progress updates (optional)
+
+        Returns:
+            A `dict` containing command results having the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # command results or error message
+            }
+
+        Raises:
+            HTTPError: operation timed out
+
+        """
+        operation = subcommand(cmd)
+        cmd = cmd[:2] + ['--progress'] + cmd[2:]
+        timeout = self.network_timeout or None
+        lines = []
+
+        def process(record):
+            line = record.decode('utf8', 'replace').strip()
+            if line == '':
+                return
+            info = parse_progress(line)
+            if info is None:
+                lines.append(line)
+            elif progress is not None:
+                progress(info)
+
+        async with self.scheduler.read():
+            start = time.monotonic()
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=self.root,
+                env=read_env(),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+            stdout = asyncio.ensure_future(proc.stdout.read())
+            try:
+                buf = b''
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(proc.stderr.read(65536), timeout)
+                    except asyncio.TimeoutError:
+                        self.metrics.inc('simple_git_command_timeouts_total', operation=operation)
+                        raise tornado.web.HTTPError(504, 'operation timed out. Remote did not respond within %g seconds.' % timeout)
+                    if chunk == b'':
+                        break
+
+                    # Intermediate progress updates are terminated by carriage returns:
+                    *records, buf = re.split(b'[\r\n]', buf+chunk)
+                    for record in records:
+                        process(record)
+                process(buf)
+
+                code = await proc.wait()
+                out = (await stdout).decode('utf8', 'replace').strip()
+            except asyncio.CancelledError:
+                self.metrics.inc('simple_git_command_cancellations_total', operation=operation)
+                raise
+            finally:
+                kill(proc)
+                if not stdout.done():
+                    stdout.cancel()
+                self.metrics.inc('simple_git_commands_total', operation=operation)
+                self.metrics.observe('simple_git_command_duration_seconds', time.monotonic()-start, operation=operation)
+
+        # A fetch or push updates refs (e.g., remote-tracking branches), which determine ahead and behind counts. As a command may update some refs before failing, cached results are invalidated regardless of the status code:
+        self._cache.invalidate()
+        if code != 0:
+            self.metrics.inc('simple_git_command_errors_total', operation=operation)
+        return {
+            'code': code,
+            'message': '\n'.join(([out] if out else []) + lines)
+        }
+
+    async def fetch(self, remote=None, prune=False, fetch_all=False, progress=None):
+        """Download objects and refs from a remote repository.
+
+        Notes:
+            If an identical fetch is already running (e.g., requested by another client or by a background fetch), this method waits for the running fetch and returns its result, rather than starting a duplicate network transfer (see `Fetcher`).
+
+            If the command does not report progress for `network_timeout` seconds, or if every caller awaiting the fetch is cancelled, the command is terminated (see `_network`).
+
+        Args:
+            remote: name of remote (default: the remote configured for the current branch or `origin`)
+            prune: boolean indicating whether to remove any remote-tracking references that no longer exist on the remote
+            fetch_all: boolean indicating whether to fetch all remotes
+            progress: callback function which is provided parsed progress updates (e.g., objects received, bytes transferred, and throughput) while the command runs (optional)
+
+        Returns:
+            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # command results
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: operation timed out
+
+        """
+        return await self._fetcher.fetch(remote, prune, fetch_all, progress)
+
+    async def push(self, remote, branch=None, progress=None):
+        """Update remote refs along with associated objects.
+
+        Notes:
+            If the command does not report progress for `network_timeout` seconds, or if the awaiting task is cancelled, the command is terminated (see `_network`).
+
+        Args:
+            remote: remote name
+            branch: branch name (default: current branch name)
+            progress: callback function which is provided parsed progress updates (e.g., objects written, bytes transferred, and throughput) while the command runs (optional)
+
+        Returns:
+            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # command results
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid remote argument
+            HTTPError: operation timed out
+
+        """
+        if not isinstance(remote, str):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid remote argument.')
+
+        cmd = ['git', 'push', remote]
+        if branch is None:
+            response = await self.current_branch()
+            if response['code'] != 0:
+                return response
+            cmd.append(response['branch'])
+        else:
+            cmd.append(branch)
+
+        return await self._network(cmd, progress)
@@ -0,0 +1,175 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Schedule Git commands operating on the same repository."""
+
+import asyncio
+import contextlib
+import contextvars
+import time
+import tornado.web
+from jupyterlab_simple_git.metrics import Metrics
+
+# Schedulers for which the current task holds exclusive access:
+_HELD = contextvars.ContextVar('simple_git_held_schedulers', default=())
+
+
+class Scheduler():
+    """Class for scheduling Git commands operating on the same repository.
+
+    Notes:
+        Read-only commands run concurrently. Commands which modify a repository (and, thus, acquire `.git/index.lock` and similar locks) run exclusively, thus avoiding spurious lock failures. Waiting writers take precedence over newly arriving readers in order to prevent writer starvation.
+
+        If the number of commands waiting to run reaches `max_queue`, additional commands are rejected.
+
+        A task holding exclusive access may run further commands (e.g., a sequence of commands which must not be interleaved with other commands) without waiting on itself.
+
+    Attributes:
+        max_queue: maximum number of commands waiting to run
+        waits: number of commands which have been scheduled
+        wait_time: total number of seconds commands have spent waiting to run
+        max_wait_time: maximum number of seconds a command has spent waiting to run
+        metrics: metrics collector
+
+    """
+
+    def __init__(self, max_queue=64, metrics=None):
+        """Initialize a class instance."""
+        self.max_queue = max_queue
+        self.metrics = Metrics() if metrics is None else metrics
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting = 0
+        self._waiting_writers = 0
+
+    async def _acquire(self, write):
+        """Wait until a command is allowed to run.
+
+        Args:
+            write: boolean indicating whether a command modifies a repository
+
+        Raises:
+            HTTPError: too many pending commands
+
+        """
+        if self._waiting >= self.max_queue:
+            raise tornado.web.HTTPError(503, 'too many pending operations. Please try again later.')
+
+        start = time.monotonic()
+        self._waiting += 1
+        try:
+            async with self._cond:
+                if write:
+                    self._waiting_writers += 1
+                    try:
+                        await self._cond.wait_for(lambda: not self._writer and self._readers == 0)
+                    finally:
+                        self._waiting_writers -= 1
+                    self._writer = True
+                else:
+                    await self._cond.wait_for(lambda: not self._writer and self._waiting_writers == 0)
+                    self._readers += 1
+        finally:
+            self._waiting -= 1
+
+        elapsed = time.monotonic() - start
+        self.waits += 1
+        self.wait_time += elapsed
+        self.max_wait_time = max(self.max_wait_time, elapsed)
+        self.metrics.observe('simple_git_queue_wait_seconds', elapsed, mode='write' if write else 'read')
+
+    async def _release(self, write):
+        """Signal that a command has finished running.
+
+        Args:
+            write: boolean indicating whether a command modifies a repository
+
+        """
+        async with self._cond:
+            if write:
+                self._writer = False
+            else:
+                self._readers -= 1
+            self._cond.notify_all()
+
+    @property
+    def pending(self):
+        """Return the number of commands waiting to run."""
+        return self._waiting
+
+    @contextlib.asynccontextmanager
+    async def read(self):
+        """Return a context manager for running a read-only command."""
+        if self in _HELD.get():
+            yield
+            return
+        await self._acquire(False)
+        try:
+            yield
+        finally:
+            await self._release(False)
+
+    def stats(self):
+        """Return scheduling statistics.
+
+        Returns:
+            A `dict` having the following format:
+
+            {
+                'pending': int,           # number of commands waiting to run
+                'waits': int,             # number of commands which have been scheduled
+                'wait_time': float,       # total number of seconds commands have spent waiting to run
+                'max_wait_time': float    # maximum number of seconds a command has spent waiting to run
+            }
+
+        """
+        return {
+            'pending': self._waiting,
+            'waits': self.waits,
+            'wait_time': self.wait_time,
+            'max_wait_time': self.max_wait_time
+        }
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        """Return a context manager for running a command which modifies a repository."""
+        if self in _HELD.get():
+            yield
+            return
+        await self._acquire(True)
+        token = _HELD.set(_HELD.get() + (self,))
+        try:
+            yield
+        finally:
+            _HELD.reset(token)
+            await self._release(True)
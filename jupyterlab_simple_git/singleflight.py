@@ -0,0 +1,97 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Share a single execution among identical concurrent requests."""
+
+import asyncio
+from jupyterlab_simple_git.metrics import Metrics
+
+
+class SingleFlight():
+    """Class for sharing a single execution among identical concurrent requests.
+
+    Notes:
+        Requests are identical if they have the same key. Callers should include in a key everything on which a result depends, including a fingerprint of repository state (e.g., a cache generation), such that a request never shares an execution which started before a change which the request has observed.
+
+        The first request for a key (the leader) starts an execution, and requests for the same key which arrive before the execution completes await the same execution. Once an execution completes, its key is forgotten, and the next request starts a new execution. Accordingly, results are shared but never cached.
+
+        A shared execution is only cancelled once every awaiting caller has been cancelled.
+
+        Results are shared between callers and must not be mutated.
+
+    Attributes:
+        metrics: metrics collector
+
+    """
+
+    def __init__(self, metrics=None):
+        """Initialize a class instance."""
+        self.metrics = Metrics() if metrics is None else metrics
+        self._flights = {}
+
+    def _done(self, key, flight):
+        """Forget a completed execution.
+
+        Args:
+            key: request key
+            flight: in-flight execution `dict`
+
+        """
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def run(self, key, compute):
+        """Return the result of an execution, sharing an in-flight execution having the same key if one exists.
+
+        Args:
+            key: hashable request key whose first element is a method name (e.g., for labeling metrics)
+            compute: coroutine function which computes a result
+
+        Returns:
+            result
+
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            self.metrics.inc('simple_git_singleflight_requests_total', method=key[0], result='leader')
+            flight = {
+                'task': asyncio.ensure_future(compute()),
+                'waiters': 0
+            }
+            flight['task'].add_done_callback(lambda _: self._done(key, flight))
+            self._flights[key] = flight
+        else:
+            self.metrics.inc('simple_git_singleflight_requests_total', method=key[0], result='shared')
+
+        flight['waiters'] += 1
+        try:
+            return await asyncio.shield(flight['task'])
+        finally:
+            flight['waiters'] -= 1
+            if flight['waiters'] == 0 and not flight['task'].done():
+                flight['task'].cancel()
@@ -0,0 +1,192 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Parse `git status --porcelain=v2 -z` output."""
+
+# Mapping from single-letter status abbreviations to actions:
+ACTIONS = {
+    'M': 'modified',
+    'T': 'type changed',
+    'A': 'added',
+    'D': 'deleted',
+    'R': 'renamed',
+    'C': 'copied',
+    'U': 'unmerged',
+    '?': 'untracked',
+    '!': 'ignored'
+}
+
+
+def _submodule(field):
+    """Parse a submodule state field.
+
+    Args:
+        field: four-character submodule state (e.g., 'N...' or 'SCMU')
+
+    Returns:
+        A `dict` describing submodule state or `None` if an entry is not a submodule.
+
+    """
+    if field[0] != 'S':
+        return None
+    return {
+        'commit_changed': field[1] == 'C',
+        'tracked_changes': field[2] == 'M',
+        'untracked_changes': field[3] == 'U'
+    }
+
+
+def _states(entry, xy, sub):
+    """Add index, working tree, and submodule states to an entry.
+
+    Args:
+        entry: entry `dict`
+        xy: two-character index and working tree state
+        sub: four-character submodule state
+
+    Returns:
+        entry `dict`
+
+    """
+    entry['index'] = xy[0]
+    entry['worktree'] = xy[1]
+    entry['staged'] = xy[0] != '.'
+    entry['unstaged'] = xy[1] != '.'
+    entry['submodule'] = _submodule(sub)
+    return entry
+
+
+def parse_status(data):
+    """Parse `git status --porcelain=v2 -z` output in a single pass.
+
+    Notes:
+        As paths are NUL-delimited, paths are neither quoted nor escaped, and paths containing spaces, arrows, or non-ASCII characters are returned verbatim.
+
+        For modifications, additions, deletions, and untracked files, each entry has the following format:
+
+        {
+            'status': string,        # single-letter action abbreviation
+            'action': string,        # action
+            'file': string,          # changed file
+            'index': string,         # single-letter index status ('.' if unmodified)
+            'worktree': string,      # single-letter working tree status ('.' if unmodified)
+            'staged': bool,          # boolean indicating whether an entry has staged changes
+            'unstaged': bool,        # boolean indicating whether an entry has unstaged changes
+            'submodule': dict|None   # submodule state or `None` if an entry is not a submodule
+        }
+
+        For copies and renames, each entry additionally has the following fields (in lieu of `file`):
+
+        {
+            'from': string,          # original path
+            'to': string,            # destination path
+            'score': int             # similarity score (percent)
+        }
+
+        For unmerged entries, each entry additionally has a `conflict` field containing the two-letter conflict type (e.g., 'UU', 'AA', etc).
+
+        When a submodule is present, the `submodule` field has the following format:
+
+        {
+            'commit_changed': bool,     # boolean indicating whether the submodule commit changed
+            'tracked_changes': bool,    # boolean indicating whether the submodule has tracked changes
+            'untracked_changes': bool   # boolean indicating whether the submodule has untracked changes
+        }
+
+    Args:
+        data: command results
+
+    Returns:
+        A `tuple` containing a `dict` of header values (e.g., `branch.head`) and a `list` of entries.
+
+    """
+    headers = {}
+    entries = []
+    records = data.split('\x00')
+    i = 0
+    n = len(records)
+    while i < n:
+        record = records[i]
+        i += 1
+        if record == '':
+            continue
+        kind = record[0]
+        if kind == '1':
+            # 1 <XY> <sub> <mH> <mI> <mW> <hH> <hI> <path>
+            fields = record.split(' ', 8)
+            status = fields[1][1] if fields[1][0] == '.' else fields[1][0]
+            entry = {
+                'status': status,
+                'action': ACTIONS.get(status, 'unknown'),
+                'file': fields[8]
+            }
+            _states(entry, fields[1], fields[2])
+        elif kind == '2':
+            # 2 <XY> <sub> <mH> <mI> <mW> <hH> <hI> <X><score> <path>NUL<origPath>
+            fields = record.split(' ', 9)
+            entry = {
+                'status': fields[8][0],
+                'action': ACTIONS.get(fields[8][0], 'unknown'),
+                'from': records[i],
+                'to': fields[9],
+                'score': int(fields[8][1:])
+            }
+            _states(entry, fields[1], fields[2])
+            i += 1
+        elif kind == 'u':
+            # u <XY> <sub> <m1> <m2> <m3> <mW> <h1> <h2> <h3> <path>
+            fields = record.split(' ', 10)
+            entry = {
+                'status': 'U',
+                'action': ACTIONS['U'],
+                'file': fields[10],
+                'conflict': fields[1]
+            }
+            _states(entry, fields[1], fields[2])
+        elif kind in '?!':
+            entry = {
+                'status': kind,
+                'action': ACTIONS[kind],
+                'file': record[2:],
+                'index': kind,
+                'worktree': kind,
+                'staged': False,
+                'unstaged': False,
+                'submodule': None
+            }
+        elif kind == '#':
+            # # <key> <value>
+            fields = record[2:].split(' ', 1)
+            headers[fields[0]] = fields[1] if len(fields) > 1 else ''
+            continue
+        else:
+            continue
+        entries.append(entry)
+
+    return headers, entries
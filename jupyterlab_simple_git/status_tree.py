@@ -0,0 +1,201 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Aggregate working tree status by directory."""
+
+# Change categories:
+CATEGORIES = ('modified', 'added', 'untracked', 'conflicted')
+
+
+def categorize(entry):
+    """Return the change category of a status entry.
+
+    Notes:
+        Unmerged entries are conflicted. Added files and the destinations of copies and renames are added. All other changes (e.g., modifications, deletions, and type changes) are modified.
+
+    Args:
+        entry: status entry (see `parse_status`)
+
+    Returns:
+        change category
+
+    """
+    if entry['status'] == 'U':
+        return 'conflicted'
+    if entry['status'] == '?':
+        return 'untracked'
+    if entry['status'] in 'RC' or 'A' in (entry['index'], entry['worktree']):
+        return 'added'
+    return 'modified'
+
+
+class StatusTree():
+    """Class for maintaining per-directory counts of changed files.
+
+    Notes:
+        Counts are updated incrementally. When provided the current status, only files whose change category differs from the previous status update the counts of their ancestor directories, and, thus, an update requires time proportional to the number of files whose status changed (times directory depth) rather than to the total number of changed files.
+
+    Attributes:
+        files: `dict` mapping the path of each changed file to its change category
+
+    """
+
+    def __init__(self):
+        """Initialize a class instance."""
+        self.files = {}
+        self._dirs = {}
+
+    def _add(self, path, category):
+        """Add a changed file.
+
+        Args:
+            path: file path
+            category: change category
+
+        """
+        directory = ''
+        for name in path.split('/'):
+            node = self._dirs.get(directory)
+            if node is None:
+                node = self._dirs[directory] = {
+                    'counts': dict.fromkeys(CATEGORIES, 0),
+                    'total': 0,
+                    'children': set()
+                }
+            node['counts'][category] += 1
+            node['total'] += 1
+            node['children'].add(name)
+            directory = directory+'/'+name if directory else name
+        self.files[path] = category
+
+    def _remove(self, path):
+        """Remove a changed file.
+
+        Args:
+            path: file path
+
+        """
+        category = self.files.pop(path)
+        names = path.split('/')
+        directories = ['']
+        for name in names[:-1]:
+            directories.append(directories[-1]+'/'+name if directories[-1] else name)
+        for directory in directories:
+            node = self._dirs[directory]
+            node['counts'][category] -= 1
+            node['total'] -= 1
+
+        # Prune entries which no longer contain changes, starting from the file's parent directory:
+        for i in range(len(directories)-1, -1, -1):
+            child = path if i == len(directories)-1 else directories[i+1]
+            if child not in self._dirs and child not in self.files:
+                self._dirs[directories[i]]['children'].discard(names[i])
+            if self._dirs[directories[i]]['total'] == 0:
+                del self._dirs[directories[i]]
+
+    def children(self, path=''):
+        """Return the immediate children of a directory which contain changes.
+
+        Notes:
+            Each directory entry has the following format:
+
+            {
+                'name': string,       # entry name
+                'path': string,       # path relative to the repository root
+                'type': 'directory',
+                'counts': dict        # number of changed files beneath the directory for each change category
+            }
+
+            Each file entry has the following format:
+
+            {
+                'name': string,       # entry name
+                'path': string,       # path relative to the repository root
+                'type': 'file',
+                'category': string    # change category
+            }
+
+            If a deleted file has been replaced by a directory (or vice versa), both entries are returned.
+
+        Args:
+            path: directory path relative to the repository root (default: '', i.e. the repository root)
+
+        Returns:
+            `list` of entries, ordered by name
+
+        """
+        node = self._dirs.get(path)
+        if node is None:
+            return []
+        out = []
+        for name in sorted(node['children']):
+            child = path+'/'+name if path else name
+            if child in self._dirs:
+                out.append({
+                    'name': name,
+                    'path': child,
+                    'type': 'directory',
+                    'counts': dict(self._dirs[child]['counts'])
+                })
+            if child in self.files:
+                out.append({
+                    'name': name,
+                    'path': child,
+                    'type': 'file',
+                    'category': self.files[child]
+                })
+        return out
+
+    def counts(self, path=''):
+        """Return the number of changed files beneath a directory for each change category.
+
+        Args:
+            path: directory path relative to the repository root (default: '', i.e. the repository root)
+
+        Returns:
+            `dict` mapping change categories to counts
+
+        """
+        node = self._dirs.get(path)
+        if node is None:
+            return dict.fromkeys(CATEGORIES, 0)
+        return dict(node['counts'])
+
+    def update(self, files):
+        """Update counts to reflect the current status.
+
+        Args:
+            files: `dict` mapping the path of each changed file to its change category
+
+        """
+        for path in [p for p, category in self.files.items() if files.get(p) != category]:
+            self._remove(path)
+        for path, category in files.items():
+            if path not in self.files:
+                self._add(path, category)
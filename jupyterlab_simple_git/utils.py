@@ -0,0 +1,80 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Utilities for inspecting Git repositories."""
+
+import os
+
+
+def git_dir(root):
+    """Resolve the Git directory of a repository without spawning a process.
+
+    Notes:
+        In linked working trees and submodules, `.git` is a file containing a `gitdir: <path>` line, rather than a directory.
+
+    Args:
+        root: canonical file system path of a Git repository
+
+    Returns:
+        Canonical file system path of the Git directory or `None` if unable to resolve a Git directory.
+
+    """
+    path = os.path.join(root, '.git')
+    if os.path.isdir(path):
+        return path
+    try:
+        with open(path, 'r') as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if not line.startswith('gitdir:'):
+        return None
+
+    path = line[len('gitdir:'):].strip()
+    return os.path.realpath(os.path.join(root, path))
+
+
+def common_dir(gitdir):
+    """Resolve the common Git directory (i.e., the directory containing objects and refs shared by all working trees) of a Git directory.
+
+    Notes:
+        In linked working trees, the Git directory contains a `commondir` file referencing the Git directory of the main working tree.
+
+    Args:
+        gitdir: Git directory
+
+    Returns:
+        Canonical file system path of the common Git directory.
+
+    """
+    try:
+        with open(os.path.join(gitdir, 'commondir'), 'r') as f:
+            return os.path.realpath(os.path.join(gitdir, f.readline().strip()))
+    except OSError:
+        return gitdir
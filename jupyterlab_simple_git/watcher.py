@@ -0,0 +1,334 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Watch a Git repository for file system changes."""
+
+# pylint: disable=C0103
+
+import asyncio
+import os
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+from jupyterlab_simple_git.utils import git_dir
+
+# Maximum number of changed working tree paths to record between calls to `Watcher.drain`:
+MAX_PATHS = 10000
+
+# Maximum number of ignored paths for which to skip file system events (see `Watcher.ignore`):
+MAX_IGNORED = 10000
+
+# Interval (in seconds) after which to retry starting a watcher which failed to start, which doubles after each failure up to a maximum:
+RETRY_INTERVAL = 60.0
+MAX_RETRY_INTERVAL = 3600.0
+
+
+class _Handler(FileSystemEventHandler):
+    """Forward file system events to a watcher."""
+
+    def __init__(self, watcher):
+        """Initialize a class instance."""
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        """Forward a file system event."""
+        if event.event_type in ('opened', 'closed', 'closed_no_write'):
+            return
+
+        # Changes to a directory listing are accompanied by events for the affected entries:
+        record = not (event.is_directory and event.event_type == 'modified')
+        self._watcher.dispatch(event.src_path, record)
+        dest = getattr(event, 'dest_path', '')
+        if dest:
+            self._watcher.dispatch(dest)
+
+
+class Watcher():
+    """Class for watching a Git repository for changes to the working tree, index, `HEAD`, and refs.
+
+    Notes:
+        File system events are delivered by `watchdog` (an optional dependency). If `watchdog` is not installed or the platform is unable to watch the repository, `available` is `False` and consumers must assume that the repository may have changed at any time.
+
+        Each relevant event increments `generation`, which consumers may record in order to detect intervening changes. Subscribers are invoked on the event loop with a `set` of change categories:
+
+            -   'worktree': a file in the working tree (or an ignore rule) changed
+            -   'index': `.git/index` changed
+            -   'head': `.git/HEAD` changed
+            -   'refs': a loose ref or `packed-refs` changed
+
+        Changes to other files within the Git directory (e.g., objects, logs, and lock files) are ignored. Changes to untracked files which Git ignores are skipped once the ignored paths have been provided (see `ignore`).
+
+        If a watcher fails to start (e.g., because the platform limit on the number of watches has been reached), subsequent attempts to start the watcher fail immediately until a retry interval has elapsed, which doubles after each failure. Accordingly, callers may attempt to start a watcher on every request without repeatedly scheduling a recursive watch.
+
+        Once `drain` has been called, the paths of changed working tree files are recorded until the next call to `drain`.
+
+    Attributes:
+        root: canonical file system path of a Git repository
+        generation: number of relevant file system events observed since a watcher started
+
+    """
+
+    def __init__(self, root):
+        """Initialize a class instance."""
+        self.root = root
+        self.generation = 0
+        self._git_dir = git_dir(root) or os.path.join(root, '.git')
+        self._observer = None
+        self._stopped = False
+        self._loop = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._paths = None
+        self._overflow = False
+        self._ignored = None
+        self._ignored_generation = 0
+        self._retry_at = 0.0
+        self._retry_interval = RETRY_INTERVAL
+
+    @property
+    def available(self):
+        """Return a boolean indicating whether a watcher is delivering file system events."""
+        return self._observer is not None
+
+    @property
+    def ignored_generation(self):
+        """Return a counter which is incremented whenever the ignored paths may have changed (see `ignore`)."""
+        return self._ignored_generation
+
+    @property
+    def ignoring(self):
+        """Return a boolean indicating whether events for ignored paths are being skipped (see `ignore`)."""
+        return self._ignored is not None
+
+    def _is_ignored(self, path):
+        """Return a boolean indicating whether a working tree path is ignored.
+
+        Args:
+            path: file system path
+
+        """
+        ignored = self._ignored
+        if not ignored:
+            return False
+        root = self.root
+        while len(path) > len(root):
+            if path in ignored:
+                return True
+            path = os.path.dirname(path)
+        return False
+
+    def categorize(self, path):
+        """Return the change category for a file system path.
+
+        Args:
+            path: file system path
+
+        Returns:
+            A change category or `None` if a path is irrelevant.
+
+        """
+        prefix = self._git_dir + os.sep
+        if path == self._git_dir or path.startswith(prefix):
+            name = path[len(prefix):].replace(os.sep, '/')
+            if name.endswith('.lock') or name.startswith('objects/'):
+                return None
+            if name == 'index':
+                return 'index'
+            if name == 'HEAD':
+                return 'head'
+            if name == 'packed-refs' or name.startswith('refs/'):
+                return 'refs'
+            if name in ('info/exclude', 'config'):
+                return 'worktree'
+            return None
+
+        if self._is_ignored(path):
+            return None
+        return 'worktree'
+
+    def dispatch(self, path, record=True):
+        """Process a file system event.
+
+        Notes:
+            This method is invoked from the `watchdog` observer thread.
+
+        Args:
+            path: file system path
+            record: boolean indicating whether to record a changed working tree path (default: True)
+
+        """
+        category = self.categorize(path)
+        if category is None:
+            return
+        if category == 'index' or os.path.basename(path) == '.gitignore' or (category == 'worktree' and path.startswith(self._git_dir + os.sep)):
+            # Ignore rules or tracked files may have changed, so events for previously ignored paths must no longer be skipped:
+            self._ignored = None
+            self._ignored_generation += 1
+        self.generation += 1
+        if record and category == 'worktree':
+            with self._lock:
+                if self._paths is not None and not self._overflow:
+                    if len(self._paths) < MAX_PATHS:
+                        self._paths.add(path)
+                    else:
+                        self._overflow = True
+                        self._paths.clear()
+        if self._subscribers:
+            self._loop.call_soon_threadsafe(self._notify, {category})
+
+    def drain(self):
+        """Return the working tree paths which have changed since the previous call.
+
+        Notes:
+            This method may be invoked from any thread.
+
+        Returns:
+            A `set` of file system paths or `None` if unable to determine which paths have changed (e.g., upon the first call, if a watcher is not delivering file system events, or if too many paths have changed).
+
+        """
+        with self._lock:
+            paths = self._paths
+            overflow = self._overflow
+            self._paths = set()
+            self._overflow = False
+        if paths is None or overflow or not self.available:
+            return None
+        return paths
+
+    def ignore(self, paths, generation):
+        """Skip file system events for untracked paths which Git ignores.
+
+        Notes:
+            Ignored paths are expected to be listed by `git ls-files --others --ignored --exclude-standard --directory`, which lists entirely ignored directories as a single entry. Untracked files which become ignored after paths were listed are not skipped.
+
+            As ignore rules or tracked files may have changed while paths were being listed, paths are only recorded if `ignored_generation` has not changed since the paths began to be listed. Whenever an ignore rule (e.g., `.gitignore`) or the index changes, ignored paths are discarded.
+
+            At most `MAX_IGNORED` paths are recorded.
+
+        Args:
+            paths: `list` of ignored paths relative to the repository root
+            generation: value of `ignored_generation` observed before listing ignored paths
+
+        Returns:
+            A boolean indicating whether ignored paths were recorded.
+
+        """
+        if generation != self._ignored_generation:
+            return False
+        self._ignored = frozenset(os.path.join(self.root, p.rstrip('/')) for p in paths[:MAX_IGNORED])
+        return True
+
+    def _notify(self, categories):
+        """Invoke subscribers.
+
+        Args:
+            categories: `set` of change categories
+
+        """
+        for clbk in list(self._subscribers):
+            clbk(categories)
+
+    def start(self):
+        """Start watching a repository.
+
+        Returns:
+            A boolean indicating whether a watcher is delivering file system events.
+
+        """
+        if self._observer is not None or self._stopped or Observer is None:
+            return self.available
+        if not os.path.isdir(self._git_dir):
+            # Avoid recursively watching a directory which is not a repository (e.g., a home directory):
+            return False
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+
+        self._loop = asyncio.get_event_loop()
+        observer = Observer()
+        handler = _Handler(self)
+        try:
+            observer.schedule(handler, self.root, recursive=True)
+            if not self._git_dir.startswith(self.root + os.sep) and os.path.isdir(self._git_dir):
+                observer.schedule(handler, self._git_dir, recursive=True)
+            observer.daemon = True
+            observer.start()
+        except OSError:
+            # E.g., the platform limit on the number of watches has been reached, so release any watches which were added and back off before retrying...
+            observer.stop()
+            if observer.is_alive():
+                observer.join()
+            self._retry_at = now + self._retry_interval
+            self._retry_interval = min(self._retry_interval*2, MAX_RETRY_INTERVAL)
+            return False
+
+        self._retry_interval = RETRY_INTERVAL
+        self._observer = observer
+        return True
+
+    def stop(self):
+        """Stop watching a repository.
+
+        Notes:
+            Once stopped, a watcher cannot be restarted.
+
+        """
+        self._stopped = True
+        observer = self._observer
+        self._observer = None
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+    def subscribe(self, clbk):
+        """Register a function to be invoked upon changes.
+
+        Args:
+            clbk: function which is provided a `set` of change categories
+
+        """
+        self._subscribers.append(clbk)
+
+    def unsubscribe(self, clbk):
+        """Remove a registered function.
+
+        Args:
+            clbk: previously registered function
+
+        """
+        if clbk in self._subscribers:
+            self._subscribers.remove(clbk)
@@ -0,0 +1,597 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Git commands for inspecting and updating the index and working tree."""
+
+import asyncio
+import os
+import posixpath
+import stat
+import tornado.web
+from jupyterlab_simple_git.index import IndexFormatError
+from jupyterlab_simple_git.pathspec import literal, pathspecs
+from jupyterlab_simple_git.status import parse_status
+from jupyterlab_simple_git.status_tree import categorize
+
+# Maximum number of ambiguous index entries to resolve by path before comparing the entire working tree:
+MAX_AMBIGUOUS_PATHS = 1000
+
+# Minimum number of literal file paths for which `add` and `reset` update the index via `git update-index` rather than via pathspec matching:
+UPDATE_INDEX_THRESHOLD = 100
+
+
+# Please keep class methods ordered in alphabetical order...
+
+
+class WorktreeCommands():
+    """Mixin class providing working tree status and staging (see `Git`)."""
+
+    def _can_update_index(self, path):
+        """Return a boolean indicating whether paths can be added via `git update-index` with the same effect as `git add`.
+
+        Notes:
+            This method performs blocking file system calls and should be run in an executor.
+
+        Args:
+            path: list of paths
+
+        Returns:
+            A boolean indicating whether each path is a literal path (i.e., not a glob) to either an existing file or a tracked file which has been removed.
+
+        """
+        if not literal(path):
+            return False
+        try:
+            lookup = self._index.lookup()
+        except (OSError, IndexFormatError):
+            return False
+        if lookup is None:
+            return False
+        for p in path:
+            try:
+                if stat.S_ISDIR(os.lstat(os.path.join(self.root, p)).st_mode):
+                    return False
+            except (FileNotFoundError, NotADirectoryError):
+                if os.fsencode(p) not in lookup:
+                    return False
+        return True
+
+    async def _index_info(self, path):
+        """Return `git update-index --index-info` records which reset the index entries for a list of paths to their `HEAD` versions.
+
+        Notes:
+            Paths which are not present in `HEAD` are removed from the index.
+
+        Args:
+            path: list of paths
+
+        Returns:
+            NUL-delimited records or `None` if unable to match each path to either a `HEAD` tree entry or an index entry (e.g., a path is a glob or a directory)
+
+        """
+        if not literal(path):
+            return None
+        try:
+            lookup = await asyncio.get_event_loop().run_in_executor(None, self._index.lookup)
+        except (OSError, IndexFormatError):
+            return None
+        if lookup is None:
+            return None
+
+        wanted = set(path)
+        records = {}
+
+        def clbk(response, record):
+            p = record.split('\t', 1)[-1]
+            if p in wanted:
+                records[p] = record
+
+        response = await self._stream(['git', 'ls-tree', '-r', '-z', '--full-tree', 'HEAD'], clbk)
+        if response['code'] != 0:
+            return None
+
+        out = []
+        for p in wanted:
+            if p in records:
+                out.append(records[p])
+            elif os.fsencode(p) in lookup:
+                # A null object name of the repository's hash length removes an entry:
+                oid = lookup[os.fsencode(p)][1][10]
+                out.append('0 ' + '0'*len(oid)*2 + '\t' + p)
+            else:
+                return None
+        return ('\x00'.join(out) + '\x00').encode('utf8')
+
+    async def add(self, path='.', update_all=True):
+        """Add file contents to the index.
+
+        Notes:
+            A list of paths is provided to Git via standard input, thus avoiding command-line length limits.
+
+            When provided at least `UPDATE_INDEX_THRESHOLD` literal paths to files, the index is updated via a single `git update-index --stdin` process, as matching each path as a pathspec against every index entry and working tree file scales with the product of the two. Unlike `git add`, `git update-index` does not consult ignore rules. If `git update-index` rejects a path, the index is left unchanged and the paths are added via `git add`.
+
+        Args:
+            path: a subdirectory path, file path, glob, or a list of paths and/or globs (default: '.')
+            update_all: boolean indicating whether to update all entries in the index to match the working tree (default: True)
+
+        Returns:
+            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # command results
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        cmd = ['git', 'add']
+        if update_all:
+            cmd.append('-A')
+
+        if isinstance(path, str):
+            cmd += ['--', path]
+            return await self._run(cmd, write=True)
+        if not path:
+            return await self._run(cmd, write=True)
+
+        stdin = pathspecs(path)
+        async with self.scheduler.write():
+            if len(path) >= UPDATE_INDEX_THRESHOLD and await asyncio.get_event_loop().run_in_executor(None, self._can_update_index, path):
+                response = await self._run(['git', 'update-index', '--add', '--remove', '-z', '--stdin'], write=True, stdin=stdin+b'\x00')
+                if response['code'] == 0:
+                    return response
+
+            cmd += ['--pathspec-from-file=-', '--pathspec-file-nul']
+            return await self._run(cmd, write=True, stdin=stdin)
+
+    async def current_changed_files(self, path='.'):
+        """Return the list of files containing changes relative to the index.
+
+        Notes:
+            The index is compared against the working tree in-process, and Git is only consulted for files whose stat data does not determine whether a file has changed.
+
+            The contents of such files are hashed by `git hash-object`, and files whose hashes match the index are unchanged. As `git hash-object` and `git diff` may convert contents differently (e.g., `git diff` does not normalize line endings under `core.autocrlf` for files committed with CRLF line endings), files whose hashes do not match the index are compared by `git diff`.
+
+        Args:
+            path: subdirectory path (default: '.')
+
+        Returns:
+            A `dict` containing a list of changed files. If able to successfully resolve a list of changed files, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'files': [...string]  # list of changed files
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        def clbk(response, lines):
+            """Process command results.
+
+            Args:
+                response: response `dict`
+                lines: command results
+
+            """
+            response['files'] = [f for f in lines.split('\x00') if f]
+
+        async def compute():
+            """Compare the index against the working tree, only consulting Git for files which cannot be compared in-process.
+
+            Returns:
+                response `dict`
+
+            """
+            async with self.scheduler.read():
+                try:
+                    result = await asyncio.get_event_loop().run_in_executor(None, self._index.changed_files, path)
+                except (OSError, IndexFormatError):
+                    result = None
+
+            if result is None or len(result['ambiguous']) > MAX_AMBIGUOUS_PATHS:
+                self.metrics.inc('simple_git_index_reads_total', result='fallback')
+                return await self._run(['git', '-c', 'core.safecrlf=false', 'diff', '--name-only', '-z', '--', path], clbk)
+
+            files = set(result['changed'])
+            ambiguous = result['ambiguous']
+
+            # Hash the contents of stat-dirty files (applying clean filters) and compare against the index:
+            stat_dirty = [(f, oid) for f, oid in result['stat_dirty'] if b'\n' not in f]
+            ambiguous.extend(f for f, _ in result['stat_dirty'] if b'\n' in f)
+            if stat_dirty:
+                stdin = b''.join(f+b'\n' for f, _ in stat_dirty)
+                response = await self._run(['git', '-c', 'core.safecrlf=false', 'hash-object', '--stdin-paths'], stdin=stdin)
+                if response['code'] == 0:
+                    # A matching hash shows that a file is unchanged, but, as line ending conversion may differ from `git diff`, a mismatch is confirmed by `git diff`:
+                    ambiguous.extend(f for (f, oid), h in zip(stat_dirty, response['message'].split('\n')) if h != oid)
+                else:
+                    # E.g., a file was removed after comparing stat data...
+                    ambiguous.extend(f for f, _ in stat_dirty)
+
+            if len(ambiguous) > MAX_AMBIGUOUS_PATHS:
+                self.metrics.inc('simple_git_index_reads_total', result='fallback')
+                return await self._run(['git', '-c', 'core.safecrlf=false', 'diff', '--name-only', '-z', '--', path], clbk)
+            if ambiguous:
+                response = await self._run(['git', '-c', 'core.safecrlf=false', '--literal-pathspecs', 'diff', '--name-only', '-z', '--'] + [os.fsdecode(f) for f in ambiguous], clbk)
+                if response['code'] != 0:
+                    return response
+                files.update(os.fsencode(f) for f in response['files'])
+
+            self.metrics.inc('simple_git_index_reads_total', result='partial' if stat_dirty or ambiguous else 'exact')
+            return {
+                'code': 0,
+                'files': [f.decode('utf8', 'replace') for f in sorted(files)]
+            }
+
+        return await self._cached(('current_changed_files', path), compute)
+
+    async def delete_untracked_files(self, path='.'):
+        """Delete untracked files.
+
+        Args:
+            path: subdirectory path (default: '.')
+
+        Returns:
+            A `dict` containing command results. If able to successfully delete untracked files, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # command results
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        cmd = ['git', 'clean', '-df', path]
+        return await self._run(cmd, write=True)
+
+    async def reset(self, path=None):
+        """Remove file contents from the index.
+
+        Notes:
+            If not provided a path, this method removes all file contents from the index.
+
+            A list of paths is provided to Git via standard input, thus avoiding command-line length limits.
+
+            When provided at least `UPDATE_INDEX_THRESHOLD` literal paths, each of which is either present in `HEAD` or in the index, the index entries are replaced by their `HEAD` versions (or removed) via a single `git update-index --index-info` process, rather than by matching each path as a pathspec against every index entry.
+
+        Args:
+            path: a subdirectory path, file path, glob, or a list of paths and/or globs
+
+        Returns:
+            A `dict` containing command results. If able to successfully execute command, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # command results
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        cmd = ['git', 'reset']
+        if isinstance(path, str):
+            cmd += ['--', path]
+            return await self._run(cmd, write=True)
+        if not path:
+            return await self._run(cmd, write=True)
+
+        stdin = pathspecs(path)
+        async with self.scheduler.write():
+            if len(path) >= UPDATE_INDEX_THRESHOLD:
+                info = await self._index_info(path)
+                if info is not None:
+                    response = await self._run(['git', 'update-index', '-z', '--index-info'], write=True, stdin=info)
+                    if response['code'] == 0:
+                        # Restore cached file system information for entries whose contents match the working tree (as does `git reset`), ignoring entries which differ:
+                        await self._run(['git', 'update-index', '-q', '--refresh'], write=True)
+                        return response
+
+            cmd += ['--pathspec-from-file=-', '--pathspec-file-nul']
+            return await self._run(cmd, write=True, stdin=stdin)
+
+    async def snapshot(self, path='.'):
+        """Return the current branch and working tree status in a single command.
+
+        Notes:
+            This method resolves the information provided by `current_branch`, `status`, `untracked_files`, and `current_changed_files` from a single `git status` invocation, thus requiring only one working tree scan.
+
+            If `HEAD` is detached, the branch name is 'HEAD'.
+
+        Args:
+            path: subdirectory path (default: '.')
+
+        Returns:
+            A `dict` containing a repository snapshot. If able to successfully resolve a snapshot, the returned `dict` has the following format:
+
+            {
+                'code': int,              # command status code
+                'branch': string,         # branch name
+                'oid': string|None,       # current commit hash or `None` if the current branch has no commits
+                'upstream': string|None,  # upstream branch or `None` if the current branch does not have an upstream branch
+                'ahead': int,             # number of commits in the current branch which are not in the upstream branch
+                'behind': int,            # number of commits in the upstream branch which are not in the current branch
+                'staged': [...dict],      # list of changes in the index (see `status`)
+                'unstaged': [...dict],    # list of changes in the working tree relative to the index (see `status`)
+                'untracked': [...string]  # list of untracked files
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        def clbk(response, data):
+            """Process command results.
+
+            Args:
+                response: response `dict`
+                data: command results
+
+            """
+            headers, entries = parse_status(data)
+
+            head = headers.get('branch.head', 'HEAD')
+            response['branch'] = 'HEAD' if head == '(detached)' else head
+
+            oid = headers.get('branch.oid', '(initial)')
+            response['oid'] = None if oid == '(initial)' else oid
+
+            response['upstream'] = headers.get('branch.upstream')
+            response['ahead'] = 0
+            response['behind'] = 0
+            if 'branch.ab' in headers:
+                ahead, behind = headers['branch.ab'].split(' ')
+                response['ahead'] = int(ahead)
+                response['behind'] = -int(behind)
+
+            response['staged'] = []
+            response['unstaged'] = []
+            response['untracked'] = []
+            for entry in entries:
+                if entry['status'] == '?':
+                    response['untracked'].append(entry['file'])
+                    continue
+                if entry['staged']:
+                    response['staged'].append(entry)
+                if entry['unstaged']:
+                    response['unstaged'].append(entry)
+
+        cmd = ['git', '--no-optional-locks', 'status', '--porcelain=v2', '--branch', '-z', '--untracked-files=all', '--renames', '--', path]
+        return await self._cached(('snapshot', path), lambda: self._run(cmd, clbk))
+
+    async def status(self, path='.'):
+        """Return the working tree status.
+
+        Notes:
+            Staged and unstaged changes are reported separately via the `index` and `worktree` fields. For example, a file which has been modified, staged, and then modified again has an `index` status of 'M' and a `worktree` status of 'M'.
+
+        Args:
+            path: subdirectory path (default: '.')
+
+        Returns:
+            A `dict` containing a list of changes. If able to successfully resolve a list of changes, the returned `dict` has the following format:
+
+            {
+                'code': int,              # command status code
+                'differences': [...dict]  # list of changes
+            }
+
+            For modifications, additions, and deletions, each `dict` in `differences` has the following format:
+
+            {
+                'status': string,        # single-letter action abbreviation
+                'action': string,        # action
+                'file': string,          # changed file
+                'index': string,         # single-letter index status ('.' if unmodified)
+                'worktree': string,      # single-letter working tree status ('.' if unmodified)
+                'staged': bool,          # boolean indicating whether a file has staged changes
+                'unstaged': bool,        # boolean indicating whether a file has unstaged changes
+                'submodule': dict|None   # submodule state or `None` if a path is not a submodule
+            }
+
+            For copies and renames, each `dict` in `differences` has the following additional fields (in lieu of `file`):
+
+            {
+                'from': string,          # original path
+                'to': string,            # destination path
+                'score': int             # similarity score (percent)
+            }
+
+            For unmerged files, each `dict` in `differences` has an additional `conflict` field containing the two-letter conflict type (e.g., 'UU').
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        def clbk(response, data):
+            """Process command results.
+
+            Args:
+                response: response `dict`
+                data: command results
+
+            """
+            response['differences'] = parse_status(data)[1]
+
+        cmd = ['git', '--no-optional-locks', 'status', '--porcelain=v2', '-z', '--renames']
+        if path != '.':
+            # Git only consults the untracked cache when not provided a pathspec:
+            cmd += ['--', path]
+        return await self._cached(('status', path), lambda: self._run(cmd, clbk))
+
+    async def status_tree(self, path='.'):
+        """Return the number of changed files beneath a directory and beneath each of its immediate children.
+
+        Notes:
+            This method is intended for decorating a file browser, one directory level at a time (e.g., when a directory is expanded).
+
+            Counts are derived from the working tree status of the entire repository (see `snapshot`), which is shared with other requests and cached until the repository changes. Per-directory counts are maintained incrementally (see `StatusTree`), such that, after the repository changes, only files whose status changed update the counts of their ancestor directories.
+
+            Changed files are counted in one of the following categories:
+
+                -   conflicted: unmerged files
+                -   untracked: untracked files (counted individually, rather than by untracked directory)
+                -   added: added files and the destinations of copies and renames
+                -   modified: all other changes (e.g., modifications and deletions)
+
+        Args:
+            path: directory path relative to the repository root (default: '.')
+
+        Returns:
+            A `dict` containing per-directory counts. If able to successfully resolve the working tree status, the returned `dict` has the following format:
+
+            {
+                'code': int,              # command status code
+                'path': string,           # normalized directory path
+                'counts': dict,           # number of changed files beneath the directory for each category
+                'entries': [...dict]      # immediate children which contain changes, ordered by name
+            }
+
+            Each directory entry in `entries` has the following format:
+
+            {
+                'name': string,           # entry name
+                'path': string,           # path relative to the repository root
+                'type': 'directory',
+                'counts': dict            # number of changed files beneath the directory for each category
+            }
+
+            Each file entry in `entries` has the following format:
+
+            {
+                'name': string,           # entry name
+                'path': string,           # path relative to the repository root
+                'type': 'file',
+                'category': string        # change category
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        Raises:
+            HTTPError: must provide a valid path argument
+
+        """
+        if not isinstance(path, str) or path == '':
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid path argument.')
+        path = posixpath.normpath(path.replace(os.sep, '/'))
+        if path.startswith('/') or path == '..' or path.startswith('../'):
+            raise tornado.web.HTTPError(400, 'invalid argument. Must provide a valid path argument.')
+
+        response = await self.snapshot()
+        if response['code'] != 0:
+            return response
+
+        # Cached snapshots are shared and immutable, and, thus, counts only need updating when provided a new snapshot:
+        if response is not self._tree_source:
+            files = dict.fromkeys(response['untracked'], 'untracked')
+            for entry in response['staged'] + response['unstaged']:
+                files[entry.get('to', entry.get('file'))] = categorize(entry)
+            self._tree.update(files)
+            self._tree_source = response
+
+        key = '' if path == '.' else path
+        return {
+            'code': 0,
+            'path': path,
+            'counts': self._tree.counts(key),
+            'entries': self._tree.children(key)
+        }
+
+    async def untracked_files(self, path='.'):
+        """Return a list of untracked files.
+
+        Args:
+            path: subdirectory path (default: '.')
+
+        Returns:
+            A `dict` containing a list of untracked files. If able to successfully resolve a list of untracked files, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'files': [...string]  # list of untracked files
+            }
+
+            Otherwise, if an error is encountered, the returned `dict` has the following format:
+
+            {
+                'code': int,          # command status code
+                'message': string     # error message
+            }
+
+        """
+        def clbk(response, lines):
+            """Process command results.
+
+            Args:
+                response: response `dict`
+                lines: command results
+
+            """
+            if lines == '':
+                response['files'] = []
+            else:
+                response['files'] = lines.split('\n')
+
+        cmd = ['git', 'ls-files', '-o', '--exclude-standard', path]
+        return await self._cached(('untracked_files', path), lambda: self._run(cmd, clbk))
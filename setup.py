@@ -64,5 +64,27 @@ setup(
             ["etc/jupyter/jupyter_server_config.d/jupyterlab_simple_git.json"]
         ),
     ],
-    install_requires=[]
+    install_requires=[],
+    extras_require={
+        # File system event notifications (e.g., for caching working tree status):
+        "watch": [
+            "watchdog"
+        ],
+
+        # Compact (MessagePack) responses:
+        "msgpack": [
+            "msgpack"
+        ],
+
+        # Brotli response compression:
+        "brotli": [
+            "brotli"
+        ],
+
+        # Running tests:
+        "test": [
+            "pytest",
+            "pytest-asyncio"
+        ]
+    }
 )
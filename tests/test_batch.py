@@ -0,0 +1,119 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for the batch endpoint."""
+
+import json
+import os
+import pytest
+import tornado.httpclient
+import tornado.httpserver
+import tornado.testing
+import tornado.web
+from jupyterlab_simple_git.handlers import Batch
+from jupyterlab_simple_git.registry import Registry
+from tests.utils import git as run, write
+
+
+@pytest.fixture
+async def batch(repo):
+    """Return a coroutine function which posts a list of operations to the batch endpoint."""
+    registry = Registry(os.path.dirname(repo), maintenance_interval=0, history_index=False)
+    app = tornado.web.Application([('/batch', Batch)], simple_git=registry)
+    sock, port = tornado.testing.bind_unused_port()
+    server = tornado.httpserver.HTTPServer(app)
+    server.add_sockets([sock])
+    client = tornado.httpclient.AsyncHTTPClient()
+
+    async def post(body):
+        url = 'http://127.0.0.1:%d/batch?repo=%s' % (port, os.path.basename(repo))
+        response = await client.fetch(url, method='POST', body=json.dumps(body), raise_error=False)
+        return response.code, json.loads(response.body)
+
+    yield post
+    server.stop()
+    registry.close()
+
+
+async def test_batch(repo, batch):
+    """Operations run in order."""
+    write(repo, 'a.txt', 'A\n')
+    write(repo, 'b.txt', 'B\n')
+    status, body = await batch({'operations': [
+        {'op': 'add', 'path': ['a.txt', 'b.txt']},
+        {'op': 'reset', 'path': ['b.txt']},
+        {'op': 'commit', 'subject': 'Add'},
+        {'op': 'checkout_branch', 'branch': 'main'}
+    ]})
+    assert status == 200
+    assert body['code'] == 0
+    assert [r['code'] for r in body['results']] == [0, 0, 0, 0]
+    assert run(repo, 'log', '-1', '--format=%s') == 'Add'
+    assert run(repo, 'show', '--name-only', '--format=', 'HEAD') == 'a.txt'
+    assert run(repo, 'status', '--porcelain') == '?? b.txt'
+
+
+async def test_batch_stops(repo, batch):
+    """Execution stops at the first operation which fails."""
+    write(repo, 'a.txt', 'A\n')
+    status, body = await batch({'operations': [
+        {'op': 'add', 'path': ['a.txt']},
+        {'op': 'delete_branch', 'branch': 'missing'},
+        {'op': 'commit', 'subject': 'Add'}
+    ]})
+    assert status == 200
+    assert len(body['results']) == 2
+    assert body['code'] == body['results'][-1]['code'] != 0
+    assert run(repo, 'log', '--format=%s') == 'Initial commit'
+
+
+async def test_batch_rejected_arguments(repo, batch):
+    """An operation which rejects its arguments stops execution and reports the HTTP status code."""
+    status, body = await batch({'operations': [
+        {'op': 'commit', 'subject': ''},
+        {'op': 'add', 'path': ['README.md']}
+    ]})
+    assert status == 200
+    assert body['code'] == 400
+    assert len(body['results']) == 1
+
+
+@pytest.mark.parametrize('operations', [
+    None,
+    [],
+    ['add'],
+    [{'op': 'add', 'path': ['a.txt']}, {'op': 'push', 'remote': 'origin'}],
+    [{'op': 'add', 'path': ['a.txt'], 'unknown': True}]
+])
+async def test_batch_invalid(repo, batch, operations):
+    """Invalid operations are rejected before any operation runs."""
+    write(repo, 'a.txt', 'A\n')
+    status, _ = await batch({} if operations is None else {'operations': operations})
+    assert status == 400
+    assert run(repo, 'status', '--porcelain') == '?? a.txt'
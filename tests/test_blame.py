@@ -0,0 +1,115 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for parsing line authorship."""
+
+import pytest
+from jupyterlab_simple_git.blame import BlameOutput, unquote
+from tests.utils import commit, git as run
+
+NAME = 'ü "q"\t.txt'
+
+
+@pytest.mark.parametrize('path,expected', [
+    ('a.txt', 'a.txt'),
+    ('"a.txt', '"a.txt'),
+    ('"a\\"b.txt"', 'a"b.txt'),
+    ('"a\\tb\\\\c\\n.txt"', 'a\tb\\c\n.txt'),
+    ('"\\303\\274.txt"', 'ü.txt'),
+    ('"\\342\\202\\254 \\303\\274"', '€ ü'),
+    ('"\\377.txt"', '�.txt')
+])
+def test_unquote(path, expected):
+    """Quoted paths are unescaped, including octal escape sequences for bytes of multi-byte characters."""
+    assert unquote(path) == expected
+
+
+def test_unquote_git(repo):
+    """Paths quoted by Git are unquoted."""
+    commit(repo, 'Add', {NAME: 'Hello\n'})
+    quoted = run(repo, '-c', 'core.quotePath=true', 'ls-files', NAME)
+    assert quoted.startswith('"\\303\\274 \\"q\\"\\t')
+    assert unquote(quoted) == NAME
+
+
+def test_blame_output(repo):
+    """Ranges and commits are parsed from Git output, and each commit is written once."""
+    lines = ['%d\n' % i for i in range(1, 11)]
+    first = commit(repo, 'First', {NAME: ''.join(lines)})
+    run(repo, 'mv', NAME, 'new.txt')
+    lines[1] = 'changed\n'
+    second = commit(repo, 'Second', {'new.txt': ''.join(lines)+'11\n'})
+
+    writes = []
+    output = BlameOutput(writes.append)
+    for line in run(repo, 'blame', '--incremental', '--porcelain', 'HEAD', '--', 'new.txt').split('\n'):
+        output.feed(line)
+
+    ranges = sorted(output.ranges, key=lambda r: r['line'])
+    assert [(r['line'], r['lines'], r['commit'], r['path']) for r in ranges] == [
+        (1, 1, first, NAME),
+        (2, 1, second, 'new.txt'),
+        (3, 8, first, NAME),
+        (11, 1, second, 'new.txt')
+    ]
+    assert [r['orig_line'] for r in ranges] == [1, 2, 3, 11]
+    assert output.commits[first]['summary'] == 'First'
+    assert output.commits[second] == {
+        'author': 'Test',
+        'email': 'test@example.com',
+        'time': int(run(repo, 'log', '-1', '--format=%at', second)),
+        'summary': 'Second',
+        'boundary': False
+    }
+
+    assert [w['ranges'] for w in writes] == [[r] for r in output.ranges]
+    assert sorted(c for w in writes for c in w['commits']) == sorted([first, second])
+
+
+def test_blame_output_boundary(repo):
+    """The root commit is a boundary commit."""
+    output = BlameOutput()
+    for line in run(repo, 'blame', '--incremental', '--porcelain', 'HEAD', '--', 'README.md').split('\n'):
+        output.feed(line)
+    assert [c['boundary'] for c in output.commits.values()] == [True]
+    assert output.ranges[0]['path'] == 'README.md'
+
+
+async def test_blame(repo, git):
+    """Line authorship is cached by commit, path, and blob."""
+    commit(repo, 'Second', {'README.md': 'Hello\nWorld\n'})
+    response = await git.blame('README.md')
+    assert response['code'] == 0
+    assert [(r['line'], r['lines']) for r in response['ranges']] == [(1, 1), (2, 1)]
+    assert {c['summary'] for c in response['commits'].values()} == {'Initial commit', 'Second'}
+
+    ranges = []
+    assert (await git.blame('README.md', write=lambda value: ranges.extend(value['ranges'])))['code'] == 0
+    assert sorted(ranges, key=lambda r: r['line']) == response['ranges']
+    assert 'simple_git_blame_cache_requests_total{result="hit"} 1' in git.metrics.render()
@@ -0,0 +1,51 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for resolving file contents."""
+
+import pytest
+import tornado.web
+from tests.utils import commit
+
+
+async def test_file_contents(repo, git):
+    """File contents are resolved at a specified revision."""
+    commit(repo, 'Change', {'README.md': 'World\n'})
+    response = await git.file_contents('README.md', 'HEAD~1')
+    assert response['code'] == 0
+    assert (response['encoding'], response['contents']) == ('text', 'Hello\n')
+    assert (await git.file_contents('missing.txt'))['code'] == 128
+
+
+@pytest.mark.parametrize('rev', ['', '-p', 'HEAD\nHEAD:README.md', None, 1])
+async def test_invalid_revision(git, rev):
+    """A revision which could be interpreted as an option or span multiple requests is rejected."""
+    with pytest.raises(tornado.web.HTTPError) as err:
+        await git.file_contents('README.md', rev)
+    assert err.value.status_code == 400
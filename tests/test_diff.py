@@ -0,0 +1,113 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for diff parsing and line counts."""
+
+from jupyterlab_simple_git.diff import parse_numstat, parse_tree_numstat
+from tests.utils import commit, git as run
+
+A = 'a'*40
+B = 'b'*40
+C = 'c'*40
+
+
+def test_parse_numstat():
+    """`parse_numstat` parses line counts, binary files, and renames."""
+    entries = parse_numstat('1\t2\ta.txt\x00-\t-\tb.bin\x003\t0\t\x00old.txt\x00new.txt\x00')
+    assert entries == [
+        {'file': 'a.txt', 'from': None, 'additions': 1, 'deletions': 2, 'binary': False},
+        {'file': 'b.bin', 'from': None, 'additions': None, 'deletions': None, 'binary': True},
+        {'file': 'new.txt', 'from': 'old.txt', 'additions': 3, 'deletions': 0, 'binary': False}
+    ]
+
+
+def test_parse_tree_numstat():
+    """`parse_tree_numstat` assigns records to each pair of trees."""
+    data = A+' '+B+'\n1\t2\ta.txt\x003\t4\tb.txt\x00'+B+' '+C+'\n5\t6\tc.txt\x00'
+    results = parse_tree_numstat(data)
+    assert [e['file'] for e in results[(A, B)]] == ['a.txt', 'b.txt']
+    assert [e['file'] for e in results[(B, C)]] == ['c.txt']
+
+
+def test_parse_tree_numstat_empty_pair():
+    """A pair without changes is followed directly by the next pair's header."""
+    data = A+' '+B+'\n1\t0\ta.txt\x00'+B+' '+B+'\n'+B+' '+C+'\n2\t0\tc.txt\x00'+C+' '+C
+    results = parse_tree_numstat(data)
+    assert [e['file'] for e in results[(A, B)]] == ['a.txt']
+    assert results[(B, B)] == []
+    assert [e['file'] for e in results[(B, C)]] == ['c.txt']
+    assert results[(C, C)] == []
+
+
+async def test_diffstat_empty_commit(repo, git):
+    """Line counts are resolved for commits without changes."""
+    commit(repo, 'Empty')
+    commit(repo, 'Change', {'README.md': 'Hello\nWorld\n'})
+
+    response = await git.diffstat(['HEAD~2', 'HEAD~1', 'HEAD'])
+    assert response['code'] == 0
+    assert [s['additions'] for s in response['stats']] == [1, 0, 1]
+    assert [s['files_changed'] for s in response['stats']] == [1, 0, 1]
+
+    response = await git.commit_history(stats=True)
+    assert response['code'] == 0
+    assert [(c['message'], c['stats']['additions']) for c in response['history']] == [('Change', 1), ('Empty', 0), ('Initial commit', 1)]
+
+
+async def test_diffstat_merge_without_changes(repo, git):
+    """A merge which discards the other branch's changes has no changes relative to its first parent."""
+    run(repo, 'checkout', '--quiet', '-b', 'side')
+    commit(repo, 'Side', {'side.txt': 'Side\n'})
+    run(repo, 'checkout', '--quiet', 'main')
+    run(repo, 'merge', '--quiet', '-s', 'ours', '-m', 'Merge', 'side')
+    commit(repo, 'After', {'after.txt': 'After\n'})
+
+    response = await git.diffstat(['HEAD~1', 'HEAD'])
+    assert response['code'] == 0
+    assert [s['files_changed'] for s in response['stats']] == [0, 1]
+
+
+async def test_diffstat_symmetric_range(repo, git):
+    """A symmetric range compares the merge base against the second endpoint."""
+    run(repo, 'checkout', '--quiet', '-b', 'side')
+    commit(repo, 'Side', {'side.txt': 'Side\n'})
+    run(repo, 'checkout', '--quiet', 'main')
+    commit(repo, 'Main', {'main.txt': 'One\nTwo\n'})
+
+    response = await git.diffstat(['side...main', 'main...side', 'side..main'], files=True)
+    assert response['code'] == 0
+    assert [[f['file'] for f in s['files']] for s in response['stats']] == [['main.txt'], ['side.txt'], ['main.txt', 'side.txt']]
+
+
+async def test_diffstat_invalid_revision(git):
+    """An invalid revision does not prevent resolving line counts for other revisions."""
+    response = await git.diffstat(['missing', 'HEAD', 'HEAD...missing', 'missing..HEAD'])
+    assert response['code'] == 0
+    assert [s.get('code') for s in response['stats']] == [128, None, 128, 128]
+    assert response['stats'][1]['additions'] == 1
@@ -0,0 +1,113 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for response encoding."""
+
+import gzip
+import json
+import pytest
+import tornado.httpclient
+import tornado.httpserver
+import tornado.testing
+import tornado.web
+from jupyterlab_simple_git import encoding
+from jupyterlab_simple_git.encoding import EXECUTOR_SIZE, encode_response, estimate_size, negotiate_encoding
+from jupyterlab_simple_git.base_handlers import BaseHandler
+from jupyterlab_simple_git.registry import Registry
+
+LARGE = {
+    'code': 0,
+    'files': [{'file': 'dir/file%d.txt' % i, 'status': '?'} for i in range(10000)]
+}
+
+
+def test_estimate_size():
+    """Estimates are close to the serialized size and stop at the limit."""
+    small = {'code': 0, 'files': [{'file': 'a.txt', 'status': 'M'}]*20}
+    assert abs(estimate_size(small, EXECUTOR_SIZE) - len(json.dumps(small))) < 0.2*len(json.dumps(small))
+    assert estimate_size(LARGE, EXECUTOR_SIZE) >= EXECUTOR_SIZE
+    assert estimate_size({'items': [0]*10**6}, EXECUTOR_SIZE) >= EXECUTOR_SIZE
+
+
+@pytest.mark.parametrize('header,expected', [
+    (None, None),
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('br;q=0', None),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('*', 'gzip'),
+    ('*, gzip;q=0', None),
+    ('gzip;q=0, *', None),
+    ('identity', None)
+])
+def test_negotiate_encoding(monkeypatch, header, expected):
+    """Codings having a quality value of zero are never selected."""
+    monkeypatch.setattr(encoding, 'brotli', object())
+    assert negotiate_encoding(header) == expected
+
+
+def test_encode_response():
+    """Response bodies are only compressed above a threshold."""
+    data, coding = encode_response({'code': 0}, 'application/json', 'gzip')
+    assert coding is None
+    assert json.loads(data) == {'code': 0}
+
+    data, coding = encode_response(LARGE, 'application/json', 'gzip')
+    assert coding == 'gzip'
+    assert len(data) < len(json.dumps(LARGE))
+    assert json.loads(gzip.decompress(data)) == LARGE
+
+
+class Large(BaseHandler):
+    """Handler returning a large response."""
+
+    async def get(self):
+        """Return a large response."""
+        self.finish(LARGE)
+
+
+async def test_large_response(tmp_path):
+    """Large responses are encoded in an executor and finished once encoded."""
+    app = tornado.web.Application([('/large', Large)], simple_git=Registry(str(tmp_path)))
+    sock, port = tornado.testing.bind_unused_port()
+    server = tornado.httpserver.HTTPServer(app)
+    server.add_sockets([sock])
+    try:
+        client = tornado.httpclient.AsyncHTTPClient()
+        for headers in ({}, {'Accept-Encoding': 'gzip'}):
+            response = await client.fetch('http://127.0.0.1:%d/large' % port, headers=headers, decompress_response=False)
+            body = response.body
+            if 'gzip' in headers.values():
+                assert response.headers['Content-Encoding'] == 'gzip'
+                body = gzip.decompress(body)
+            assert json.loads(body) == LARGE
+    finally:
+        server.stop()
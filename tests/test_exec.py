@@ -0,0 +1,104 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for asynchronous command execution."""
+
+import asyncio
+import time
+
+# Git command which takes (at least) two seconds to run:
+SLOW = ['git', '-c', 'alias.slow=!sleep 2', 'slow']
+
+
+async def test_exec_returns_status_code_and_output(git):
+    """`_exec` returns the status code and combined output of a command."""
+    code, output = await git._exec(['git', 'rev-parse', '--abbrev-ref', 'HEAD'])
+    assert code == 0
+    assert output.decode('utf8').strip() == 'main'
+
+    code, output = await git._exec(['git', 'rev-parse', '--verify', 'nonexistent'])
+    assert code != 0
+    assert b'fatal' in output
+
+
+async def test_event_loop_runs_while_command_runs(git):
+    """The event loop services other callbacks while a slow command runs."""
+    slow = asyncio.ensure_future(git._exec(SLOW))
+    ticks = 0
+    start = time.monotonic()
+    while time.monotonic()-start < 1.0:
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert not slow.done()
+    assert ticks > 20
+    assert (await slow)[0] == 0
+
+
+async def test_concurrent_requests_progress(git):
+    """Requests complete while a slow command runs."""
+    slow = asyncio.ensure_future(git._run(SLOW))
+    await asyncio.sleep(0.1)
+
+    start = time.monotonic()
+    results = await asyncio.gather(git.commit_history(n=1), git.status(), git.local_branches())
+    assert time.monotonic()-start < 1.5
+    assert not slow.done()
+    assert [r['code'] for r in results] == [0, 0, 0]
+    assert results[0]['history'][0]['message'] == 'Initial commit'
+
+    assert (await slow)['code'] == 0
+
+
+async def test_concurrent_commands_overlap(git):
+    """Concurrent slow commands run in parallel rather than one after another."""
+    start = time.monotonic()
+    results = await asyncio.gather(*[git._exec(SLOW) for _ in range(3)])
+    assert time.monotonic()-start < 4.0
+    assert [code for code, _ in results] == [0, 0, 0]
+
+
+async def test_cancellation_kills_command(git):
+    """Cancelling a request kills the running command."""
+    task = asyncio.ensure_future(git._exec(SLOW))
+    await asyncio.sleep(0.2)
+    start = time.monotonic()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    assert time.monotonic()-start < 1.0
+
+
+async def test_checkout_branch_scheduled(git):
+    """Every command run when switching branches is scheduled and recorded in metrics."""
+    assert (await git.checkout_branch('feature'))['code'] == 0
+    assert (await git.checkout_branch('main'))['code'] == 0
+    assert (await git.current_branch())['branch'] == 'main'
+    assert 'simple_git_commands_total{operation="show-ref"} 2' in git.metrics.render()
@@ -0,0 +1,89 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for fetching from remote repositories."""
+
+import asyncio
+from jupyterlab_simple_git.git import Git
+from tests.utils import commit, git as run
+
+
+async def test_default_remote(repo, git, tmp_path):
+    """The default remote is resolved in the same manner as Git."""
+    assert await git._default_remote() == 'origin'
+    run(repo, 'remote', 'add', 'upstream', str(tmp_path))
+    assert await git._default_remote() == 'upstream'
+    run(repo, 'remote', 'add', 'other', str(tmp_path))
+    assert await git._default_remote() == 'origin'
+    run(repo, 'config', 'branch.main.remote', 'other')
+    assert await git._default_remote() == 'other'
+
+
+async def test_default_remote_coalesced(repo, git, tmp_path):
+    """Fetches which omit the default remote share a fetch with fetches which name it."""
+    remote = str(tmp_path / 'remote.git')
+    run(str(tmp_path), 'clone', '--quiet', '--bare', repo, remote)
+    run(repo, 'remote', 'add', 'origin', remote)
+
+    responses = await asyncio.gather(git.fetch(), git.fetch('origin'))
+    assert [r['code'] for r in responses] == [0, 0]
+    assert 'simple_git_fetch_requests_total{result="coalesced"} 1' in git.metrics.render()
+    assert run(repo, 'rev-parse', 'origin/main') == run(repo, 'rev-parse', 'main')
+
+
+async def test_fetch_invalidates_status(repo, git, tmp_path):
+    """Ahead and behind counts reflect remote-tracking branches updated by a fetch."""
+    remote = str(tmp_path / 'remote.git')
+    other = str(tmp_path / 'other')
+    run(str(tmp_path), 'clone', '--quiet', '--bare', repo, remote)
+    run(repo, 'remote', 'add', 'origin', remote)
+    run(repo, 'fetch', '--quiet', 'origin')
+    run(repo, 'branch', '--quiet', '--set-upstream-to=origin/main')
+    assert (await git.snapshot())['behind'] == 0
+
+    run(str(tmp_path), 'clone', '--quiet', remote, other)
+    commit(other, 'Remote')
+    run(other, 'push', '--quiet', 'origin', 'main')
+
+    # File system events for updated refs may only be delivered after a fetch returns:
+    offset = git._cache._offset
+    assert (await git.fetch())['code'] == 0
+    assert git._cache._offset > offset
+    assert (await git.snapshot())['behind'] == 1
+
+
+async def test_push_without_branch(tmp_path):
+    """Pushing the current branch of a directory which is not a repository returns an error response."""
+    instance = Git(str(tmp_path))
+    try:
+        response = await instance.push('origin')
+        assert response['code'] != 0
+        assert 'message' in response
+    finally:
+        await instance.close()
@@ -0,0 +1,142 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for the commit index."""
+
+import pytest
+import tornado.web
+from jupyterlab_simple_git.git import Git
+from tests.utils import commit, git as run, write
+
+
+@pytest.fixture
+def merges(repo):
+    """Return the path of a repository having empty commits and a merge which discards the changes of a side branch."""
+    run(repo, 'checkout', '--quiet', '-b', 'side')
+    commit(repo, 'Side', {'a.txt': 'Side\n'})
+    run(repo, 'checkout', '--quiet', 'main')
+    commit(repo, 'Main', {'a.txt': 'Main\n'})
+    run(repo, 'merge', '--quiet', '-s', 'ours', '-m', 'Merge', 'side')
+    commit(repo, 'Empty')
+    write(repo, 'b.txt', 'Other\n')
+    run(repo, 'add', 'b.txt')
+    run(repo, 'commit', '--quiet', '--author=Other <other@example.com>', '-m', 'Other')
+    return repo
+
+
+async def indexed(root):
+    """Return a `Git` instance whose commit index is up-to-date with `HEAD`."""
+    instance = Git(root, maintenance_interval=0)
+    assert await instance._history_index() is None
+    await instance._history_task
+    assert await instance._history_index() is not None
+    return instance
+
+
+def messages(response):
+    """Return the commit messages listed by a commit history."""
+    assert response['code'] == 0
+    return [c['message'] for c in response['history']]
+
+
+@pytest.mark.parametrize('path, author, expected', [
+    ('.', None, ['Other', 'Empty', 'Merge', 'Main', 'Side', 'Initial commit']),
+    ('.', 'test@example.com', ['Empty', 'Merge', 'Main', 'Side', 'Initial commit']),
+    ('a.txt', None, ['Merge', 'Main', 'Side']),
+    ('b.txt', 'Other', ['Other']),
+    ('missing.txt', None, [])
+])
+async def test_index_matches_git(merges, git, path, author, expected):
+    """The commit index lists and counts the same commits as Git."""
+    index = await indexed(merges)
+    try:
+        for instance in (git, index):
+            assert messages(await instance.commit_history(path, author=author)) == expected
+            assert (await instance.commit_count(path, author))['count'] == len(expected)
+        assert 'simple_git_history_index_requests_total{result="hit"}' in index.metrics.render()
+    finally:
+        await index.close()
+
+
+async def test_index_pages(merges):
+    """Pages resolved from the commit index resume after the previous page."""
+    index = await indexed(merges)
+    try:
+        response = await index.commit_history(author='test@example.com', n=3)
+        assert messages(response) == ['Empty', 'Merge', 'Main']
+        response = await index.commit_history(author='test@example.com', cursor=response['cursor'])
+        assert messages(response) == ['Side', 'Initial commit']
+        assert response['cursor'] is None
+    finally:
+        await index.close()
+
+
+async def test_index_batches(merges, monkeypatch):
+    """The commit index is written and extended in batches."""
+    monkeypatch.setattr('jupyterlab_simple_git.history_commands.HISTORY_INDEX_BATCH_SIZE', 2)
+    index = await indexed(merges)
+    try:
+        assert (await index.commit_count())['count'] == 6
+        commit(merges, 'Extend', {'a.txt': 'Extend\n'})
+        await index._history_index()
+        assert messages(await index.commit_history('a.txt')) == ['Extend', 'Merge', 'Main', 'Side']
+        assert (await index.commit_count())['count'] == 7
+        run(merges, 'reset', '--quiet', '--hard', 'HEAD~3')
+        assert messages(await index.commit_history('a.txt')) == ['Merge', 'Main', 'Side']
+        assert (await index.commit_count('a.txt'))['count'] == 3
+    finally:
+        await index.close()
+
+
+@pytest.mark.parametrize('n', ['abc', '1.5', '0', '-1', 0, -5])
+async def test_invalid_page_size(git, n):
+    """A page size which is not a positive integer is rejected."""
+    with pytest.raises(tornado.web.HTTPError) as err:
+        await git.commit_history(n=n)
+    assert err.value.status_code == 400
+
+
+async def test_page_size(repo, git):
+    """A page size may be provided as a string (e.g., a query argument)."""
+    commit(repo, 'Second')
+    response = await git.commit_history(n='1')
+    assert messages(response) == ['Second']
+    assert messages(await git.commit_history(cursor=response['cursor'], n='1')) == ['Initial commit']
+
+
+async def test_default_page_size(repo, git, monkeypatch):
+    """A request which does not provide a page size returns a single page of commits."""
+    monkeypatch.setattr('jupyterlab_simple_git.history_commands.HISTORY_PAGE_SIZE', 2)
+    commit(repo, 'Second')
+    commit(repo, 'Third')
+    response = await git.commit_history()
+    assert messages(response) == ['Third', 'Second']
+    assert response['cursor'] is not None
+    commit(repo, 'Fourth')
+    assert messages(await git.commit_history(cursor=response['cursor'])) == ['Initial commit']
@@ -0,0 +1,164 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for comparing the index against the working tree."""
+
+import os
+import subprocess
+import time
+import pytest
+from jupyterlab_simple_git.index import AMBIGUOUS, CHANGED, STAT_DIRTY, Index, IndexFormatError, parse_index
+from tests.utils import commit, git as run, write
+
+
+def touch(root, path):
+    """Update the modification time of a file without changing its contents."""
+    path = os.path.join(root, path)
+    t = time.time() + 10
+    os.utime(path, (t, t))
+
+
+def read(root):
+    """Parse the index file of a repository."""
+    with open(os.path.join(root, '.git', 'index'), 'rb') as f:
+        return parse_index(f.read())
+
+
+def staged(root):
+    """Return (mode, object hash, stage, path) tuples for each index entry as listed by Git."""
+    out = []
+    for record in run(root, 'ls-files', '--stage', '-z').split('\x00'):
+        if record:
+            info, path = record.split('\t', 1)
+            mode, oid, stage = info.split(' ')
+            out.append((int(mode, 8), oid, int(stage), path))
+    return out
+
+
+async def test_changed_files_crlf(repo, git):
+    """Files committed with CRLF line endings are unchanged under `core.autocrlf`."""
+    commit(repo, 'CRLF', {'crlf.txt': 'a\r\nb\r\n', 'same.txt': 'abc\n'})
+    run(repo, 'config', 'core.autocrlf', 'true')
+    touch(repo, 'crlf.txt')
+    write(repo, 'same.txt', 'xyz\n')
+    touch(repo, 'same.txt')
+
+    expected = run(repo, 'diff', '--name-only').split()
+    assert expected == ['same.txt']
+    response = await git.current_changed_files()
+    assert response['code'] == 0
+    assert response['files'] == expected
+
+
+@pytest.mark.parametrize('version', [2, 3, 4])
+def test_parse_index(repo, version):
+    """Index entries are parsed for each supported index version."""
+    commit(repo, 'Add', {
+        'dir/a.txt': 'A\n',
+        'dir/ab.txt': 'AB\n',
+        'dir/sub/b.txt': 'B\n',
+        'line\nbreak.txt': 'C\n',
+        'ü.txt': 'D\n'
+    })
+    write(repo, 'new.txt', 'New\n')
+    run(repo, 'add', '--intent-to-add', 'new.txt')
+    run(repo, 'update-index', '--skip-worktree', 'dir/a.txt')
+    run(repo, 'update-index', '--index-version', str(version))
+
+    index = read(repo)
+    assert index['version'] == max(version, 3)
+    entries = [(f[6], f[10].hex(), (f[11] >> 12) & 3, p.decode('utf8')) for p, f, _ in index['entries']]
+    assert entries == staged(repo)
+    extended = {p: x for p, _, x in index['entries']}
+    assert extended[b'dir/a.txt'] == 0x4000
+    assert extended[b'new.txt'] == 0x2000
+
+
+def test_parse_index_extensions(repo):
+    """Extensions are returned undecoded."""
+    run(repo, 'update-index', '--untracked-cache')
+    run(repo, 'status', '--porcelain')
+    index = read(repo)
+    assert isinstance(index['extensions']['UNTR'], bytes)
+    assert [p for p, _, _ in index['entries']] == [b'README.md']
+
+
+def test_parse_index_invalid(repo):
+    """Truncated and unsupported index files are rejected."""
+    with open(os.path.join(repo, '.git', 'index'), 'rb') as f:
+        data = f.read()
+    for value in (data[:20], data[:40]+data[-20:], b'XXXX'+data[4:], data[:4]+b'\x00\x00\x00\x05'+data[8:]):
+        with pytest.raises(IndexFormatError):
+            parse_index(value)
+
+
+def test_changed_files(repo):
+    """Entries are compared against the working tree."""
+    commit(repo, 'Add', {'a.txt': 'A\n', 'b.txt': 'B\n', 'c.txt': 'C\n', 'd.txt': 'D\n', 'dir/e.txt': 'E\n'})
+    write(repo, 'a.txt', 'Changed\n')
+    os.remove(os.path.join(repo, 'b.txt'))
+    touch(repo, 'c.txt')
+    os.chmod(os.path.join(repo, 'd.txt'), 0o755)
+    write(repo, 'new.txt', 'New\n')
+    run(repo, 'add', '--intent-to-add', 'new.txt')
+
+    # Otherwise, unchanged entries whose files are not older than the index file would be racily clean (and, thus, stat-dirty):
+    touch(repo, '.git/index')
+    result = Index(repo).changed_files()
+    assert result[CHANGED] == [b'b.txt']
+    assert [name for name, _ in result[STAT_DIRTY]] == [b'a.txt', b'c.txt']
+    assert result[AMBIGUOUS] == [b'd.txt', b'new.txt']
+    assert Index(repo).changed_files('dir') == {CHANGED: [], STAT_DIRTY: [], AMBIGUOUS: []}
+
+
+async def test_changed_files_unsupported(repo, git):
+    """Changed files are resolved by Git when the index uses a split index."""
+    run(repo, 'update-index', '--split-index')
+    assert 'link' in read(repo)['extensions']
+    assert Index(repo).changed_files() is None
+
+    write(repo, 'README.md', 'Changed\n')
+    response = await git.current_changed_files()
+    assert response['files'] == ['README.md']
+
+
+async def test_changed_files_sha256(tmp_path):
+    """Repositories using SHA-256 object hashes are supported."""
+    root = str(tmp_path / 'sha256')
+    os.mkdir(root)
+    try:
+        run(root, 'init', '--quiet', '--object-format=sha256')
+    except subprocess.CalledProcessError:
+        pytest.skip('SHA-256 repositories are not supported')
+    commit(root, 'Initial commit', {'a.txt': 'A\n', 'b.txt': 'B\n'})
+    write(root, 'a.txt', 'Changed\n')
+    touch(root, 'b.txt')
+    oid = run(root, 'rev-parse', ':b.txt')
+    assert len(oid) == 64
+    assert Index(root).changed_files()[STAT_DIRTY][1] == (b'b.txt', oid)
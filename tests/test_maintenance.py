@@ -0,0 +1,164 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for background repository maintenance."""
+
+import asyncio
+import pytest
+import tornado.web
+from jupyterlab_simple_git.accelerators import is_enabled, parse_config
+from jupyterlab_simple_git.config import SimpleGit
+from jupyterlab_simple_git.git import Git
+from jupyterlab_simple_git.maintenance import Maintainer
+from tests.utils import commit, git as run
+
+
+async def test_background_maintenance_opt_in(repo):
+    """Background maintenance only runs when explicitly configured."""
+    assert SimpleGit().maintenance_interval == 0
+    git = Git(repo, history_index=False)
+    try:
+        assert git._maintainer.interval == 0
+        assert git._maintainer._timer is None
+    finally:
+        await git.close()
+
+    git = Git(repo, history_index=False, maintenance_interval=3600)
+    try:
+        assert git._maintainer._timer is not None
+    finally:
+        await git.close()
+
+
+def test_parse_config(repo):
+    """Configuration is parsed from Git output, with case-insensitive section and variable names."""
+    run(repo, 'config', 'Core.UntrackedCache', 'true')
+    run(repo, 'config', 'branch.Feature.remote', 'upstream')
+    run(repo, 'config', 'test.value', 'line one\nline two')
+    with open(repo+'/.git/config', 'a') as f:
+        f.write('[test]\n\tflag\n')
+
+    config = parse_config(run(repo, 'config', '--list', '-z'))
+    assert config['core.untrackedcache'] == 'true'
+    assert config['branch.Feature.remote'] == 'upstream'
+    assert config['test.value'] == 'line one\nline two'
+    assert config['test.flag'] is None
+
+
+def test_is_enabled():
+    """Boolean settings are interpreted as by Git."""
+    assert is_enabled({'core.commitgraph': 'yes'}, 'core.commitGraph')
+    assert is_enabled({'test.flag': None}, 'test.flag')
+    assert not is_enabled({'core.commitgraph': 'off'}, 'core.commitGraph', True)
+    assert is_enabled({}, 'core.commitGraph', True)
+    assert is_enabled({'feature.manyfiles': 'true'}, 'core.untrackedCache')
+    assert not is_enabled({'feature.manyfiles': 'true', 'core.untrackedcache': 'false'}, 'core.untrackedCache')
+    assert is_enabled({'core.fsmonitor': '.git/hooks/fsmonitor'}, 'core.fsmonitor')
+
+
+async def test_enable_accelerators(repo, git):
+    """Enabled accelerators are built by maintenance."""
+    commit(repo, 'Second', {'a.txt': 'A\n'})
+    response = await git.accelerators()
+    assert response['code'] == 0
+    assert not any(a['enabled'] or a['present'] for a in response['accelerators'].values())
+    assert response['maintenance'] == {'running': False, 'interval': 0}
+
+    response = await git.enable_accelerators(['commit_graph', 'untracked_cache', 'many_files'])
+    assert response['code'] == 0
+    assert response['maintenance']['running']
+    response = await git.maintain()
+    assert response == {'code': 0, 'tasks': ['commit-graph', 'index-version', 'refresh-index']}
+    assert run(repo, 'config', 'fetch.writeCommitGraph') == 'true'
+
+    response = await git.accelerators()
+    for name in ('commit_graph', 'untracked_cache', 'many_files'):
+        assert response['accelerators'][name] == {'supported': True, 'enabled': True, 'present': True}
+    assert not response['maintenance']['running']
+
+    # Once present, the commit-graph is updated incrementally:
+    commit(repo, 'Third')
+    response = await git.maintain()
+    assert response == {'code': 0, 'tasks': ['commit-graph', 'refresh-index']}
+    assert 'simple_git_maintenance_runs_total{result="success"} 2' in git.metrics.render()
+
+
+@pytest.mark.parametrize('names', ['commit_graph', ['unknown'], [None]])
+async def test_enable_accelerators_invalid(git, names):
+    """Unknown accelerators are rejected."""
+    with pytest.raises(tornado.web.HTTPError) as err:
+        await git.enable_accelerators(names)
+    assert err.value.status_code == 400
+
+
+async def test_maintainer_coalesced():
+    """Concurrent callers share a single maintenance run, which is cancelled once every caller is cancelled."""
+    runs = []
+    release = asyncio.Event()
+
+    async def maintain():
+        runs.append(None)
+        await release.wait()
+        return {'code': len(runs)-1}
+
+    maintainer = Maintainer(maintain)
+    tasks = [asyncio.ensure_future(maintainer.maintain()) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert maintainer.running
+    release.set()
+    assert [r['code'] for r in await asyncio.gather(*tasks)] == [0, 0, 0]
+    assert len(runs) == 1
+    assert not maintainer.running
+
+    release.clear()
+    task = asyncio.ensure_future(maintainer.maintain())
+    await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert not maintainer.running
+    await maintainer.close()
+
+
+async def test_maintainer_backoff():
+    """The interval between background runs doubles for each consecutive failure."""
+    async def maintain():
+        return {'code': 1}
+
+    maintainer = Maintainer(maintain, interval=10, jitter=0)
+    try:
+        assert maintainer._delay() == 10
+        for _ in range(3):
+            await maintainer.maintain()
+        assert maintainer.failures == 3
+        assert maintainer._delay() == 80
+        maintainer.failures = 100
+        assert maintainer._delay() == 86400
+    finally:
+        await maintainer.close()
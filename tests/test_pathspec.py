@@ -0,0 +1,93 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for providing pathspecs via standard input."""
+
+import pytest
+import tornado.web
+from jupyterlab_simple_git.pathspec import literal, pathspecs
+from tests.utils import git as run, write
+
+PATHS = ['-n', '--all', 'line\nbreak.txt', 'dir/-v.txt', 'space name.txt']
+
+
+def staged(root):
+    """Return the paths of staged changes."""
+    return sorted(p for p in run(root, 'diff', '--cached', '--name-only', '-z').split('\x00') if p)
+
+
+def test_pathspecs():
+    """Paths are NUL-delimited, and paths which Git cannot read from standard input are rejected."""
+    assert pathspecs(['a.txt', 'line\nbreak.txt']) == b'a.txt\x00line\nbreak.txt'
+    for path in ([''], ['a\x00b'], [None]):
+        with pytest.raises(tornado.web.HTTPError):
+            pathspecs(path)
+
+
+def test_literal():
+    """Globs and pathspecs having magic signatures are not literal paths."""
+    assert literal(['a.txt', '-n', 'line\nbreak.txt'])
+    assert not literal(['a.txt', '*.txt'])
+    assert not literal([':(glob)a.txt'])
+    assert not literal(['\udcff.txt'])
+
+
+@pytest.mark.parametrize('threshold', [1, 1000])
+async def test_add_reset(repo, git, monkeypatch, threshold):
+    """Paths containing newlines or beginning with dashes are neither split nor interpreted as options."""
+    monkeypatch.setattr('jupyterlab_simple_git.worktree_commands.UPDATE_INDEX_THRESHOLD', threshold)
+    for path in PATHS:
+        write(repo, path, path+'\n')
+    write(repo, 'other.txt', 'Other\n')
+
+    response = await git.add(PATHS)
+    assert response['code'] == 0
+    assert staged(repo) == sorted(PATHS)
+
+    response = await git.reset(PATHS[:2])
+    assert response['code'] == 0
+    assert staged(repo) == sorted(PATHS[2:])
+
+
+async def test_add_reset_string(repo, git):
+    """A single path beginning with a dash is not interpreted as an option."""
+    write(repo, '-n', 'Dash\n')
+    assert (await git.add('-n', update_all=False))['code'] == 0
+    assert staged(repo) == ['-n']
+    assert (await git.reset('-n'))['code'] == 0
+    assert staged(repo) == []
+
+
+async def test_add_glob(repo, git):
+    """Globs are matched by Git."""
+    write(repo, 'a.txt', 'A\n')
+    write(repo, 'dir/b.txt', 'B\n')
+    write(repo, 'c.md', 'C\n')
+    assert (await git.add(['*.txt']))['code'] == 0
+    assert staged(repo) == ['a.txt', 'dir/b.txt']
@@ -0,0 +1,107 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for reading refs without spawning a process."""
+
+import os
+from jupyterlab_simple_git.refs import Refs
+from tests.utils import commit, git as run
+
+
+def branches(root):
+    """Return the local branches listed by Git."""
+    return run(root, 'for-each-ref', '--format=%(refname:short)', 'refs/heads/').split('\n')
+
+
+def test_loose_and_packed(repo):
+    """Loose refs, packed refs, and loose refs which supersede packed refs are resolved as by Git."""
+    run(repo, 'branch', 'packed')
+    run(repo, 'branch', 'nested/packed')
+    run(repo, 'pack-refs', '--all')
+    run(repo, 'branch', 'loose')
+    run(repo, 'branch', 'nested/loose')
+    run(repo, 'checkout', '--quiet', 'packed')
+    commit(repo, 'Second')
+
+    refs = Refs(repo)
+    assert refs.branches() == branches(repo)
+    assert refs.current_branch() == 'packed'
+    assert refs._refs()['refs/heads/packed'] == run(repo, 'rev-parse', 'HEAD')
+
+
+def test_updates(repo):
+    """Cached listings are refreshed when refs change."""
+    refs = Refs(repo)
+    assert refs.branches() == ['main']
+    run(repo, 'branch', 'a/b')
+    run(repo, 'checkout', '--quiet', 'a/b')
+    assert refs.branches() == ['a/b', 'main']
+    assert refs.current_branch() == 'a/b'
+    run(repo, 'checkout', '--quiet', '--detach')
+    assert refs.current_branch() == 'HEAD'
+
+
+def test_symbolic(repo):
+    """Symbolic refs and unborn branches are left to Git."""
+    refs = Refs(repo)
+    run(repo, 'symbolic-ref', 'refs/heads/alias', 'refs/heads/main')
+    assert refs.branches() is None
+    run(repo, 'checkout', '--quiet', '--orphan', 'unborn')
+    assert refs.current_branch() is None
+
+
+def test_ambiguous(repo):
+    """A branch whose short name would be ambiguous is left to Git."""
+    run(repo, 'tag', 'main')
+    refs = Refs(repo)
+    assert refs.current_branch() is None
+    assert refs.branches() is None
+
+
+def test_worktree(repo, tmp_path):
+    """A linked working tree has its own `HEAD` and shares branches with the main working tree."""
+    path = str(tmp_path / 'worktree')
+    run(repo, 'worktree', 'add', '--quiet', '-b', 'linked', path)
+    refs = Refs(path)
+    assert refs.current_branch() == 'linked'
+    assert refs.branches() == ['linked', 'main']
+
+
+async def test_fallback(repo, git):
+    """Refs which cannot be resolved from files are resolved by Git."""
+    run(repo, 'tag', 'main')
+    assert await git.current_branch() == {'code': 0, 'branch': 'heads/main'}
+    run(repo, 'tag', '--delete', 'main')
+
+    # Git versions which support the `reftable` format store refs in a `reftable` directory:
+    os.mkdir(os.path.join(repo, '.git', 'reftable'))
+    assert Refs(repo).current_branch() is None
+    assert await git.current_branch() == {'code': 0, 'branch': 'main'}
+    assert await git.local_branches() == {'code': 0, 'branches': ['main']}
+    assert 'simple_git_ref_reads_total{result="fallback"} 3' in git.metrics.render()
@@ -0,0 +1,95 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for resolving request paths to repositories."""
+
+import asyncio
+import os
+import pytest
+from jupyterlab_simple_git.registry import Registry
+from tests.utils import commit, git as run
+
+
+@pytest.fixture
+async def registry(tmp_path):
+    """Return a registry for a server root containing two repositories and a plain directory."""
+    for name in ('a', 'b'):
+        root = str(tmp_path / name)
+        os.mkdir(root)
+        run(root, 'init', '--quiet')
+        commit(root, 'Initial commit', {'README.md': 'Hello\n'})
+    os.mkdir(str(tmp_path / 'plain'))
+    instance = Registry(str(tmp_path), capacity=1, maintenance_interval=0, history_index=False)
+    yield instance
+    instance.close()
+    await asyncio.sleep(0)
+
+
+def test_find_repository(registry, tmp_path):
+    """Paths outside of a repository do not resolve to a repository."""
+    assert registry.find_repository('a/README.md') == os.path.realpath(str(tmp_path / 'a'))
+    assert registry.find_repository('.') is None
+    assert registry.find_repository('plain') is None
+
+
+async def test_single_instance(registry):
+    """Concurrent requests for the same repository share a single instance."""
+    git = registry.acquire('a')
+    assert registry.acquire('a/README.md') is git
+    registry.release(git)
+    registry.release(git)
+    assert registry.acquire('a') is git
+    registry.release(git)
+
+
+async def test_instances_in_use_are_retained(registry):
+    """Instances are only closed once idle, even when exceeding capacity."""
+    a = registry.acquire('a')
+    b = registry.acquire('b')
+    assert list(registry._repos.values()) == [a, b]
+    assert (await a.status())['code'] == 0
+
+    registry.release(b)
+    assert list(registry._repos.values()) == [a]
+    registry.release(a)
+    assert list(registry._repos.values()) == [a]
+    b = registry.acquire('b')
+    assert list(registry._repos.values()) == [b]
+    registry.release(b)
+
+
+async def test_transient_instance(registry, tmp_path):
+    """Paths outside of a repository resolve to an instance which is not retained or watched."""
+    git = registry.acquire('plain')
+    assert git.root == os.path.realpath(str(tmp_path / 'plain'))
+    assert not git._watcher.start()
+    assert (await git.init())['code'] == 0
+    registry.release(git)
+    assert registry._repos == {}
+    assert registry.find_repository('plain') == git.root
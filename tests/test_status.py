@@ -0,0 +1,162 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for parsing working tree status."""
+
+import subprocess
+import pytest
+from jupyterlab_simple_git.status import parse_status
+from tests.utils import commit, git as run, write
+
+
+def status(root):
+    """Return `git status --porcelain=v2 -z` output for a repository."""
+    return run(root, 'status', '--porcelain=v2', '--branch', '-z', '--untracked-files=all', '--renames')
+
+
+def test_parse_status(repo):
+    """Modifications, additions, renames, and untracked files are parsed from Git output."""
+    commit(repo, 'Add', {'old.txt': 'Old\n'})
+    run(repo, 'mv', 'old.txt', 'new -> name.txt')
+    write(repo, 'README.md', 'Changed\n')
+    write(repo, 'a b.txt', 'Added\n')
+    run(repo, 'add', 'a b.txt')
+    write(repo, 'dir/ü.txt', 'Untracked\n')
+
+    headers, entries = parse_status(status(repo))
+    assert headers['branch.head'] == 'main'
+    assert headers['branch.oid'] == run(repo, 'rev-parse', 'HEAD')
+
+    entries = {e.get('file', e.get('to')): e for e in entries}
+    assert sorted(entries) == ['README.md', 'a b.txt', 'dir/ü.txt', 'new -> name.txt']
+    assert entries['README.md'] == {
+        'status': 'M',
+        'action': 'modified',
+        'file': 'README.md',
+        'index': '.',
+        'worktree': 'M',
+        'staged': False,
+        'unstaged': True,
+        'submodule': None
+    }
+    assert (entries['a b.txt']['status'], entries['a b.txt']['staged'], entries['a b.txt']['unstaged']) == ('A', True, False)
+    assert entries['new -> name.txt']['from'] == 'old.txt'
+    assert (entries['new -> name.txt']['status'], entries['new -> name.txt']['score']) == ('R', 100)
+    assert (entries['dir/ü.txt']['status'], entries['dir/ü.txt']['action']) == ('?', 'untracked')
+
+
+def test_parse_status_unmerged(repo):
+    """Unmerged entries include the conflict type."""
+    run(repo, 'checkout', '--quiet', '-b', 'side')
+    commit(repo, 'Side', {'README.md': 'Side\n'})
+    run(repo, 'checkout', '--quiet', 'main')
+    commit(repo, 'Main', {'README.md': 'Main\n'})
+    with pytest.raises(subprocess.CalledProcessError):
+        run(repo, 'merge', '--quiet', 'side')
+
+    _, entries = parse_status(status(repo))
+    assert entries == [{
+        'status': 'U',
+        'action': 'unmerged',
+        'file': 'README.md',
+        'conflict': 'UU',
+        'index': 'U',
+        'worktree': 'U',
+        'staged': True,
+        'unstaged': True,
+        'submodule': None
+    }]
+
+
+def test_parse_status_initial(tmp_path):
+    """A branch without commits is reported as such."""
+    run(str(tmp_path), 'init', '--quiet', '--initial-branch=main')
+    headers, entries = parse_status(status(str(tmp_path)))
+    assert (headers['branch.oid'], headers['branch.head']) == ('(initial)', 'main')
+    assert entries == []
+
+
+async def test_snapshot_ahead_behind(repo, git, tmp_path):
+    """A snapshot reports the upstream branch along with ahead and behind counts."""
+    remote = str(tmp_path / 'remote.git')
+    other = str(tmp_path / 'other')
+    run(str(tmp_path), 'clone', '--quiet', '--bare', repo, remote)
+    run(str(tmp_path), 'clone', '--quiet', remote, other)
+    commit(other, 'Remote')
+    run(other, 'push', '--quiet', 'origin', 'main')
+
+    run(repo, 'remote', 'add', 'origin', remote)
+    run(repo, 'fetch', '--quiet', 'origin')
+    run(repo, 'branch', '--quiet', '--set-upstream-to=origin/main')
+    commit(repo, 'First')
+    commit(repo, 'Second')
+
+    response = await git.snapshot()
+    assert response['code'] == 0
+    assert (response['branch'], response['oid'], response['upstream']) == ('main', run(repo, 'rev-parse', 'HEAD'), 'origin/main')
+    assert (response['ahead'], response['behind']) == (2, 1)
+
+
+async def test_snapshot_changes(repo, git):
+    """Staged renames, unstaged changes, and untracked files are reported separately."""
+    run(repo, 'mv', 'README.md', 'README.txt')
+    write(repo, 'README.txt', 'Changed\n')
+    write(repo, 'new.txt', 'New\n')
+
+    response = await git.snapshot()
+    assert response['code'] == 0
+    assert response['upstream'] is None
+    assert (response['ahead'], response['behind']) == (0, 0)
+    assert [(e['status'], e['from'], e['to']) for e in response['staged']] == [('R', 'README.md', 'README.txt')]
+    assert [(e['worktree'], e['to']) for e in response['unstaged']] == [('M', 'README.txt')]
+    assert response['untracked'] == ['new.txt']
+
+
+async def test_snapshot_unmerged(repo, git):
+    """Unmerged entries are reported as both staged and unstaged."""
+    run(repo, 'checkout', '--quiet', '-b', 'side')
+    commit(repo, 'Side', {'README.md': 'Side\n'})
+    run(repo, 'checkout', '--quiet', 'main')
+    commit(repo, 'Main', {'README.md': 'Main\n'})
+    with pytest.raises(subprocess.CalledProcessError):
+        run(repo, 'merge', '--quiet', 'side')
+
+    response = await git.snapshot()
+    assert [(e['file'], e['conflict']) for e in response['staged']] == [('README.md', 'UU')]
+    assert [e['file'] for e in response['unstaged']] == ['README.md']
+
+
+async def test_snapshot_detached(repo, git):
+    """If `HEAD` is detached, the branch name is 'HEAD'."""
+    oid = commit(repo, 'Second')
+    run(repo, 'checkout', '--quiet', '--detach', 'HEAD~1')
+
+    response = await git.snapshot()
+    assert (response['branch'], response['oid']) == ('HEAD', run(repo, 'rev-parse', 'HEAD'))
+    assert response['oid'] != oid
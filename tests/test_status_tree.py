@@ -0,0 +1,126 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for per-directory status counts."""
+
+import random
+from jupyterlab_simple_git.status_tree import StatusTree
+from tests.utils import commit, git as run, write
+
+
+def counts(modified=0, added=0, untracked=0, conflicted=0):
+    """Return a `dict` of counts for each change category."""
+    return {
+        'modified': modified,
+        'added': added,
+        'untracked': untracked,
+        'conflicted': conflicted
+    }
+
+
+def test_update():
+    """Counts are aggregated for each ancestor directory."""
+    tree = StatusTree()
+    tree.update({
+        'a.txt': 'modified',
+        'dir/b.txt': 'added',
+        'dir/sub/c.txt': 'untracked',
+        'dir/sub/d.txt': 'untracked',
+        'other/e.txt': 'conflicted'
+    })
+    assert tree.counts() == counts(1, 1, 2, 1)
+    assert tree.counts('dir') == counts(added=1, untracked=2)
+    assert tree.counts('dir/sub') == counts(untracked=2)
+    assert tree.counts('missing') == counts()
+    assert tree.children('dir') == [
+        {'name': 'b.txt', 'path': 'dir/b.txt', 'type': 'file', 'category': 'added'},
+        {'name': 'sub', 'path': 'dir/sub', 'type': 'directory', 'counts': counts(untracked=2)}
+    ]
+    assert [e['name'] for e in tree.children()] == ['a.txt', 'dir', 'other']
+
+
+def test_update_changes():
+    """Changed categories are moved between counts, and directories without changes are pruned."""
+    tree = StatusTree()
+    tree.update({'dir/sub/a.txt': 'untracked', 'dir/b.txt': 'modified'})
+    tree.update({'dir/sub/a.txt': 'added', 'dir/b.txt': 'modified'})
+    assert tree.counts('dir') == counts(modified=1, added=1)
+
+    tree.update({'dir/b.txt': 'modified'})
+    assert tree.counts('dir/sub') == counts()
+    assert tree.children('dir') == [{'name': 'b.txt', 'path': 'dir/b.txt', 'type': 'file', 'category': 'modified'}]
+
+    tree.update({})
+    assert tree.children() == []
+    assert tree._dirs == {}
+
+
+def test_update_replaced():
+    """A deleted file which has been replaced by a directory is listed as both."""
+    tree = StatusTree()
+    tree.update({'a': 'modified', 'a/b.txt': 'untracked'})
+    assert [(e['path'], e['type']) for e in tree.children()] == [('a', 'directory'), ('a', 'file')]
+    tree.update({'a/b.txt': 'untracked'})
+    assert [(e['path'], e['type']) for e in tree.children()] == [('a', 'directory')]
+
+
+def test_update_incremental():
+    """Incremental updates are equivalent to building counts from scratch."""
+    rng = random.Random(0)
+    paths = ['a.txt', 'x', 'x/a.txt', 'x/y/b.txt', 'x/y/z/c.txt', 'x/w/d.txt', 'v/e.txt']
+    categories = ['modified', 'added', 'untracked', 'conflicted']
+    tree = StatusTree()
+    for _ in range(500):
+        files = {p: rng.choice(categories) for p in rng.sample(paths, rng.randint(0, len(paths)))}
+        tree.update(files)
+        expected = StatusTree()
+        expected.update(files)
+        assert tree.files == expected.files
+        assert tree._dirs == expected._dirs
+
+
+async def test_status_tree(repo, git):
+    """Counts are derived from the working tree status."""
+    commit(repo, 'Add', {'dir/a.txt': 'A\n', 'dir/sub/b.txt': 'B\n'})
+    write(repo, 'README.md', 'Changed\n')
+    run(repo, 'mv', 'dir/a.txt', 'dir/sub/c.txt')
+    write(repo, 'dir/sub/new/d.txt', 'D\n')
+    run(repo, 'rm', '--quiet', 'dir/sub/b.txt')
+
+    response = await git.status_tree()
+    assert response['code'] == 0
+    assert response['counts'] == counts(modified=2, added=1, untracked=1)
+
+    response = await git.status_tree('dir/sub/')
+    assert response['path'] == 'dir/sub'
+    assert response['entries'] == [
+        {'name': 'b.txt', 'path': 'dir/sub/b.txt', 'type': 'file', 'category': 'modified'},
+        {'name': 'c.txt', 'path': 'dir/sub/c.txt', 'type': 'file', 'category': 'added'},
+        {'name': 'new', 'path': 'dir/sub/new', 'type': 'directory', 'counts': counts(untracked=1)}
+    ]
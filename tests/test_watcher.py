@@ -0,0 +1,118 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for the repository watcher."""
+
+import asyncio
+import os
+import pytest
+from jupyterlab_simple_git import watcher as watcher_module
+from jupyterlab_simple_git.watcher import Watcher
+from tests.utils import commit, write
+
+pytest.importorskip('watchdog')
+
+
+class FailingObserver():
+    """Observer which fails to schedule a second watch."""
+
+    instances = []
+
+    def __init__(self):
+        """Initialize a class instance."""
+        self.scheduled = 0
+        self.stopped = False
+        FailingObserver.instances.append(self)
+
+    def schedule(self, handler, path, recursive=False):
+        """Schedule a watch."""
+        self.scheduled += 1
+        if self.scheduled > 1:
+            raise OSError(28, 'inotify watch limit reached')
+
+    def start(self):
+        """Start the observer."""
+
+    def stop(self):
+        """Stop the observer."""
+        self.stopped = True
+
+    def is_alive(self):
+        """Return whether the observer thread is running."""
+        return False
+
+
+async def test_start_failure_backoff(repo, monkeypatch):
+    """A watcher which fails to start is cleaned up and not restarted until a retry interval has elapsed."""
+    FailingObserver.instances.clear()
+    monkeypatch.setattr(watcher_module, 'Observer', FailingObserver)
+    watcher = Watcher(repo)
+    watcher._git_dir = os.path.join(os.path.dirname(repo), 'elsewhere')
+    os.mkdir(watcher._git_dir)
+
+    assert watcher.start() is False
+    assert watcher.start() is False
+    assert len(FailingObserver.instances) == 1
+    assert FailingObserver.instances[0].stopped
+
+    monkeypatch.setattr(watcher, '_retry_at', 0.0)
+    assert watcher.start() is False
+    assert len(FailingObserver.instances) == 2
+    assert watcher._retry_interval == 4*watcher_module.RETRY_INTERVAL
+
+
+async def settle(condition, timeout=5.0):
+    """Wait until a condition holds."""
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_event_loop().time() < deadline
+        await asyncio.sleep(0.05)
+
+
+async def test_ignored_paths(repo, git):
+    """Changes to ignored paths and objects do not invalidate cached results."""
+    commit(repo, 'Ignore', {'.gitignore': 'build/\n'})
+    write(repo, 'build/output.txt', 'Output\n')
+    await git.status()
+    await settle(lambda: git._watcher.ignoring)
+    assert git._watcher._ignored == {os.path.join(git.root, 'build')}
+
+    await asyncio.sleep(0.3)
+    generation = git._watcher.generation
+    write(repo, 'build/output.txt', 'Changed\n')
+    write(repo, 'build/nested/output.txt', 'Nested\n')
+    write(git.root, '.git/objects/pack/tmp_pack_test', 'Pack\n')
+    await asyncio.sleep(0.5)
+    assert git._watcher.generation == generation
+
+    write(repo, '.gitignore', '')
+    await settle(lambda: git._watcher.generation > generation)
+    assert not git._watcher.ignoring
+    response = await git.status()
+    assert response['code'] == 0
@@ -0,0 +1,81 @@
+# @license BSD-3-Clause
+#
+# Copyright (c) 2019 Quansight. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Test utilities."""
+
+import os
+import subprocess
+
+
+def git(root, *args):
+    """Run a Git command.
+
+    Args:
+        root: repository path
+        args: command arguments
+
+    Returns:
+        standard output
+
+    """
+    return subprocess.run(['git'] + list(args), cwd=root, stdout=subprocess.PIPE, check=True).stdout.decode('utf8').strip()
+
+
+def write(root, path, contents):
+    """Write a file.
+
+    Args:
+        root: repository path
+        path: file path relative to the repository root
+        contents: file contents
+
+    """
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(contents)
+
+
+def commit(root, message, files=None):
+    """Write files and commit all changes.
+
+    Args:
+        root: repository path
+        message: commit message
+        files: `dict` mapping file paths to contents (optional)
+
+    Returns:
+        commit hash
+
+    """
+    for path, contents in (files or {}).items():
+        write(root, path, contents)
+    git(root, 'add', '-A')
+    git(root, 'commit', '--quiet', '--allow-empty', '-m', message)
+    return git(root, 'rev-parse', 'HEAD')